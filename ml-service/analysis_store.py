@@ -0,0 +1,114 @@
+"""
+Analysis Store Module
+
+Keeps finished EIR analyses in memory under their analysis id, a content
+hash of the analysis JSON, so clients can refer to an analysis by id instead
+of posting the whole document with every request (``/suggest-from-eir``
+takes ``analysis_id``). ``analyze()`` stores every result; a posted
+``analysis_json`` is stored too, so the client can switch to the id returned.
+
+Each stored analysis caches the compact JSON of its top-level sections
+(``project_info``, ``cde_requirements``, ...) the first time a prompt needs
+them. Prompts are assembled from these fragments, so the analysis is
+serialized once per section rather than once per suggestion.
+
+Entries expire ``EIR_ANALYSIS_STORE_TTL`` seconds after their last use;
+an unknown or expired id is a 404 and the client re-sends the JSON.
+
+Configuration:
+    - EIR_ANALYSIS_STORE_TTL: seconds an unused analysis is kept
+      (default: 86400)
+    - EIR_ANALYSIS_STORE_MAX_ENTRIES: analyses kept; least recently used are
+      evicted beyond this (default: 256)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from metrics import get_metrics
+from ttl_cache import TTLCache
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def analysis_id(analysis: Dict[str, Any]) -> str:
+    """Content-addressed id of an analysis: hash of its canonical (sorted, compact) JSON."""
+    canonical = json.dumps(analysis, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class StoredAnalysis:
+    """One analysis and the compact JSON fragments of its sections."""
+
+    def __init__(self, analysis_id: str, analysis: Dict[str, Any]):
+        self.analysis_id = analysis_id
+        self.analysis = analysis  # shared by every request: treat as read-only
+        self._fragments: Dict[str, str] = {}
+
+    def fragment(self, section: str) -> str:
+        """Compact JSON of one top-level section ("null" when absent), serialized once."""
+        fragment = self._fragments.get(section)
+        if fragment is None:
+            fragment = self._fragments[section] = _compact(self.analysis.get(section))
+        return fragment
+
+    def context(self, sections: Optional[Iterable[str]] = None) -> str:
+        """Compact JSON object of ``sections`` (every section by default), from the cached fragments."""
+        keys = list(self.analysis) if sections is None else [s for s in sections if s in self.analysis]
+        return '{' + ','.join(f'{_compact(key)}:{self.fragment(key)}' for key in keys) + '}'
+
+
+class AnalysisStore:
+    """TTL/LRU store of analyses by content hash."""
+
+    def __init__(self, ttl_s: Optional[float] = None, maxsize: Optional[int] = None):
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv('EIR_ANALYSIS_STORE_TTL', '86400'))
+        self.maxsize = maxsize or max(1, int(os.getenv('EIR_ANALYSIS_STORE_MAX_ENTRIES', '256')))
+        self._entries = TTLCache(maxsize=self.maxsize, ttl_s=self.ttl_s)
+        self._lock = threading.Lock()
+
+    def put(self, analysis: Dict[str, Any]) -> StoredAnalysis:
+        """
+        Store ``analysis`` (kept as given: the caller must not mutate it
+        afterwards) and return its entry. An identical analysis already
+        stored is returned instead, with its cached fragments.
+        """
+        key = analysis_id(analysis)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = StoredAnalysis(key, analysis)
+            self._entries.put(key, entry)  # (re)starts the TTL
+        return entry
+
+    def get(self, analysis_id: str) -> Optional[StoredAnalysis]:
+        """The stored analysis, or None if unknown or expired. Use extends its TTL."""
+        entry = self._entries.get(analysis_id)
+        get_metrics().inc('eir_analysis_store_lookups_total', result='hit' if entry else 'miss')
+        if entry is not None:
+            self._entries.put(analysis_id, entry)
+        return entry
+
+    def describe(self) -> Dict[str, Any]:
+        return {'analyses': len(self._entries), 'max_entries': self.maxsize, 'ttl_s': self.ttl_s}
+
+
+# Module-level singleton
+_store: Optional[AnalysisStore] = None
+_store_lock = threading.Lock()
+
+
+def get_analysis_store() -> AnalysisStore:
+    """Get or create the singleton AnalysisStore."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnalysisStore()
+                get_metrics().register_collector('analysis_store', _store.describe)
+    return _store
@@ -5,11 +5,11 @@ Provides REST API endpoints for AI-assisted text generation in BEP documents.
 Uses Ollama's local LLM for high-quality, fast text generation.
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import json
 import logging
 import os
@@ -17,7 +17,18 @@ import tempfile
 
 from ollama_generator import get_ollama_generator
 from text_extractor import get_extractor
-from eir_analyzer import get_analyzer
+from eir_analyzer import ANALYSIS_DEPTHS, get_analyzer
+from jobs import get_job_manager
+from concurrency import get_concurrency_limiter
+from chunk_cache import get_chunk_cache
+from glossary_index import get_glossary_index
+from summary_polish import POLISH_PENDING, get_summary_polisher
+from analysis_store import get_analysis_store
+from deadline import DeadlineMiddleware, get_throughput_estimator
+from degradation import get_degradation_controller
+from metrics import get_metrics
+from model_router import get_model_router
+from workload_profiles import get_workload_profiles
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -44,6 +55,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bind the caller's X-Request-Timeout-Ms budget to each request (see deadline.py)
+app.add_middleware(DeadlineMiddleware)
+
 
 class GenerateRequest(BaseModel):
     """Request model for text generation"""
@@ -60,6 +74,9 @@ class GenerateResponse(BaseModel):
     text: str = Field(..., description="Generated text")
     prompt_used: str = Field(..., description="Actual prompt used for generation")
     model: str = Field(..., description="Model used for generation")
+    degraded: bool = Field(False, description="Generated with reduced settings under load (offer 'refine later')")
+    degradation_level: int = Field(0, description="0 = none, 1 = no thinking, 2 = shorter output, 3 = fallback model")
+    degradation_actions: List[str] = Field(default_factory=list, description="Settings reduced for this response")
 
 
 class HealthResponse(BaseModel):
@@ -70,6 +87,16 @@ class HealthResponse(BaseModel):
     backend: str
 
 
+def _degradation_fields(generator) -> Dict[str, Any]:
+    """Degradation flags of the generator's last call, for response models."""
+    stats = generator.last_call_stats()
+    return {
+        'degraded': stats.get('degraded', False),
+        'degradation_level': stats.get('degradation_level', 0),
+        'degradation_actions': stats.get('degradation_actions', []),
+    }
+
+
 # Initialize generator on startup
 @app.on_event("startup")
 async def startup_event():
@@ -82,6 +109,16 @@ async def startup_event():
         logger.error(f"Error initializing Ollama: {e}")
         logger.error("Make sure Ollama is running: ollama serve")
 
+    # Open the job store and resume analysis jobs interrupted by a restart
+    try:
+        get_job_manager()
+    except Exception as e:
+        logger.error(f"Error opening EIR job store: {e}")
+
+    # Compile the glossary term matcher once, before the first document
+    get_glossary_index()
+    get_summary_polisher()
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -119,6 +156,31 @@ async def health_check():
         )
 
 
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """
+    Service metrics as JSON.
+
+    Includes per-workload Ollama request counts, latency, token throughput,
+    the effective settings of every workload profile, per-route model
+    routing SLO attainment and savings, the current degradation level,
+    deadline counters, learned per-model throughput, analysis job counts,
+    the adaptive EIR chunk concurrency limit, the EIR chunk cache, the
+    background summary polishes and the analysis store.
+    """
+    get_workload_profiles()  # ensure the collectors are registered
+    get_model_router()
+    get_degradation_controller()
+    get_throughput_estimator()
+    get_job_manager()
+    get_concurrency_limiter()
+    get_chunk_cache()
+    get_glossary_index()
+    get_summary_polisher()
+    get_analysis_store()
+    return get_metrics().snapshot()
+
+
 @app.post("/generate", response_model=GenerateResponse, tags=["Generation"])
 async def generate_text(request: GenerateRequest):
     """
@@ -134,6 +196,7 @@ async def generate_text(request: GenerateRequest):
     """
     try:
         generator = get_ollama_generator(model=request.model or OLLAMA_MODEL)
+        generator.reset_call_stats()
 
         # Generate text
         if request.field_type:
@@ -142,7 +205,7 @@ async def generate_text(request: GenerateRequest):
                 field_type=request.field_type,
                 partial_text=request.prompt,
                 max_length=request.max_length,
-                thinking_mode=request.thinking_mode if request.thinking_mode is not None else False
+                thinking_mode=request.thinking_mode
             )
             prompt_used = request.prompt
         else:
@@ -151,7 +214,8 @@ async def generate_text(request: GenerateRequest):
                 prompt=request.prompt,
                 max_length=request.max_length,
                 temperature=request.temperature,
-                thinking_mode=request.thinking_mode
+                thinking_mode=request.thinking_mode,
+                workload='generate'
             )
             prompt_used = request.prompt
 
@@ -160,7 +224,8 @@ async def generate_text(request: GenerateRequest):
         return GenerateResponse(
             text=generated.strip(),
             prompt_used=prompt_used,
-            model=request.model or OLLAMA_MODEL
+            model=generator.last_call_stats().get('model') or request.model or OLLAMA_MODEL,
+            **_degradation_fields(generator)
         )
 
     except Exception as e:
@@ -177,7 +242,8 @@ class SuggestRequest(BaseModel):
     partial_text: str = Field("", description="Existing text in the field")
     max_length: int = Field(200, ge=50, le=1000, description="Maximum characters to generate")
     model: Optional[str] = Field(None, description="Ollama model override")
-    thinking_mode: Optional[bool] = Field(False, description="Qwen3 thinking mode (default False for speed)")
+    thinking_mode: Optional[bool] = Field(None, description="Qwen3 thinking mode (None = workload profile default, off for speed)")
+    mode: str = Field("standard", description="/suggest-stream only: 'standard' or 'two_tier' (small-model draft, then a 'replace' event with the large-model refinement)")
 
 
 @app.post("/suggest", response_model=GenerateResponse, tags=["Generation"])
@@ -194,6 +260,7 @@ async def suggest_for_field(request: SuggestRequest):
     """
     try:
         generator = get_ollama_generator(model=request.model or OLLAMA_MODEL)
+        generator.reset_call_stats()
 
         # Generate field-specific suggestion
         suggestion = generator.suggest_for_field(
@@ -208,7 +275,8 @@ async def suggest_for_field(request: SuggestRequest):
         return GenerateResponse(
             text=suggestion,
             prompt_used=request.partial_text,
-            model=request.model or OLLAMA_MODEL
+            model=generator.last_call_stats().get('model') or request.model or OLLAMA_MODEL,
+            **_degradation_fields(generator)
         )
 
     except Exception as e:
@@ -227,19 +295,35 @@ async def suggest_for_field_stream(request: SuggestRequest):
     Emits server-sent events in this order:
       {"type":"stage","message":"Parsing ISO 19650 requirements…"}  (cycles until first token)
       {"type":"token","text":"The "}                                 (one per Ollama token)
-      {"type":"done","fullText":"The complete cleaned text…"}        (final cleaned result)
+      {"type":"done","fullText":"The complete cleaned text…",
+       "degraded":false,"degradation_level":0,"degradation_actions":[]}  (final cleaned result)
       {"type":"error","message":"..."}                               (on failure)
+
+    With mode="two_tier" the tokens come from a small draft model, "done" carries
+    "draft": true / "refining": true, and the stream ends with
+      {"type":"replace","fullText":"Refined text…","model":"qwen3:8b"}
+    once the large model's refinement arrives (cached per field afterwards).
     """
+    if request.mode not in ('standard', 'two_tier'):
+        raise HTTPException(status_code=400, detail=f"Unknown mode: {request.mode}")
     generator = get_ollama_generator(model=request.model or OLLAMA_MODEL)
 
     def event_stream():
         try:
-            for event in generator.suggest_for_field_stream(
-                field_type=request.field_type,
-                partial_text=request.partial_text,
-                max_length=request.max_length,
-                thinking_mode=request.thinking_mode
-            ):
+            if request.mode == 'two_tier':
+                events = generator.suggest_for_field_two_tier_stream(
+                    field_type=request.field_type,
+                    partial_text=request.partial_text,
+                    max_length=request.max_length
+                )
+            else:
+                events = generator.suggest_for_field_stream(
+                    field_type=request.field_type,
+                    partial_text=request.partial_text,
+                    max_length=request.max_length,
+                    thinking_mode=request.thinking_mode
+                )
+            for event in events:
                 yield f"data: {json.dumps(event)}\n\n"
         except Exception as exc:
             logger.error("suggest-stream error: %s", exc)
@@ -286,16 +370,21 @@ class ExtractTextResponse(BaseModel):
     word_count: int = Field(..., description="Word count")
     char_count: int = Field(..., description="Character count")
     tables_found: int = Field(0, description="Number of tables found")
+    page_scores: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="ISO 19650 glossary term hits and density (hits per 100 words) per page, for page triage"
+    )
 
 
 @app.post("/extract-text", response_model=ExtractTextResponse, tags=["EIR Analysis"])
 async def extract_text(file: UploadFile = File(...)):
     """
-    Extract text from a PDF or DOCX document.
+    Extract text from a PDF, DOCX or XLSX document.
 
     Supports:
     - PDF files (using pdfplumber)
     - DOCX files (using python-docx)
+    - XLSX workbooks such as LOIN matrices (using openpyxl)
 
     Returns the full text content along with metadata about the document.
     """
@@ -304,10 +393,10 @@ async def extract_text(file: UploadFile = File(...)):
         filename = file.filename or "document"
         ext = os.path.splitext(filename)[1].lower()
 
-        if ext not in {'.pdf', '.docx', '.doc'}:
+        if ext not in {'.pdf', '.docx', '.doc', '.xlsx'}:
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type: {ext}. Supported: .pdf, .docx"
+                detail=f"Unsupported file type: {ext}. Supported: .pdf, .docx, .xlsx"
             )
 
         # Read file content
@@ -330,7 +419,8 @@ async def extract_text(file: UploadFile = File(...)):
             pages=metadata.get('pages', 1),
             word_count=metadata.get('word_count', 0),
             char_count=metadata.get('char_count', len(text)),
-            tables_found=metadata.get('tables_found', 0)
+            tables_found=metadata.get('tables_found', 0),
+            page_scores=get_glossary_index().page_scores(text)
         )
 
     except HTTPException:
@@ -348,13 +438,36 @@ class AnalyzeEirRequest(BaseModel):
     text: str = Field(..., description="Extracted text from EIR document")
     filename: Optional[str] = Field(None, description="Original filename for context")
     model: Optional[str] = Field(None, description="Ollama model override")
+    depth: Optional[str] = Field(
+        None,
+        description="'quick' (triage: no thinking, small model, template summary), 'standard' or "
+                    "'deep' (section-routed extraction with thinking, then gap-filling); default EIR_ANALYSIS_DEPTH"
+    )
+
+
+def _check_depth(request: AnalyzeEirRequest) -> None:
+    if request.depth is not None and request.depth not in ANALYSIS_DEPTHS:
+        raise HTTPException(status_code=400, detail=f"Unknown depth: {request.depth}")
 
 
 class AnalyzeEirResponse(BaseModel):
     """Response model for EIR analysis"""
     analysis_json: Dict[str, Any] = Field(..., description="Structured analysis JSON")
-    summary_markdown: str = Field(..., description="Markdown summary of the analysis")
+    summary_markdown: str = Field(..., description="Markdown summary of the analysis (template-rendered)")
+    field_values: Dict[str, str] = Field(
+        default_factory=dict,
+        description="BEP fields filled straight from the analysis, with no LLM call (field name -> value)"
+    )
+    analysis_id: Optional[str] = Field(
+        None,
+        description="Content hash of the analysis: pass it to /suggest-from-eir instead of the JSON, "
+                    "and fetch the LLM-polished summary from /analysis/{analysis_id}/summary"
+    )
     model: str = Field(..., description="Model used for analysis")
+    metadata: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Extraction stats: depth, chunks, LLM calls, tokens and chunk cache hits / time saved"
+    )
 
 
 @app.post("/analyze-eir", response_model=AnalyzeEirResponse, tags=["EIR Analysis"])
@@ -373,7 +486,13 @@ async def analyze_eir(request: AnalyzeEirRequest):
     - Software requirements
     - And more...
 
-    Returns both a structured JSON analysis and a markdown summary.
+    Returns both a structured JSON analysis and a markdown summary, plus
+    ``field_values``: every BEP field the analysis answers directly, which
+    clients can prefill without a /suggest-from-eir call. The
+    summary is rendered from a template; unless ``metadata.summary_polish``
+    is None, an LLM-polished one is generated in the background under
+    ``analysis_id`` (``GET /analysis/{analysis_id}/summary``).
+    ``depth`` trades coverage for latency (see ANALYSIS_DEPTHS in eir_analyzer.py).
     """
     try:
         if not request.text or len(request.text.strip()) < 100:
@@ -381,6 +500,7 @@ async def analyze_eir(request: AnalyzeEirRequest):
                 status_code=400,
                 detail="Text too short for meaningful analysis (min 100 chars)"
             )
+        _check_depth(request)
 
         logger.info(f"Starting EIR analysis for: {request.filename or 'unknown'}, text length: {len(request.text)} chars")
 
@@ -388,15 +508,20 @@ async def analyze_eir(request: AnalyzeEirRequest):
         analyzer = get_analyzer(model=effective_model)
         analysis_json, summary_markdown = analyzer.analyze(
             text=request.text,
-            filename=request.filename
+            filename=request.filename,
+            depth=request.depth
         )
 
         logger.info(f"Successfully analyzed EIR document: {request.filename or 'unknown'}")
 
+        metadata = analyzer.last_analysis_stats()
         return AnalyzeEirResponse(
             analysis_json=analysis_json,
             summary_markdown=summary_markdown,
-            model=effective_model
+            field_values=analyzer.direct_field_values(analysis_json),
+            analysis_id=metadata['analysis_id'],
+            model=effective_model,
+            metadata=metadata
         )
 
     except HTTPException:
@@ -422,9 +547,190 @@ async def analyze_eir(request: AnalyzeEirRequest):
         )
 
 
+@app.post("/analyze-eir-stream", tags=["EIR Analysis"])
+async def analyze_eir_stream(request: AnalyzeEirRequest):
+    """
+    Analyze an EIR document, streaming partial results via SSE.
+
+    Emits server-sent events in this order:
+      {"type":"stage","stage":"analyzing","chunks_done":0,"chunks_total":4}
+      {"type":"partial","chunk":2,"chunks_done":1,"chunks_total":4,"failed":false,
+       "analysis_json":{...}}          (per finished chunk: merged + sanitized so far)
+      {"type":"partial","section":"project_info","chunks_done":0,"chunks_total":1,
+       "analysis_json":{...}}          (single-pass documents: per generated section)
+      {"type":"stage","stage":"gap_fill","sections":["cde"]}  (empty sections re-extracted)
+      {"type":"done","analysis_json":{...},"summary_markdown":"...","field_values":{...},
+       "model":"qwen3:8b"}
+      {"type":"summary","analysis_id":"...","summary_markdown":"...","model":"qwen3:8b"}
+                                       (LLM-polished summary, when one was queued)
+      {"type":"error","message":"..."}  (on failure)
+
+    Disconnecting cancels the remaining chunks.
+    """
+    if not request.text or len(request.text.strip()) < 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Text too short for meaningful analysis (min 100 chars)"
+        )
+
+    _check_depth(request)
+    effective_model = request.model or OLLAMA_MODEL
+    analyzer = get_analyzer(model=effective_model)
+    logger.info(f"Starting streaming EIR analysis for: {request.filename or 'unknown'}, text length: {len(request.text)} chars")
+
+    def event_stream():
+        events = analyzer.analyze_stream(text=request.text, filename=request.filename, depth=request.depth)
+        try:
+            for event in events:
+                if event['type'] == 'done':
+                    event['model'] = effective_model
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as exc:
+            logger.error("analyze-eir-stream error: %s", exc)
+            yield f"data: {json.dumps({'type': 'error', 'message': str(exc)})}\n\n"
+        finally:
+            events.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class JobProgress(BaseModel):
+    """Progress of an analysis job"""
+    stage: str = Field(..., description="Current stage (queued, analyzing, gap_fill, ...)")
+    chunks_done: int = Field(0, description="Chunks analyzed so far")
+    chunks_total: Optional[int] = Field(None, description="Total chunks (None until known)")
+    chunks_failed: int = Field(0, description="Chunks that failed and were skipped")
+
+
+class AnalysisJobResponse(BaseModel):
+    """Status of an asynchronous EIR analysis job"""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    filename: Optional[str] = Field(None, description="Original filename")
+    model: str = Field(..., description="Model used for analysis")
+    depth: Optional[str] = Field(None, description="Analysis depth requested (None: EIR_ANALYSIS_DEPTH)")
+    created_at: float = Field(..., description="Submission time (epoch seconds)")
+    started_at: Optional[float] = Field(None, description="Start time (epoch seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (epoch seconds)")
+    progress: JobProgress
+    cancel_requested: bool = Field(False, description="Whether cancellation was requested")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    result: Optional[AnalyzeEirResponse] = Field(None, description="Analysis result once completed")
+
+
+@app.post("/jobs/analyze-eir", response_model=AnalysisJobResponse, status_code=202, tags=["EIR Analysis"])
+async def submit_analysis_job(
+    request: AnalyzeEirRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Queue an EIR analysis and return immediately with a job id.
+
+    Poll ``GET /jobs/{job_id}`` for progress and the result. A retried
+    submission with the same ``Idempotency-Key`` header returns the existing
+    job (200) instead of starting a new analysis (202).
+    """
+    if not request.text or len(request.text.strip()) < 100:
+        raise HTTPException(
+            status_code=400,
+            detail="Text too short for meaningful analysis (min 100 chars)"
+        )
+
+    _check_depth(request)
+    job, created = get_job_manager().submit(
+        text=request.text,
+        filename=request.filename,
+        model=request.model or OLLAMA_MODEL,
+        idempotency_key=idempotency_key,
+        depth=request.depth
+    )
+    if not created:
+        response.status_code = 200
+    return AnalysisJobResponse(**job.to_dict())
+
+
+@app.get("/jobs/{job_id}", response_model=AnalysisJobResponse, tags=["EIR Analysis"])
+async def get_analysis_job(job_id: str):
+    """Get the status, progress and (once completed) result of an analysis job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return AnalysisJobResponse(**job.to_dict())
+
+
+@app.delete("/jobs/{job_id}", response_model=AnalysisJobResponse, tags=["EIR Analysis"])
+async def cancel_analysis_job(job_id: str):
+    """
+    Cancel an analysis job. Queued jobs are cancelled immediately; running
+    jobs stop at the next chunk boundary.
+    """
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return AnalysisJobResponse(**job.to_dict())
+
+
+class SummaryPolishResponse(BaseModel):
+    """State of the background LLM polish of an analysis summary"""
+    analysis_id: str = Field(..., description="Content hash of the analysis")
+    status: str = Field(..., description="pending, completed or failed")
+    summary_markdown: Optional[str] = Field(None, description="Polished summary once completed")
+    model: Optional[str] = Field(None, description="Model that wrote the polished summary")
+    error: Optional[str] = Field(None, description="Error message if the polish failed")
+    created_at: float = Field(..., description="Queue time (epoch seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (epoch seconds)")
+
+
+def _get_polish(analysis_id: str):
+    polish = get_summary_polisher().get(analysis_id)
+    if polish is None:
+        raise HTTPException(status_code=404, detail=f"No summary polish for analysis: {analysis_id}")
+    return polish
+
+
+@app.get("/analysis/{analysis_id}/summary", response_model=SummaryPolishResponse, tags=["EIR Analysis"])
+async def get_polished_summary(analysis_id: str):
+    """
+    State of the LLM polish of an analysis summary, with the polished
+    summary once completed. 404 when none was queued or it expired.
+    """
+    return SummaryPolishResponse(**_get_polish(analysis_id).to_dict())
+
+
+@app.get("/analysis/{analysis_id}/summary-stream", tags=["EIR Analysis"])
+async def stream_polished_summary(analysis_id: str):
+    """
+    Wait for the LLM polish of an analysis summary via SSE.
+
+    Emits {"type":"pending",...} while it runs (at most every 15 s, as a
+    keep-alive), then one {"type":"summary",...} or {"type":"error",...}
+    carrying the polish state (see GET /analysis/{analysis_id}/summary).
+    """
+    polish = _get_polish(analysis_id)
+
+    def event_stream():
+        while polish.status == POLISH_PENDING:
+            yield f"data: {json.dumps({'type': 'pending', **polish.to_dict()})}\n\n"
+            polish.wait(15.0)  # returns as soon as the polish finishes
+        event_type = 'summary' if polish.summary_markdown else 'error'
+        yield f"data: {json.dumps({'type': event_type, **polish.to_dict()})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 class SuggestFromEirRequest(BaseModel):
     """Request model for EIR-based field suggestions"""
-    analysis_json: Dict[str, Any] = Field(..., description="EIR analysis JSON")
+    analysis_id: Optional[str] = Field(None, description="Id of a stored analysis (from /analyze-eir)")
+    analysis_json: Optional[Dict[str, Any]] = Field(None, description="EIR analysis JSON, when no analysis_id is given")
     field_type: str = Field(..., description="BEP field type to get suggestion for")
     partial_text: str = Field("", description="Existing text in the field")
     model: Optional[str] = Field(None, description="Ollama model override")
@@ -434,7 +740,12 @@ class SuggestFromEirResponse(BaseModel):
     """Response model for EIR-based suggestions"""
     suggestion: str = Field(..., description="Suggested text for the field")
     field_type: str = Field(..., description="Field type")
+    analysis_id: str = Field(..., description="Id of the stored analysis, for the next requests")
     model: str = Field(..., description="Model used")
+    route: Optional[str] = Field(None, description="Model route (simple/complex); None when the client chose the model")
+    degraded: bool = Field(False, description="Generated with reduced settings under load (offer 'refine later')")
+    degradation_level: int = Field(0, description="0 = none, 1 = no thinking, 2 = shorter output, 3 = fallback model")
+    degradation_actions: List[str] = Field(default_factory=list, description="Settings reduced for this response")
 
 
 class SuggestEirFieldRequest(BaseModel):
@@ -451,6 +762,10 @@ class SuggestEirFieldResponse(BaseModel):
     suggestion: str = Field(..., description="Suggested text for the EIR field")
     field_name: str = Field(..., description="Field name")
     model: str = Field(..., description="Model used")
+    route: Optional[str] = Field(None, description="Model route (simple/complex); None when the client chose the model")
+    degraded: bool = Field(False, description="Generated with reduced settings under load (offer 'refine later')")
+    degradation_level: int = Field(0, description="0 = none, 1 = no thinking, 2 = shorter output, 3 = fallback model")
+    degradation_actions: List[str] = Field(default_factory=list, description="Settings reduced for this response")
 
 
 # ============================================================================
@@ -507,7 +822,7 @@ class GenerateFromAnswersRequest(BaseModel):
     answers: list = Field(..., description="List of answer objects")
     field_context: Optional[FieldContext] = Field(None, description="Field context information")
     model: Optional[str] = Field(None, description="Ollama model override")
-    thinking_mode: Optional[bool] = Field(False, description="Qwen3 thinking mode (default False for speed)")
+    thinking_mode: Optional[bool] = Field(None, description="Qwen3 thinking mode (None = workload profile default, off for speed)")
 
 
 class GenerateFromAnswersResponse(BaseModel):
@@ -517,6 +832,9 @@ class GenerateFromAnswersResponse(BaseModel):
     questions_answered: int = Field(..., description="Number of questions answered")
     questions_total: int = Field(..., description="Total number of questions")
     model: str = Field(..., description="Model used for generation")
+    degraded: bool = Field(False, description="Generated with reduced settings under load (offer 'refine later')")
+    degradation_level: int = Field(0, description="0 = none, 1 = no thinking, 2 = shorter output, 3 = fallback model")
+    degradation_actions: List[str] = Field(default_factory=list, description="Settings reduced for this response")
 
 
 @app.post("/warm-questions", response_model=WarmQuestionsResponse, tags=["Guided AI"])
@@ -529,7 +847,7 @@ async def warm_questions():
     try:
         model = OLLAMA_QUESTIONS_MODEL or OLLAMA_MODEL
         generator = get_ollama_generator(model=model)
-        generator.generate_text(prompt="warm", max_length=1, temperature=0)
+        generator.generate_text(prompt="warm", max_length=1, temperature=0, workload='questions')
         logger.debug("Questions model warmed successfully")
         return WarmQuestionsResponse(warmed=True)
     except Exception as e:
@@ -574,6 +892,43 @@ async def generate_questions(request: GenerateQuestionsRequest):
         )
 
 
+@app.post("/generate-questions-stream", tags=["Guided AI"])
+async def generate_questions_stream(request: GenerateQuestionsRequest):
+    """
+    Stream guided questions via SSE, each one as soon as the model closes it.
+
+    Emits server-sent events in this order:
+      {"type":"question","question":{"id":"q1","text":"...","hint":"..."}}  (one per question)
+      {"type":"done","questions":[...],"field_type":"projectDescription"}     (final list)
+      {"type":"error","message":"..."}                                       (on failure)
+
+    The "done" list is authoritative: if too few questions were streamed it
+    holds the retried or generic questions instead.
+    """
+    generator = get_ollama_generator(model=request.model or OLLAMA_QUESTIONS_MODEL or OLLAMA_MODEL)
+    field_context_dict = request.field_context.dict() if request.field_context else None
+
+    def event_stream():
+        try:
+            for event in generator.generate_questions_for_field_stream(
+                field_type=request.field_type,
+                field_label=request.field_label,
+                field_context=field_context_dict
+            ):
+                if event['type'] == 'done':
+                    event['field_type'] = request.field_type
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as exc:
+            logger.error("generate-questions-stream error: %s", exc)
+            yield f"data: {json.dumps({'type': 'error', 'message': str(exc)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/generate-from-answers", response_model=GenerateFromAnswersResponse, tags=["Guided AI"])
 async def generate_from_answers(request: GenerateFromAnswersRequest):
     """
@@ -584,6 +939,7 @@ async def generate_from_answers(request: GenerateFromAnswersRequest):
     """
     try:
         generator = get_ollama_generator(model=request.model or OLLAMA_MODEL)
+        generator.reset_call_stats()
 
         field_context_dict = None
         if request.field_context:
@@ -618,7 +974,8 @@ async def generate_from_answers(request: GenerateFromAnswersRequest):
             text=text,
             questions_answered=questions_answered,
             questions_total=questions_total,
-            model=request.model or OLLAMA_MODEL
+            model=generator.last_call_stats().get('model') or request.model or OLLAMA_MODEL,
+            **_degradation_fields(generator)
         )
 
     except Exception as e:
@@ -680,22 +1037,46 @@ async def suggest_from_eir(request: SuggestFromEirRequest):
 
     The suggestion is tailored to the specific field and incorporates
     information extracted from the client's EIR document.
+
+    The analysis is referenced by ``analysis_id`` (404 once it has expired:
+    re-send ``analysis_json``) or posted as ``analysis_json``, which is
+    stored and its id returned.
     """
+    store = get_analysis_store()
+    if request.analysis_id:
+        analysis = store.get(request.analysis_id)
+        if analysis is None:
+            raise HTTPException(status_code=404, detail=f"Analysis not found: {request.analysis_id}")
+    elif request.analysis_json is not None:
+        analysis = store.put(request.analysis_json)
+    else:
+        raise HTTPException(status_code=400, detail="analysis_id or analysis_json is required")
+
     try:
         effective_model = request.model or OLLAMA_MODEL
         analyzer = get_analyzer(model=effective_model)
+        analyzer.generator.reset_call_stats()
+        # An explicit client model bypasses complexity routing
+        route = None if request.model else analyzer.route_for_field(request.field_type)
         suggestion = analyzer.suggest_for_field(
-            analysis_json=request.analysis_json,
+            analysis=analysis,
             field_type=request.field_type,
-            partial_text=request.partial_text
+            partial_text=request.partial_text,
+            route=route
         )
 
-        logger.info(f"Generated EIR-based suggestion for {request.field_type}")
+        logger.info(
+            f"Generated EIR-based suggestion for {request.field_type}"
+            f" (route={route.name if route else 'client'})"
+        )
 
         return SuggestFromEirResponse(
             suggestion=suggestion,
             field_type=request.field_type,
-            model=effective_model
+            analysis_id=analysis.analysis_id,
+            model=analyzer.generator.last_call_stats().get('model') or effective_model,
+            route=route.name if route else None,
+            **_degradation_fields(analyzer.generator)
         )
 
     except Exception as e:
@@ -846,6 +1227,7 @@ async def suggest_eir_field(request: SuggestEirFieldRequest):
     try:
         effective_model = request.model or OLLAMA_MODEL
         generator = get_ollama_generator(model=effective_model)
+        generator.reset_call_stats()
 
         field_label = request.field_label or "".join(
             " " + c if c.isupper() else c for c in request.field_name
@@ -857,7 +1239,13 @@ async def suggest_eir_field(request: SuggestEirFieldRequest):
         )
 
         field_guidance = EIR_FIELD_GUIDANCE.get(request.field_name, _EIR_DEFAULT_FIELD_GUIDANCE)
-        use_thinking = request.field_name in COMPLEX_EIR_FIELDS
+        # Complex fields use the thinking-enabled profile with a larger budget
+        workload = 'eir_field_complex' if request.field_name in COMPLEX_EIR_FIELDS else 'eir_field'
+        # Simple fields go to the small model unless the client chose one
+        router = get_model_router()
+        route = None if request.model else router.route(
+            request.field_name, field_guidance, COMPLEX_EIR_FIELDS
+        )
 
         prompt = EIR_FIELD_SUGGEST_PROMPT.format(
             field_name=request.field_name,
@@ -869,21 +1257,28 @@ async def suggest_eir_field(request: SuggestEirFieldRequest):
 
         suggestion = generator.generate_text(
             prompt=prompt,
-            max_length=900 if use_thinking else 600,
-            temperature=0.4,
-            thinking_mode=use_thinking,
+            workload=workload,
+            model=route.model if route else None,
+            thinking_mode=route.thinking if route else None,
         )
+        if route:
+            router.record(route, generator.last_call_stats())
         if isinstance(suggestion, str):
             suggestion = suggestion.strip()
         else:
             suggestion = str(suggestion).strip()
 
-        logger.info(f"Generated EIR authoring suggestion for {request.field_name} (thinking={use_thinking})")
+        logger.info(
+            f"Generated EIR authoring suggestion for {request.field_name} "
+            f"(workload={workload}, route={route.name if route else 'client'})"
+        )
 
         return SuggestEirFieldResponse(
             suggestion=suggestion,
             field_name=request.field_name,
-            model=effective_model,
+            model=generator.last_call_stats().get('model') or effective_model,
+            route=route.name if route else None,
+            **_degradation_fields(generator),
         )
 
     except Exception as e:
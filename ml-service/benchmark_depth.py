@@ -0,0 +1,108 @@
+"""
+Analysis Depth Benchmark for BEP Generator
+
+Analyses a corpus of EIR documents at each analysis depth (quick, standard,
+deep; see ANALYSIS_DEPTHS in eir_analyzer.py) and reports, per depth, the
+mean end-to-end latency (to the template summary), extraction calls and output
+tokens, coverage (share of the EirAnalysis values filled) and recall of
+the deep run's extracted values.
+
+Usage:
+  cd ml-service
+  python benchmark_depth.py                      # built-in sample EIR
+  python benchmark_depth.py a.pdf b.docx c.xlsx [--model qwen3:8b] [--report depth.md]
+
+Prerequisites:
+  - Ollama must be running (ollama serve)
+  - OLLAMA_SMALL_MODEL names the quick depth's small model (else the default model)
+"""
+
+import argparse
+import logging
+import os
+import time
+from statistics import mean
+from typing import Any, Dict, List, Optional
+
+# Every depth must call the LLM, not reuse another depth's cached chunks
+os.environ['EIR_CHUNK_CACHE'] = 'false'
+
+from benchmark_extraction import recall  # noqa: E402
+from benchmark_models import SAMPLE_EIR  # noqa: E402
+from eir_analyzer import ANALYSIS_DEPTHS, EirAnalyzer  # noqa: E402
+from text_extractor import TextExtractor  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+REFERENCE_DEPTH = 'deep'
+
+
+def run_depth(analyzer: EirAnalyzer, text: str, depth: str) -> Dict[str, Any]:
+    """Analyse ``text`` once at ``depth``."""
+    start = time.time()
+    analysis, _ = analyzer.analyze(text, f"benchmark_{depth}", depth=depth)
+    elapsed = time.time() - start
+    stats = analyzer.last_analysis_stats() or {}
+    filled, total = EirAnalyzer._value_coverage(analysis)
+    return {
+        'analysis': analysis,
+        'time_s': elapsed,
+        'calls': stats.get('llm_calls', 0),
+        'output_tokens': stats.get('output_tokens', 0),
+        'coverage': filled / total if total else 0.0,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    recalls = [r['recall'] for r in runs if r.get('recall') is not None]
+    return {
+        'time_s': mean(r['time_s'] for r in runs),
+        'calls': mean(r['calls'] for r in runs),
+        'output_tokens': mean(r['output_tokens'] for r in runs),
+        'coverage': mean(r['coverage'] for r in runs),
+        'recall': mean(recalls) if recalls else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('documents', nargs='*', help='EIR PDF/DOCX/XLSX files (default: built-in sample)')
+    parser.add_argument('--model', help='Ollama model (default: OLLAMA_MODEL)')
+    parser.add_argument('--report', help='Also write the results table to this Markdown file')
+    args = parser.parse_args()
+
+    extractor = TextExtractor()
+    corpus = {path: extractor.extract(file_path=path)[0] for path in args.documents} or {'built-in sample': SAMPLE_EIR}
+    analyzer = EirAnalyzer(model=args.model)
+
+    results: Dict[str, List[Dict[str, Any]]] = {depth: [] for depth in ANALYSIS_DEPTHS}
+    for name, text in corpus.items():
+        print(f"\n  {name} — {len(text)} chars")
+        runs = {depth: run_depth(analyzer, text, depth) for depth in ANALYSIS_DEPTHS}
+        for depth, r in runs.items():
+            r['recall'] = recall(runs[REFERENCE_DEPTH]['analysis'], r['analysis'])
+            results[depth].append(r)
+            print(f"    {depth:<10}{r['time_s']:>8.1f}s{r['calls']:>5} calls{r['coverage']:>7.0%} coverage")
+
+    rows = [
+        "| Depth | Mean latency (s) | Extraction calls | Output tokens | Coverage | Recall of deep |",
+        "|-------|------------------|------------------|---------------|----------|----------------|",
+    ]
+    for depth, runs in results.items():
+        s = summarize(runs)
+        depth_recall = f"{s['recall']:.0%}" if s['recall'] is not None else '-'
+        rows.append(
+            f"| {depth} | {s['time_s']:.1f} | {s['calls']:.1f} | {s['output_tokens']:.0f} | "
+            f"{s['coverage']:.0%} | {depth_recall} |"
+        )
+    print(f"\n  Corpus: {len(corpus)} document(s), model {analyzer.model}\n")
+    print('\n'.join(f"  {row}" for row in rows))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(f"# Analysis depth benchmark\n\nCorpus: {', '.join(corpus)}; model {analyzer.model}\n\n")
+            f.write('\n'.join(rows) + '\n')
+        print(f"\n  Report saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Entity Pre-extraction Benchmark for BEP Generator
+
+Times the rule- and dictionary-based entity extraction (entity_extractor.py)
+on one EIR document. It then analyses the document twice: with the LLM
+filling every field (the baseline) and with pre-extraction, where the LLM
+only generates the narrative fields. For each pre-extracted field it
+compares the items found, and it checks that pre-extraction finds no fewer
+items. It also compares the extraction calls, output/prompt tokens and wall
+time.
+
+Usage:
+  cd ml-service
+  python benchmark_entities.py                   # built-in sample EIR
+  python benchmark_entities.py path/to/eir.pdf [--model qwen3:8b]
+  python benchmark_entities.py --no-llm          # extractor timing only
+
+Prerequisites:
+  - Ollama must be running (ollama serve), unless --no-llm
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Any, Dict
+
+# Both runs must call the LLM, not reuse each other's (or earlier) cached chunks
+os.environ['EIR_CHUNK_CACHE'] = 'false'
+
+from benchmark_models import SAMPLE_EIR  # noqa: E402
+from entity_extractor import PREEXTRACTED_FIELDS, EntityExtractor  # noqa: E402
+from metrics import get_metrics  # noqa: E402
+from text_extractor import TextExtractor  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def field_items(analysis: Dict[str, Any], path) -> int:
+    """Items in a field: list length, 1 for a set flag or value, else 0."""
+    value: Any = analysis
+    for part in path:
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, list):
+        return len(value)
+    return 1 if value else 0
+
+
+def run_analysis(analyzer, text: str, preextraction: bool) -> Dict[str, Any]:
+    """Analyse ``text`` once; token counts come from the eir_extraction_* metrics."""
+    metrics = get_metrics()
+    metrics.reset()
+    analyzer.entity_preextraction = preextraction
+    start = time.time()
+    analysis, _ = analyzer.analyze(text, 'benchmark_entities')
+    elapsed = time.time() - start
+
+    def _total(name: str) -> float:
+        summary = metrics.get_summary(name, mode=analyzer.extraction_mode)
+        return summary['sum'] if summary else 0
+
+    return {
+        'analysis': analysis,
+        'calls': _total('eir_extraction_calls'),
+        'output_tokens': _total('eir_extraction_output_tokens'),
+        'prompt_tokens': _total('eir_extraction_prompt_tokens'),
+        'time_s': round(elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('document', nargs='?', help='EIR PDF/DOCX (default: built-in sample)')
+    parser.add_argument('--model', help='Ollama model (default: OLLAMA_MODEL)')
+    parser.add_argument('--repeat', type=int, default=200, help='Extractor runs to time (default: 200)')
+    parser.add_argument('--no-llm', action='store_true', help='Only time the extractor')
+    args = parser.parse_args()
+
+    text = TextExtractor().extract(file_path=args.document)[0] if args.document else SAMPLE_EIR
+    extractor = EntityExtractor()
+    entities = extractor.extract(text)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        extractor.extract(text)
+    extract_ms = (time.perf_counter() - start) * 1000 / args.repeat
+    print(f"\n  Document: {args.document or 'built-in sample'} — {len(text)} chars")
+    print(f"  Entity extraction: {extract_ms:.2f} ms per document ({args.repeat} runs)")
+    for path in PREEXTRACTED_FIELDS:
+        value: Any = entities
+        for part in path:
+            value = value.get(part)
+        print(f"    {'.'.join(path):<46}{value}")
+    if args.no_llm:
+        return
+
+    from eir_analyzer import EirAnalyzer
+
+    analyzer = EirAnalyzer(model=args.model)
+    baseline = run_analysis(analyzer, text, preextraction=False)
+    preextracted = run_analysis(analyzer, text, preextraction=True)
+
+    print(f"\n  {'field':<46}{'LLM':>6}{'pre-extracted':>15}")
+    fewer = []
+    for path in PREEXTRACTED_FIELDS:
+        name = '.'.join(path)
+        llm_items = field_items(baseline['analysis'], path)
+        pre_items = field_items(preextracted['analysis'], path)
+        if pre_items < llm_items:
+            fewer.append(name)
+        print(f"  {name:<46}{llm_items:>6}{pre_items:>15}")
+
+    print(f"\n  {'run':<16}{'calls':>8}{'output tok':>12}{'prompt tok':>12}{'time s':>9}")
+    for name, r in (('LLM baseline', baseline), ('pre-extraction', preextracted)):
+        print(f"  {name:<16}{r['calls']:>8.0f}{r['output_tokens']:>12.0f}{r['prompt_tokens']:>12.0f}{r['time_s']:>9}")
+    if baseline['output_tokens']:
+        print(f"  pre-extraction: {preextracted['output_tokens'] / baseline['output_tokens']:.0%} of baseline "
+              f"output tokens, {preextracted['time_s'] / max(baseline['time_s'], 0.1):.0%} of its time")
+    print(f"  no fewer items: {not fewer}" + (f" (fewer: {', '.join(fewer)})" if fewer else ''))
+    if fewer:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Extraction Mode Benchmark for BEP Generator
+
+Analyses one EIR document with the monolithic extraction (one call per chunk
+with the full EirAnalysis schema) and the sectioned extraction (focused
+per-section calls, see eir_sections.py) under each chunk routing strategy.
+It compares Ollama calls, output/prompt tokens, wall time and populated
+fields, plus each routing's recall of the full-scan ("all") output.
+
+Usage:
+  cd ml-service
+  python benchmark_extraction.py                 # built-in sample EIR
+  python benchmark_extraction.py path/to/eir.pdf [--model qwen3:8b] [--top-k 4]
+
+Prerequisites:
+  - Ollama must be running (ollama serve)
+"""
+
+import argparse
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from eir_analyzer import EirAnalysis, EirAnalyzer
+from eir_sections import SECTION_ROUTINGS, route_sections
+from metrics import get_metrics
+from text_extractor import TextExtractor
+from benchmark_models import SAMPLE_EIR, count_populated_fields
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+logging.basicConfig(level=logging.WARNING)
+
+RECALL_MATCH_THRESHOLD = 85
+
+# (extraction mode, section routing) pairs; "all" first as the recall reference
+RUNS: List[Tuple[str, Optional[str]]] = [
+    ('monolithic', None),
+    ('sectioned', 'all'),
+    *[('sectioned', routing) for routing in SECTION_ROUTINGS if routing != 'all'],
+]
+
+
+def run_mode(analyzer: EirAnalyzer, text: str, mode: str, routing: Optional[str]) -> Dict[str, Any]:
+    """Analyse ``text`` once; token counts come from the eir_extraction_* metrics."""
+    metrics = get_metrics()
+    metrics.reset()
+    if routing:
+        analyzer.section_routing = routing
+    start = time.time()
+    analysis, _ = analyzer.analyze(text, f"benchmark_{mode}", extraction_mode=mode)
+    elapsed = time.time() - start
+
+    def _total(name: str) -> Optional[float]:
+        summary = metrics.get_summary(name, mode=mode)
+        return summary['sum'] if summary else None
+
+    return {
+        'analysis': analysis,
+        'calls': _total('eir_extraction_calls'),
+        'output_tokens': _total('eir_extraction_output_tokens'),
+        'prompt_tokens': _total('eir_extraction_prompt_tokens'),
+        'time_s': round(elapsed, 1),
+        'fields_populated': count_populated_fields(analysis),
+    }
+
+
+def extracted_items(analysis: Dict[str, Any], path: str = '') -> Set[Tuple[str, str]]:
+    """Every extracted string value as ``(field path, normalized text)``."""
+    items: Set[Tuple[str, str]] = set()
+    if isinstance(analysis, dict):
+        for key, value in analysis.items():
+            items |= extracted_items(value, f"{path}.{key}" if path else key)
+    elif isinstance(analysis, list):
+        for value in analysis:
+            items |= extracted_items(value, path)
+    elif isinstance(analysis, str) and analysis.strip():
+        items.add((path, re.sub(r'\s+', ' ', analysis.strip().lower())))
+    return items
+
+
+def recall(reference: Dict[str, Any], candidate: Dict[str, Any]) -> Optional[float]:
+    """Share of the reference's extracted values also found (fuzzily) at the same path in the candidate."""
+    ref_items = extracted_items(reference)
+    if not ref_items:
+        return None
+    cand_by_path: Dict[str, List[str]] = {}
+    for path, value in extracted_items(candidate):
+        cand_by_path.setdefault(path, []).append(value)
+    found = 0
+    for path, value in ref_items:
+        options = cand_by_path.get(path, [])
+        if value in options or (fuzz and any(fuzz.ratio(value, o) >= RECALL_MATCH_THRESHOLD for o in options)):
+            found += 1
+    return found / len(ref_items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('document', nargs='?', help='EIR PDF/DOCX (default: built-in sample)')
+    parser.add_argument('--model', help='Ollama model (default: OLLAMA_MODEL)')
+    parser.add_argument('--top-k', type=int, help='Chunks per section for bm25 routing (default: EIR_SECTION_TOP_K)')
+    args = parser.parse_args()
+
+    text = TextExtractor().extract(file_path=args.document)[0] if args.document else SAMPLE_EIR
+    analyzer = EirAnalyzer(model=args.model)
+    if args.top_k:
+        analyzer.section_top_k = args.top_k
+    chunks = analyzer._split_chunks(text) if len(text) > analyzer.single_pass_char_limit else [text]
+    print(f"\n  Document: {args.document or 'built-in sample'} — {len(text)} chars, {len(chunks)} chunk(s)")
+    for routing in SECTION_ROUTINGS:
+        routes = route_sections(chunks, routing, analyzer.section_top_k, EirAnalysis)
+        print(f"  {routing} routes: " + ', '.join(f"{name}={len(idxs)}" for name, idxs in routes.items()))
+
+    results = {(mode, routing): run_mode(analyzer, text, mode, routing) for mode, routing in RUNS}
+    reference = results[('sectioned', 'all')]['analysis']
+
+    print(f"\n  {'run':<22}{'calls':>8}{'output tok':>12}{'prompt tok':>12}{'time s':>9}{'fields':>8}{'recall':>8}")
+    for (mode, routing), r in results.items():
+        name = f"{mode}/{routing}" if routing else mode
+        run_recall = recall(reference, r['analysis']) if routing else None
+        print(f"  {name:<22}{r['calls'] or 0:>8.0f}{r['output_tokens'] or 0:>12.0f}{r['prompt_tokens'] or 0:>12.0f}"
+              f"{r['time_s']:>9}{r['fields_populated']:>8}"
+              f"{f'{run_recall:.0%}' if run_recall is not None else '-':>8}")
+
+    base = results[('monolithic', None)]
+    for (mode, routing), r in results.items():
+        if routing and base['output_tokens'] and r['output_tokens'] is not None:
+            print(f"  {mode}/{routing}: {r['output_tokens'] / base['output_tokens']:.0%} of monolithic output tokens, "
+                  f"{(r['prompt_tokens'] or 0) / (base['prompt_tokens'] or 1):.0%} of its prompt tokens")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Chunk Merge Benchmark for BEP Generator
+
+Merges 200 synthetic chunk analyses (repeated and slightly reworded items, as
+chunked extraction produces) with ``EirAnalyzer._merge_analyses``. It times
+the batch deduplication (fuzzy_dedup.py) against the previous per-item
+pairwise ``fuzz.ratio`` loop, and checks that both give identical results.
+
+It also times the response pipeline, from the raw model responses to the
+final analysis and the streamed partials. Each chunk is validated once at
+parse time, and the merge sanitizes in place. The comparison adds back the
+former extra passes: an intermediate ``json.loads``, re-validation of the
+merged result, a second sanitize in ``analyze()``, and a deep copy plus
+sanitize per streamed partial.
+
+Usage:
+  cd ml-service
+  python benchmark_merge.py [--chunks 200] [--seed 7]
+
+No Ollama needed.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import fuzzy_dedup
+from eir_analyzer import EirAnalysis, EirAnalyzer
+
+logging.basicConfig(level=logging.WARNING)
+
+PHRASES = [
+    "federated model shall be issued at each stage gate",
+    "clash detection to be performed weekly on the coordination model",
+    "asset information model to include maintenance data for all plant",
+    "COBie deliverables at handover in accordance with the client schedule",
+    "Uniclass 2015 classification applied to all model elements",
+    "file naming to follow BS EN ISO 19650-2 national annex",
+    "IFC 4 exchange of native models at every data drop",
+    "information manager to maintain the master information delivery plan",
+    "task team managers to review models before sharing",
+    "security minded approach in accordance with ISO 19650-5",
+    "space data including room numbers and areas",
+    "fire strategy information linked to the asset register",
+    "model progression aligned with RIBA plan of work stages",
+    "point cloud survey of existing structure to be provided",
+    "design risk register maintained in the CDE",
+]
+QUALIFIERS = ["", " for the main building", " for external works", " for MEP systems",
+              " for the car park", " for the landscape package", " for the substructure"]
+ROLES = ["Information Manager", "Lead Appointed Party", "BIM Coordinator", "Task Team Manager",
+         "Design Lead", "CDE Administrator", "Asset Manager", "Principal Designer"]
+PHASES = ["Stage 2 Concept", "Stage 3 Spatial Coordination", "Stage 4 Technical Design",
+          "Stage 5 Manufacturing", "Stage 6 Handover", "Stage 7 Use"]
+
+
+def _variant(rng: random.Random, text: str) -> str:
+    """The text as another chunk might phrase it: case, punctuation, a typo."""
+    roll = rng.random()
+    if roll < 0.3:
+        return text
+    if roll < 0.5:
+        return text.capitalize() + '.'
+    if roll < 0.7:
+        i = rng.randrange(len(text))
+        return text[:i] + text[i + 1:]
+    return text.upper() if roll < 0.75 else text.replace(' the ', ' a ')
+
+
+def _items(rng: random.Random, count: int) -> List[str]:
+    return [_variant(rng, rng.choice(PHRASES) + rng.choice(QUALIFIERS)) for _ in range(count)]
+
+
+def synthetic_analyses(count: int, seed: int) -> List[Dict[str, Any]]:
+    """``count`` chunk analyses shaped like ``EirAnalysis.model_dump()``."""
+    rng = random.Random(seed)
+    analyses = []
+    for _ in range(count):
+        analyses.append({
+            'project_info': {'name': 'Riverside Hospital', 'client': rng.choice([None, 'NHS Trust'])},
+            'bim_objectives': _items(rng, 6),
+            'information_requirements': {key: _items(rng, 4) for key in ('OIR', 'AIR', 'PIR', 'EIR_specifics')},
+            'delivery_milestones': [
+                {'phase': _variant(rng, rng.choice(PHASES)), 'description': 'Information exchange'}
+                for _ in range(3)
+            ],
+            'standards_protocols': {'classification_systems': _items(rng, 2), 'file_formats': ['IFC 4', 'PDF']},
+            'cde_requirements': {'platform': 'Aconex', 'workflow_states': ['WIP', 'Shared', 'Published']},
+            'roles_responsibilities': [
+                {'role': _variant(rng, rng.choice(ROLES)), 'responsibilities': _items(rng, 2)}
+                for _ in range(3)
+            ],
+            'software_requirements': ['Revit 2024', 'Navisworks', 'Solibri'],
+            'specific_risks': _items(rng, 3),
+            'other_requirements': _items(rng, 4),
+            'training_requirements': {'required_certifications': _items(rng, 1),
+                                      'project_specific_training': _items(rng, 2)},
+            'information_protocols': {'exchange_events': _items(rng, 2), 'collaboration_meetings': _items(rng, 2)},
+            'loin_requirements': [
+                {'stage': rng.choice(PHASES), 'discipline': f"Discipline {rng.randrange(40)}",
+                 'lod': 'LOD 300', 'loi': 'LOI 3', 'notes': 'Geometry and data per the LOIN matrix'}
+                for _ in range(25)
+            ],
+        })
+    return analyses
+
+
+def pairwise_dedupe(items: List[Any], threshold: int, key: Optional[Callable[[Any], Any]] = None,
+                    existing: Optional[List[Any]] = None) -> List[Any]:
+    """The previous merge rule: each item against every kept item, one ``fuzz.ratio`` call per pair."""
+    kept = list(existing or [])
+    added = []
+    for item in items:
+        text = key(item) if key else item
+        if not key and not item:
+            continue
+        duplicate = False
+        if text and isinstance(text, str):
+            for other in kept:
+                other_text = key(other) if key else other
+                if other_text and isinstance(other_text, str) and \
+                        fuzzy_dedup.fuzz.ratio(text.lower(), other_text.lower()) >= threshold:
+                    duplicate = True
+                    break
+        if not duplicate:
+            kept.append(item)
+            added.append(item)
+    return added
+
+
+def best_time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_merge(analyzer: EirAnalyzer, analyses: List[Dict[str, Any]], repeat: int) -> float:
+    return best_time(lambda: analyzer._merge_analyses(analyses), repeat)
+
+
+def pipeline(analyzer: EirAnalyzer, responses: List[str], partials: int) -> Dict[str, Any]:
+    """Raw chunk responses to the final analysis, plus ``partials`` streamed partial merges."""
+    parsed = [analyzer._parse_json_response(r) for r in responses]
+    for n in range(1, partials + 1):
+        analyzer._merge_analyses(parsed[:n])
+    return analyzer._merge_analyses(parsed)
+
+
+def former_pipeline(analyzer: EirAnalyzer, responses: List[str], partials: int) -> Dict[str, Any]:
+    """``pipeline`` with the former extra validation, copy and sanitize passes."""
+    parsed = [EirAnalysis.model_validate(json.loads(r), strict=False).model_dump() for r in responses]
+    for n in range(1, partials + 1):
+        analyzer._sanitize_analysis(copy.deepcopy(analyzer._merge_analyses(parsed[:n])))
+    merged = analyzer._merge_analyses(parsed)
+    EirAnalysis.model_validate(merged, strict=False).model_dump()
+    return analyzer._sanitize_analysis(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=200, help='Chunk analyses to merge (default: 200)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per variant; the best is reported')
+    parser.add_argument('--partials', type=int, default=50,
+                        help='Streamed partial merges in the pipeline timing (default: 50)')
+    args = parser.parse_args()
+
+    if not fuzzy_dedup.HAS_RAPIDFUZZ:
+        raise SystemExit("rapidfuzz and numpy are required for this benchmark")
+
+    # Merging needs no Ollama connection
+    analyzer = EirAnalyzer.__new__(EirAnalyzer)
+    analyses = synthetic_analyses(args.chunks, args.seed)
+    items = sum(len(v) for a in analyses for v in a.values() if isinstance(v, list))
+    print(f"\n  Merging {len(analyses)} chunk analyses ({items}+ top-level list items)")
+
+    batch = analyzer._merge_analyses(analyses)
+    batch_s = time_merge(analyzer, analyses, args.repeat)
+
+    fuzzy_dedup.dedupe, batch_dedupe = pairwise_dedupe, fuzzy_dedup.dedupe
+    try:
+        pairwise = analyzer._merge_analyses(analyses)
+        pairwise_s = time_merge(analyzer, analyses, args.repeat)
+    finally:
+        fuzzy_dedup.dedupe = batch_dedupe
+
+    print(f"  pairwise fuzz.ratio: {pairwise_s * 1000:9.1f} ms")
+    print(f"  batch cdist:         {batch_s * 1000:9.1f} ms  ({pairwise_s / batch_s:.1f}x)")
+    print(f"  identical result:    {batch == pairwise}")
+
+    responses = [json.dumps(analysis) for analysis in analyses]
+    partials = min(args.partials, len(analyses))
+    current = pipeline(analyzer, responses, partials)
+    former = former_pipeline(analyzer, responses, partials)
+    current_s = best_time(lambda: pipeline(analyzer, responses, partials), args.repeat)
+    former_s = best_time(lambda: former_pipeline(analyzer, responses, partials), args.repeat)
+    print(f"\n  Response pipeline ({len(responses)} chunk responses, {partials} streamed partials)")
+    print(f"  former passes:       {former_s * 1000:9.1f} ms")
+    print(f"  single validation:   {current_s * 1000:9.1f} ms  ({former_s / current_s:.1f}x)")
+    print(f"  identical result:    {current == former}")
+    if batch != pairwise or current != former:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
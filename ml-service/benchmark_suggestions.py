@@ -0,0 +1,126 @@
+"""
+Suggestion Context Benchmark for BEP Generator
+
+Generates EIR-based suggestions for a set of BEP fields twice: with the whole
+analysis in the prompt and with the field-scoped context (the field's
+FIELD_MAPPING section plus project_info, see EirAnalyzer.context_sections).
+Reports per field the prompt tokens and time to first token (model load plus
+prompt evaluation, as Ollama reports it) of both, and the means.
+
+Every field is given a short draft, so mapped fields are generated rather
+than answered by direct extraction.
+
+Both prompts of a field share their leading text, and Ollama reuses the
+evaluated prefix of the previous prompt, so whichever runs second would
+report too few prompt tokens and too short a TTFT. Each measured run is
+therefore preceded by an unrelated prompt that evicts that prefix, and the
+order of the two runs alternates between fields.
+
+Usage:
+  cd ml-service
+  python benchmark_suggestions.py                      # analyses the built-in sample EIR
+  python benchmark_suggestions.py eir.pdf [--analysis analysis.json] [--model qwen3:8b] [--report ctx.md]
+
+Prerequisites:
+  - Ollama must be running (ollama serve)
+"""
+
+import argparse
+import json
+import logging
+import os
+from statistics import mean
+from typing import Dict, List, Optional
+
+# Both runs must reach the LLM
+os.environ['EIR_CHUNK_CACHE'] = 'false'
+
+from analysis_store import get_analysis_store  # noqa: E402
+from benchmark_models import SAMPLE_EIR  # noqa: E402
+from eir_analyzer import EirAnalyzer  # noqa: E402
+from text_extractor import TextExtractor  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+
+FIELDS = [
+    'fileFormats', 'bimSoftware', 'classificationSystems', 'keyMilestones', 'cdeStrategy',
+    'qualityAssurance', 'handoverRequirements', 'namingConventions', 'informationRisks',
+    'projectDescription', 'executiveSummary',
+]
+DRAFT = "Draft to be completed."
+FLUSH_PROMPT = "Reply with the single word: ok."
+
+
+def run_field(analyzer: EirAnalyzer, analysis, field: str, scoped: bool) -> Dict[str, Optional[float]]:
+    analyzer.field_scoped_context = scoped
+    analyzer.generator.generate_text(FLUSH_PROMPT, max_length=4)  # evict the cached prompt prefix
+    analyzer.generator.reset_call_stats()
+    analyzer.suggest_for_field(analysis, field, partial_text=DRAFT)
+    stats = analyzer.generator.last_call_stats()
+    return {'prompt_tokens': stats.get('prompt_tokens'), 'ttft_ms': stats.get('ttft_ms')}
+
+
+def _mean(runs: List[Dict[str, Optional[float]]], key: str) -> Optional[float]:
+    values = [r[key] for r in runs if r[key] is not None]
+    return mean(values) if values else None
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return format(value, spec) if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('document', nargs='?', help='EIR PDF/DOCX/XLSX (default: built-in sample)')
+    parser.add_argument('--analysis', help='Use this analysis JSON instead of analysing the document')
+    parser.add_argument('--model', help='Ollama model (default: OLLAMA_MODEL)')
+    parser.add_argument('--report', help='Also write the results table to this Markdown file')
+    args = parser.parse_args()
+
+    analyzer = EirAnalyzer(model=args.model)
+    if args.analysis:
+        with open(args.analysis, 'r', encoding='utf-8') as f:
+            analysis_json = json.load(f)
+    else:
+        text = TextExtractor().extract(file_path=args.document)[0] if args.document else SAMPLE_EIR
+        analysis_json, _ = analyzer.analyze(text, args.document or 'benchmark_sample', depth='quick')
+    analysis = get_analysis_store().put(analysis_json)
+
+    rows = [
+        "| Field | Context sections | Prompt tokens (full) | Prompt tokens (field) | TTFT ms (full) | TTFT ms (field) |",
+        "|-------|------------------|----------------------|-----------------------|----------------|-----------------|",
+    ]
+    full_runs, field_runs = [], []
+    for i, field in enumerate(FIELDS):
+        if i % 2:
+            scoped = run_field(analyzer, analysis, field, scoped=True)
+            full = run_field(analyzer, analysis, field, scoped=False)
+        else:
+            full = run_field(analyzer, analysis, field, scoped=False)
+            scoped = run_field(analyzer, analysis, field, scoped=True)
+        full_runs.append(full)
+        field_runs.append(scoped)
+        sections = EirAnalyzer.context_sections(field)
+        rows.append(
+            f"| {field} | {', '.join(sections) if sections else 'all'} | "
+            f"{_fmt(full['prompt_tokens'], '.0f')} | {_fmt(scoped['prompt_tokens'], '.0f')} | "
+            f"{_fmt(full['ttft_ms'], '.0f')} | {_fmt(scoped['ttft_ms'], '.0f')} |"
+        )
+        print(f"  {field:<24}{_fmt(full['prompt_tokens'], '>6.0f')} -> {_fmt(scoped['prompt_tokens'], '.0f')} prompt tokens")
+    rows.append(
+        f"| **mean** | | {_fmt(_mean(full_runs, 'prompt_tokens'), '.0f')} | "
+        f"{_fmt(_mean(field_runs, 'prompt_tokens'), '.0f')} | {_fmt(_mean(full_runs, 'ttft_ms'), '.0f')} | "
+        f"{_fmt(_mean(field_runs, 'ttft_ms'), '.0f')} |"
+    )
+
+    print(f"\n  Model {analyzer.model}, analysis {analysis.analysis_id}\n")
+    print('\n'.join(f"  {row}" for row in rows))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(f"# Suggestion context benchmark\n\nModel {analyzer.model}\n\n")
+            f.write('\n'.join(rows) + '\n')
+        print(f"\n  Report saved to: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
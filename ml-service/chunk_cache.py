@@ -0,0 +1,158 @@
+"""
+Chunk Cache Module
+
+Persistent cache of per-chunk EIR extraction results, keyed by chunk content
+hash, model and prompt version. Clients re-issue EIRs with small revisions
+(rev B, rev C). Content-defined chunk boundaries
+(``TextExtractor.chunk_text_content_defined``) keep unchanged passages in
+identical chunks. A re-analysis therefore only sends the changed chunks to
+Ollama, and the rest come from this cache before the merge.
+
+The prompt version is a hash of the prompt template, the output schema and
+the workload's thinking setting. Editing a prompt or the EirAnalysis model
+therefore invalidates old entries without a manual flush. Only successful
+extractions are stored. Entries are evicted least-recently-used beyond
+EIR_CHUNK_CACHE_MAX_ENTRIES.
+
+Configuration:
+    - EIR_CHUNK_CACHE: "false" disables the cache (default: enabled)
+    - EIR_CHUNK_CACHE_DB: path of the SQLite database
+      (default: ml-service/state/eir_chunk_cache.sqlite3; use a persistent volume)
+    - EIR_CHUNK_CACHE_MAX_ENTRIES: entries kept (default: 20000)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / 'state' / 'eir_chunk_cache.sqlite3'
+PRUNE_EVERY = 100  # puts between size checks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunk_analysis_cache (
+    chunk_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    analysis_json TEXT NOT NULL,
+    latency_s REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    PRIMARY KEY (chunk_hash, model, prompt_version)
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_cache_last_used ON chunk_analysis_cache (last_used_at);
+"""
+
+
+def prompt_version(*parts: Any) -> str:
+    """Short stable hash of a prompt template, its schema and generation settings."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ChunkAnalysisCache:
+    """Thread-safe SQLite cache of chunk extraction results."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = str(path or os.getenv('EIR_CHUNK_CACHE_DB', '').strip() or DEFAULT_DB_PATH)
+        try:
+            self.max_entries = max_entries or max(100, int(os.getenv('EIR_CHUNK_CACHE_MAX_ENTRIES', '20000')))
+        except ValueError:
+            logger.warning("Invalid EIR_CHUNK_CACHE_MAX_ENTRIES, using 20000")
+            self.max_entries = 20000
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        self._puts_since_prune = 0
+        logger.info(f"Chunk analysis cache opened at {self.path}")
+
+    def get(self, chunk_hash: str, model: str, version: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """``(analysis, original latency in seconds)``, or None on a miss."""
+        key = (chunk_hash, model, version)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT analysis_json, latency_s FROM chunk_analysis_cache '
+                    'WHERE chunk_hash = ? AND model = ? AND prompt_version = ?', key
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        'UPDATE chunk_analysis_cache SET last_used_at = ? '
+                        'WHERE chunk_hash = ? AND model = ? AND prompt_version = ?', (time.time(), *key)
+                    )
+                    self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Chunk cache read failed: {e}")
+            row = None
+        get_metrics().inc('eir_chunk_cache_lookups_total', result='hit' if row else 'miss')
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, chunk_hash: str, model: str, version: str, analysis: Dict[str, Any], latency_s: float) -> None:
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO chunk_analysis_cache '
+                    '(chunk_hash, model, prompt_version, analysis_json, latency_s, created_at, last_used_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (chunk_hash, model, version, json.dumps(analysis), latency_s, now, now)
+                )
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= PRUNE_EVERY:
+                    self._puts_since_prune = 0
+                    self._prune()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            # A lost entry only costs a re-analysis
+            logger.warning(f"Chunk cache write failed: {e}")
+
+    def _prune(self) -> None:
+        """Drop least recently used entries beyond max_entries (lock held)."""
+        self._conn.execute(
+            'DELETE FROM chunk_analysis_cache WHERE rowid IN ('
+            '  SELECT rowid FROM chunk_analysis_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?'
+            ')', (self.max_entries,)
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM chunk_analysis_cache').fetchone()[0]
+        return {'path': self.path, 'entries': entries, 'max_entries': self.max_entries}
+
+
+# Module-level singleton
+_cache: Optional[ChunkAnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chunk_cache() -> Optional[ChunkAnalysisCache]:
+    """Get or create the singleton ChunkAnalysisCache, or None when disabled."""
+    global _cache
+    if os.getenv('EIR_CHUNK_CACHE', 'true').strip().lower() in ('0', 'false', 'no', 'off'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ChunkAnalysisCache()
+                except sqlite3.Error as e:
+                    logger.warning(f"Chunk analysis cache unavailable: {e}")
+                    return None
+                get_metrics().register_collector('eir_chunk_cache', _cache.describe)
+    return _cache
@@ -0,0 +1,144 @@
+"""
+Chunk Index Module
+
+Local lexical retrieval over the chunks of one EIR document. It is built at
+analysis time, so sectioned extraction (eir_sections.py) sends each section
+only the top-k chunks that score for it. On a 100+ page EIR, boilerplate
+chunks (contents, legal terms, revision tables) then cost no LLM calls.
+
+Scoring is BM25 (Okapi) over a simple tokenizer: lowercase alphanumerics,
+light plural folding and a small stopword list. The ISO 19650 glossary
+(data/iso19650_glossary.json) seeds the vocabulary. Wherever the full name
+(or a multi-word alias) of a glossary term occurs, its concept token is also
+indexed. "Common Data
+Environment" is then indexed as ``cde``, and "Level of Information Need" as
+``level_of_information_need``. Queries that use either form therefore match.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GLOSSARY_PATH = Path(__file__).parent / 'data' / 'iso19650_glossary.json'
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on',
+    'or', 'shall', 'should', 'that', 'the', 'this', 'to', 'will', 'with', 'must', 'all', 'any',
+})
+
+_glossary_phrases: Optional[List[Tuple[Tuple[str, ...], str]]] = None
+_glossary_lock = threading.Lock()
+
+
+def _fold(token: str) -> str:
+    """Light plural folding: requirements -> requirement, but not class -> clas."""
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, plural-folded word tokens without stopwords."""
+    return [_fold(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def glossary_concept(term: str) -> str:
+    """Concept token of a glossary key, e.g. ``CDE`` -> ``cde``, ``Task_Team`` -> ``task_team``."""
+    return term.lower()
+
+
+def glossary_phrases() -> List[Tuple[Tuple[str, ...], str]]:
+    """``(full-name tokens, concept token)`` for every glossary term, longest phrases first."""
+    global _glossary_phrases
+    if _glossary_phrases is None:
+        with _glossary_lock:
+            if _glossary_phrases is None:
+                phrases = []
+                try:
+                    with open(DEFAULT_GLOSSARY_PATH, 'r', encoding='utf-8') as f:
+                        terms = json.load(f).get('terms', {})
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not load ISO 19650 glossary for chunk retrieval: {e}")
+                    terms = {}
+                for key, entry in terms.items():
+                    for name in {entry.get('full_name') or '', key.replace('_', ' '), *(entry.get('aliases') or [])}:
+                        tokens = tuple(tokenize(name))
+                        if len(tokens) > 1:
+                            phrases.append((tokens, glossary_concept(key)))
+                phrases.sort(key=lambda p: -len(p[0]))
+                _glossary_phrases = phrases
+    return _glossary_phrases
+
+
+def _with_concepts(tokens: List[str], phrases: Sequence[Tuple[Tuple[str, ...], str]]) -> List[str]:
+    """Append the concept token of every glossary phrase occurring in ``tokens``."""
+    if not phrases:
+        return tokens
+    starts: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+    for phrase, concept in phrases:
+        starts.setdefault(phrase[0], []).append((phrase, concept))
+    concepts = []
+    for i, token in enumerate(tokens):
+        for phrase, concept in starts.get(token, ()):
+            if tuple(tokens[i:i + len(phrase)]) == phrase:
+                concepts.append(concept)
+                break
+    return tokens + concepts
+
+
+class ChunkIndex:
+    """BM25 index over the chunks of one document."""
+
+    def __init__(self, chunks: Sequence[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        phrases = glossary_phrases()
+        self._term_freqs: List[Counter] = []
+        self._lengths: List[int] = []
+        doc_freq: Counter = Counter()
+        for chunk in chunks:
+            tokens = _with_concepts(tokenize(chunk), phrases)
+            freqs = Counter(tokens)
+            self._term_freqs.append(freqs)
+            self._lengths.append(len(tokens))
+            doc_freq.update(freqs.keys())
+        n = len(self._term_freqs)
+        self._avg_length = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._term_freqs)
+
+    def scores(self, query: Iterable[str]) -> List[float]:
+        """BM25 score of every chunk for the (already tokenized) query terms."""
+        terms = [t for t in set(query) if t in self._idf]
+        results = []
+        for freqs, length in zip(self._term_freqs, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+    def top_k(self, query: Iterable[str], k: int) -> List[int]:
+        """Indexes of the ``k`` best-scoring chunks with a positive score, in document order."""
+        scores = self.scores(query)
+        ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: -scores[i])
+        return sorted(ranked[:k])
@@ -0,0 +1,228 @@
+"""
+Adaptive Concurrency Module
+
+AIMD (additive increase, multiplicative decrease) limit on the number of EIR
+analysis calls sent to Ollama at once. The limit is shared by every analysis
+in flight, so two concurrent uploads do not each assume they own the GPU.
+
+Slots are handed out fairly between owners (one per analysed document): a
+freed slot goes to a waiting owner with the fewest calls in flight, so a
+40-chunk EIR cannot starve a 2-chunk one that arrives after it.
+
+Work starts immediately at EIR_INITIAL_CONCURRENCY. After every chunk:
+    - latency and tokens/s close to their running baseline -> limit += 1/limit
+      (about +1 per round of ``limit`` chunks)
+    - latency well above baseline (or above EIR_AUTO_CONCURRENCY_LATENCY),
+      or tokens/s well below it                             -> limit *= 0.7
+    - timeout or failure                                     -> limit *= 0.5
+Decreases are applied at most once per round so a burst of slow chunks from
+the same overload does not collapse the limit to 1.
+
+The current limit, in-flight count and adjustments are exported via
+``GET /metrics`` (``eir_concurrency_limit`` gauge and ``eir_concurrency``).
+
+Configuration:
+    - OLLAMA_MAX_CONCURRENCY: upper bound (default/"auto": min(cpu_count, 6))
+    - EIR_INITIAL_CONCURRENCY: starting limit (default: 2)
+    - EIR_AUTO_CONCURRENCY_LATENCY: per-chunk seconds counted as a slowdown
+      regardless of the baseline (default: 60)
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Optional
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+SLOWDOWN_LATENCY_RATIO = 1.5    # latency this far above baseline is a slowdown
+SLOWDOWN_THROUGHPUT_RATIO = 0.6  # tokens/s this far below baseline is a slowdown
+SLOWDOWN_BACKOFF = 0.7
+FAILURE_BACKOFF = 0.5
+BASELINE_ALPHA = 0.2
+
+
+class ConcurrencyAcquireCancelled(Exception):
+    """Raised when waiting for a slot is abandoned because the work was cancelled."""
+
+
+def _env_int(name: str, default: int, min_value: int, max_value: int) -> int:
+    value = os.getenv(name, '').strip().lower()
+    if not value or value == 'auto':
+        return default
+    try:
+        return max(min_value, min(max_value, int(value)))
+    except ValueError:
+        logger.warning(f"Invalid {name} value '{value}', using default {default}")
+        return default
+
+
+class AimdConcurrencyLimiter:
+    """Shared AIMD concurrency limit with blocking slot acquisition."""
+
+    def __init__(self, max_limit: Optional[int] = None, initial_limit: Optional[int] = None,
+                 latency_ceiling_s: Optional[float] = None):
+        cpu_default = min(os.cpu_count() or 4, 6)
+        self.max_limit = max_limit or _env_int('OLLAMA_MAX_CONCURRENCY', cpu_default, 1, 16)
+        self.min_limit = 1
+        initial = initial_limit or _env_int('EIR_INITIAL_CONCURRENCY', 2, 1, 16)
+        self.latency_ceiling_s = latency_ceiling_s or _env_int('EIR_AUTO_CONCURRENCY_LATENCY', 60, 20, 180)
+
+        self._cond = threading.Condition()
+        self._limit = float(max(self.min_limit, min(self.max_limit, initial)))
+        self._in_flight = 0
+        self._owner_in_flight: Dict[Hashable, int] = {}
+        self._owner_waiting: Dict[Hashable, int] = {}
+        self._baseline_latency_s: Optional[float] = None
+        self._baseline_tps: Optional[float] = None
+        self._completions_since_decrease = 0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    def _publish(self) -> None:
+        get_metrics().set_gauge('eir_concurrency_limit', int(self._limit))
+        get_metrics().set_gauge('eir_concurrency_in_flight', self._in_flight)
+
+    def _may_proceed(self, owner: Hashable) -> bool:
+        """Capacity is free and no other waiting owner has fewer calls in flight."""
+        if self._in_flight >= int(self._limit):
+            return False
+        mine = self._owner_in_flight.get(owner, 0)
+        return all(
+            mine <= self._owner_in_flight.get(other, 0)
+            for other in self._owner_waiting if other != owner
+        )
+
+    @contextmanager
+    def slot(self, cancel_event: Optional[threading.Event] = None, owner: Hashable = None):
+        """
+        Hold one concurrency slot for the duration of the block.
+
+        Args:
+            cancel_event: Abandon waiting when set
+            owner: Fair-share key, e.g. one per analysed document
+
+        Raises:
+            ConcurrencyAcquireCancelled: ``cancel_event`` was set while waiting.
+        """
+        with self._cond:
+            self._owner_waiting[owner] = self._owner_waiting.get(owner, 0) + 1
+            try:
+                while not self._may_proceed(owner):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ConcurrencyAcquireCancelled()
+                    self._cond.wait(timeout=1.0)
+            finally:
+                self._owner_waiting[owner] -= 1
+                if not self._owner_waiting[owner]:
+                    del self._owner_waiting[owner]
+                # Our leaving may let another owner through
+                self._cond.notify_all()
+            self._in_flight += 1
+            self._owner_in_flight[owner] = self._owner_in_flight.get(owner, 0) + 1
+            self._publish()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._owner_in_flight[owner] -= 1
+                if not self._owner_in_flight[owner]:
+                    del self._owner_in_flight[owner]
+                self._publish()
+                self._cond.notify_all()
+
+    def record(self, latency_s: float, eval_tokens: Optional[int] = None, ok: bool = True) -> None:
+        """Adjust the limit from the outcome of one chunk analysis."""
+        tps = eval_tokens / latency_s if ok and eval_tokens and latency_s > 0 else None
+        with self._cond:
+            previous = self._limit
+            self._completions_since_decrease += 1
+            # One decrease per round: completions from before the last cut
+            # reflect the old, higher limit
+            may_decrease = self._completions_since_decrease >= max(1, int(self._limit))
+
+            if not ok:
+                if may_decrease:
+                    self._decrease(FAILURE_BACKOFF, 'failure')
+            elif self._is_slowdown(latency_s, tps):
+                if may_decrease:
+                    self._decrease(SLOWDOWN_BACKOFF, 'slowdown')
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+                if int(self._limit) > int(previous):
+                    get_metrics().inc('eir_concurrency_adjustments_total', direction='increase')
+
+            if ok:
+                self._update_baseline(latency_s, tps)
+            if int(self._limit) != int(previous):
+                logger.info(
+                    f"EIR concurrency limit {int(previous)} -> {int(self._limit)} "
+                    f"(chunk {latency_s:.1f}s, {f'{tps:.1f} tok/s' if tps else 'no throughput'}, ok={ok})"
+                )
+                self._publish()
+                self._cond.notify_all()
+
+    def _is_slowdown(self, latency_s: float, tps: Optional[float]) -> bool:
+        if latency_s > self.latency_ceiling_s:
+            return True
+        if self._baseline_latency_s and latency_s > self._baseline_latency_s * SLOWDOWN_LATENCY_RATIO:
+            return True
+        if tps and self._baseline_tps and tps < self._baseline_tps * SLOWDOWN_THROUGHPUT_RATIO:
+            return True
+        return False
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        self._completions_since_decrease = 0
+        get_metrics().inc('eir_concurrency_adjustments_total', direction='decrease', reason=reason)
+
+    def _update_baseline(self, latency_s: float, tps: Optional[float]) -> None:
+        if self._baseline_latency_s is None:
+            self._baseline_latency_s = latency_s
+        else:
+            self._baseline_latency_s += BASELINE_ALPHA * (latency_s - self._baseline_latency_s)
+        if tps:
+            if self._baseline_tps is None:
+                self._baseline_tps = tps
+            else:
+                self._baseline_tps += BASELINE_ALPHA * (tps - self._baseline_tps)
+
+    def describe(self) -> Dict[str, Any]:
+        """Current limit and baselines (published via /metrics)."""
+        with self._cond:
+            return {
+                'limit': int(self._limit),
+                'limit_exact': round(self._limit, 3),
+                'in_flight': self._in_flight,
+                'owners_in_flight': len(self._owner_in_flight),
+                'owners_waiting': len(self._owner_waiting),
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'baseline_latency_s': round(self._baseline_latency_s, 2) if self._baseline_latency_s else None,
+                'baseline_tokens_per_s': round(self._baseline_tps, 2) if self._baseline_tps else None,
+                'latency_ceiling_s': self.latency_ceiling_s,
+            }
+
+
+# Module-level singleton
+_limiter: Optional[AimdConcurrencyLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_concurrency_limiter() -> AimdConcurrencyLimiter:
+    """Get or create the singleton AimdConcurrencyLimiter instance."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AimdConcurrencyLimiter()
+                get_metrics().register_collector('eir_concurrency', _limiter.describe)
+    return _limiter
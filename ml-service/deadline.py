@@ -0,0 +1,237 @@
+"""
+Request Deadline Module
+
+Propagates the caller's time budget into generation. The Node proxy sends
+``X-Request-Timeout-Ms`` (its own axios timeout); ``DeadlineMiddleware``
+turns it into a per-request deadline held in a context variable. Before each
+Ollama call the generator asks the deadline to fit the request: work that
+cannot finish in time (based on learned per-model throughput) is rejected,
+``num_predict`` is shrunk to what fits, and the HTTP timeout is capped at the
+remaining time so upstream calls are aborted when the deadline passes.
+
+A request whose deadline was exceeded is answered with 504 (unless its
+response had already started, e.g. an SSE stream, which gets an error event).
+Counts are exported as ``deadline_exceeded_total{stage}`` and
+``deadline_shrunk_total``; learned throughput is published under
+``throughput`` in ``GET /metrics``.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = 'x-request-timeout-ms'
+
+# Time reserved for returning the response to the caller
+SAFETY_MARGIN_S = 0.5
+# Below this many tokens a shrunk answer is not worth generating
+MIN_USEFUL_TOKENS = 32
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request cannot (or did not) finish before its deadline."""
+
+
+class ThroughputEstimator:
+    """
+    Learns per-model decode speed and fixed overhead from Ollama's timings.
+
+    Uses an exponentially weighted moving average of eval tokens/s and of the
+    non-decode part of ``total_duration`` (model load + prompt evaluation).
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, float]] = {}
+
+    def observe(self, model: str, data: Dict[str, Any]) -> None:
+        eval_count = data.get('eval_count')
+        eval_duration = data.get('eval_duration')  # nanoseconds
+        total_duration = data.get('total_duration')
+        if not eval_count or not eval_duration:
+            return
+        tokens_per_s = eval_count / (eval_duration / 1e9)
+        overhead_s = max(0.0, (total_duration - eval_duration) / 1e9) if total_duration else 0.0
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                self._models[model] = {'tokens_per_s': tokens_per_s, 'overhead_s': overhead_s, 'samples': 1}
+                return
+            stats['tokens_per_s'] += self.alpha * (tokens_per_s - stats['tokens_per_s'])
+            stats['overhead_s'] += self.alpha * (overhead_s - stats['overhead_s'])
+            stats['samples'] += 1
+
+    def max_tokens_within(self, model: str, budget_s: float) -> Optional[int]:
+        """Tokens the model can produce within ``budget_s``, or None if unknown."""
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                return None
+            return int((budget_s - stats['overhead_s']) * stats['tokens_per_s'])
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    'tokens_per_s': round(stats['tokens_per_s'], 2),
+                    'overhead_s': round(stats['overhead_s'], 3),
+                    'samples': stats['samples'],
+                }
+                for model, stats in self._models.items()
+            }
+
+
+class RequestDeadline:
+    """The deadline of one request; shared by every thread working on it."""
+
+    def __init__(self, budget_s: float):
+        self.budget_s = budget_s
+        self.expires_at = time.monotonic() + budget_s
+        self.exceeded = False
+
+    def remaining_s(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def mark_exceeded(self, stage: str) -> None:
+        """Flag the request as past its deadline (counted once per request)."""
+        if self.exceeded:
+            return
+        self.exceeded = True
+        get_metrics().inc('deadline_exceeded_total', stage=stage)
+        logger.warning(f"Request deadline exceeded ({stage}) with a {self.budget_s:.1f}s budget")
+
+    def fit(self, payload: dict, timeout: float) -> float:
+        """
+        Fit an Ollama request into the remaining time.
+
+        Shrinks ``payload['options']['num_predict']`` if needed and returns the
+        HTTP timeout capped at the remaining time.
+
+        Raises:
+            DeadlineExceeded: The deadline has passed, or the learned
+                throughput says not even MIN_USEFUL_TOKENS would fit.
+        """
+        remaining = self.remaining_s() - SAFETY_MARGIN_S
+        if remaining <= 0:
+            self.mark_exceeded('expired')
+            raise DeadlineExceeded("Request deadline has passed")
+
+        options = payload['options']
+        max_tokens = get_throughput_estimator().max_tokens_within(payload['model'], remaining)
+        if max_tokens is not None:
+            if max_tokens < MIN_USEFUL_TOKENS:
+                self.mark_exceeded('rejected')
+                raise DeadlineExceeded(
+                    f"Cannot finish in {remaining:.1f}s at the learned throughput of {payload['model']}"
+                )
+            if max_tokens < options['num_predict']:
+                logger.info(f"Shrinking num_predict {options['num_predict']} -> {max_tokens} to fit the deadline")
+                options['num_predict'] = max_tokens
+                get_metrics().inc('deadline_shrunk_total')
+        return min(timeout, remaining)
+
+
+_current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar('request_deadline', default=None)
+
+
+def current_deadline() -> Optional[RequestDeadline]:
+    """The deadline of the request being served, or None if the caller sent none."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget_s: Optional[float]):
+    """Run a block under a deadline (no-op when ``budget_s`` is None)."""
+    if budget_s is None:
+        yield None
+        return
+    deadline = RequestDeadline(budget_s)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def _parse_budget(scope) -> Optional[float]:
+    for name, value in scope.get('headers') or []:
+        if name.decode('latin-1').lower() == DEADLINE_HEADER:
+            try:
+                budget_ms = float(value.decode('latin-1'))
+            except ValueError:
+                logger.debug(f"Ignoring invalid {DEADLINE_HEADER} header: {value!r}")
+                return None
+            return budget_ms / 1000 if budget_ms > 0 else None
+    return None
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware binding ``X-Request-Timeout-Ms`` to the request context.
+
+    If the deadline was exceeded by the time the response starts, the
+    response is replaced by a 504 so the caller sees a clear timeout rather
+    than a partial or error-string result.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        budget_s = _parse_budget(scope)
+        if budget_s is None:
+            await self.app(scope, receive, send)
+            return
+
+        get_metrics().inc('deadline_requests_total')
+        replaced = False
+
+        async def send_wrapper(message):
+            nonlocal replaced
+            if replaced:
+                return
+            if message['type'] == 'http.response.start' and deadline.exceeded:
+                replaced = True
+                body = json.dumps({'detail': 'Request deadline exceeded'}).encode('utf-8')
+                await send({
+                    'type': 'http.response.start',
+                    'status': 504,
+                    'headers': [
+                        (b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('latin-1')),
+                    ],
+                })
+                await send({'type': 'http.response.body', 'body': body})
+                return
+            await send(message)
+
+        with deadline_scope(budget_s) as deadline:
+            await self.app(scope, receive, send_wrapper)
+
+
+# Module-level singleton
+_estimator: Optional[ThroughputEstimator] = None
+_estimator_lock = threading.Lock()
+
+
+def get_throughput_estimator() -> ThroughputEstimator:
+    """Get or create the singleton ThroughputEstimator instance."""
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = ThroughputEstimator()
+                get_metrics().register_collector('throughput', _estimator.describe)
+    return _estimator
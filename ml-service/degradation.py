@@ -0,0 +1,239 @@
+"""
+Degradation Controller Module
+
+Load-aware graceful degradation for interactive generation. The controller
+watches the number of in-flight interactive Ollama requests and the recent
+latency of interactive workloads; under pressure it steps down, in order:
+
+    level 1  disable Qwen3 thinking mode
+    level 2  also shrink num_predict
+    level 3  also switch to a fallback (smaller) model
+
+Thresholds live in the ``degradation`` section of
+``data/workload_profiles.json`` (hot-reloaded). Batch workloads such as EIR
+chunk analysis are never degraded and do not count towards queue depth: a
+running analysis keeps several calls in flight under its own concurrency
+limit, so counting them would degrade every interactive request even with
+Ollama keeping up. Real contention shows in the interactive latency instead.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import get_metrics
+from workload_profiles import get_workload_profiles
+
+logger = logging.getLogger(__name__)
+
+LEVEL_ACTIONS = {1: 'no_think', 2: 'short_output', 3: 'fallback_model'}
+MAX_LEVEL = 3
+
+# Built-in thresholds, used when the profile file has no degradation section
+_DEFAULT_DEGRADATION: Dict[str, Any] = {
+    'enabled': True,
+    'interactive_workloads': [
+        'generate', 'field_suggestion', 'eir_suggestion', 'questions',
+        'answers', 'eir_field', 'eir_field_complex',
+    ],
+    'queue_depth_levels': [2, 4, 6],
+    'latency_target_ms': 20000,
+    'latency_levels': [0.5, 0.75, 1.0],
+    'latency_window_s': 60,
+    'num_predict_factor': 0.5,
+    'min_num_predict': 96,
+    'fallback_model': None,
+    'fallback_model_env': ['OLLAMA_FALLBACK_MODEL', 'OLLAMA_SMALL_MODEL'],
+}
+
+
+class DegradationPlan:
+    """The degradation applied to one request."""
+
+    def __init__(self, level: int = 0, actions: Optional[List[str]] = None):
+        self.level = level
+        self.actions = actions or []
+
+    @property
+    def degraded(self) -> bool:
+        return self.level > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'degraded': self.degraded,
+            'degradation_level': self.level,
+            'degradation_actions': list(self.actions),
+        }
+
+
+class DegradationController:
+    """Computes the current degradation level and applies it to payloads."""
+
+    def __init__(self):
+        self.profiles = get_workload_profiles()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._interactive_in_flight = 0
+        self._samples: deque = deque(maxlen=50)  # (timestamp, latency_ms)
+
+    def _config(self) -> Dict[str, Any]:
+        merged = dict(_DEFAULT_DEGRADATION)
+        merged.update(self.profiles.section('degradation'))
+        return merged
+
+    @contextmanager
+    def track(self, workload: Optional[str] = None):
+        """Count an Ollama request as in flight for the duration of the block."""
+        interactive = int(workload in self._config()['interactive_workloads'])
+        with self._lock:
+            self._in_flight += 1
+            self._interactive_in_flight += interactive
+            in_flight = self._in_flight
+        get_metrics().set_gauge('ollama_in_flight', in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._interactive_in_flight -= interactive
+                in_flight = self._in_flight
+            get_metrics().set_gauge('ollama_in_flight', in_flight)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def interactive_in_flight(self) -> int:
+        """In-flight requests of interactive workloads (the queue-depth signal)."""
+        with self._lock:
+            return self._interactive_in_flight
+
+    def observe(self, workload: Optional[str], latency_ms: float) -> None:
+        """Record the latency of a finished (or timed-out) interactive request."""
+        if workload not in self._config()['interactive_workloads']:
+            return
+        with self._lock:
+            self._samples.append((time.time(), latency_ms))
+
+    def recent_latency_ms(self) -> Optional[float]:
+        """Average interactive latency within the configured window."""
+        cutoff = time.time() - self._config()['latency_window_s']
+        with self._lock:
+            recent = [ms for ts, ms in self._samples if ts >= cutoff]
+        if not recent:
+            return None
+        return sum(recent) / len(recent)
+
+    @staticmethod
+    def _level_from(value: float, thresholds: List[float]) -> int:
+        level = 0
+        for i, threshold in enumerate(thresholds[:MAX_LEVEL]):
+            if value >= threshold:
+                level = i + 1
+        return level
+
+    def level(self) -> Tuple[int, Dict[str, Any]]:
+        """Return the current level and the signals it was derived from."""
+        config = self._config()
+        in_flight = self.interactive_in_flight()
+        latency = self.recent_latency_ms()
+        signals = {'interactive_in_flight': in_flight, 'recent_latency_ms': latency}
+        if not config.get('enabled', True):
+            return 0, signals
+
+        queue_level = self._level_from(in_flight, config['queue_depth_levels'])
+        latency_level = 0
+        if latency is not None and config['latency_target_ms']:
+            latency_level = self._level_from(latency / config['latency_target_ms'], config['latency_levels'])
+        return max(queue_level, latency_level), signals
+
+    def _fallback_model(self, config: Dict[str, Any]) -> Optional[str]:
+        if config.get('fallback_model'):
+            return config['fallback_model']
+        env_names = config.get('fallback_model_env') or []
+        if isinstance(env_names, str):
+            env_names = [env_names]
+        for env_name in env_names:
+            value = os.getenv(env_name, '').strip()
+            if value:
+                return value
+        return None
+
+    def apply(
+        self,
+        workload: Optional[str],
+        model: str,
+        thinking: Optional[bool],
+        options: Dict[str, Any]
+    ) -> Tuple[str, Optional[bool], Dict[str, Any], DegradationPlan]:
+        """
+        Degrade the resolved model/thinking/options of an interactive request.
+
+        Returns:
+            (model, thinking, options, plan) — unchanged when not degraded.
+        """
+        config = self._config()
+        if workload not in config['interactive_workloads']:
+            return model, thinking, options, DegradationPlan()
+
+        level, signals = self.level()
+        get_metrics().set_gauge('degradation_level', level)
+        if level == 0:
+            return model, thinking, options, DegradationPlan()
+
+        actions = []
+        if thinking is not False:
+            thinking = False
+            actions.append(LEVEL_ACTIONS[1])
+        if level >= 2:
+            options = dict(options)
+            reduced = max(config['min_num_predict'], int(options['num_predict'] * config['num_predict_factor']))
+            if reduced < options['num_predict']:
+                options['num_predict'] = reduced
+                actions.append(LEVEL_ACTIONS[2])
+        if level >= 3:
+            fallback = self._fallback_model(config)
+            if fallback and fallback != model:
+                model = fallback
+                actions.append(LEVEL_ACTIONS[3])
+
+        get_metrics().inc('degraded_requests_total', level=level, workload=workload)
+        logger.info(
+            f"Degrading '{workload}' to level {level} ({', '.join(actions) or 'no-op'}): "
+            f"interactive_in_flight={signals['interactive_in_flight']}, recent_latency_ms={signals['recent_latency_ms']}"
+        )
+        return model, thinking, options, DegradationPlan(level, actions)
+
+    def describe(self) -> Dict[str, Any]:
+        """Current level, signals and thresholds (published via /metrics)."""
+        config = self._config()
+        level, signals = self.level()
+        return {
+            'level': level,
+            'in_flight': self.in_flight(),
+            **signals,
+            'fallback_model': self._fallback_model(config),
+            'queue_depth_levels': config['queue_depth_levels'],
+            'latency_target_ms': config['latency_target_ms'],
+            'latency_levels': config['latency_levels'],
+        }
+
+
+# Module-level singleton
+_controller: Optional[DegradationController] = None
+_controller_lock = threading.Lock()
+
+
+def get_degradation_controller() -> DegradationController:
+    """Get or create the singleton DegradationController instance."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = DegradationController()
+                get_metrics().register_collector('degradation', _controller.describe)
+    return _controller
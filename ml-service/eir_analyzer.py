@@ -4,15 +4,64 @@ EIR Analyzer Module
 Analyzes Exchange Information Requirements (EIR) documents using Ollama LLM
 to extract structured information for BIM Execution Plan (BEP) generation.
 Follows ISO 19650 standards.
+
+Configuration:
+    - EIR_SINGLE_PASS_CHAR_LIMIT: documents up to this size are analysed in
+      one call (default: 30000)
+    - EIR_CHUNK_TOKENS: chunk size for longer documents (default: 7000)
+    - EIR_EXTRACTION_MODE: "monolithic" (default; one call per chunk with
+      the full schema) or "sectioned" (focused per-section calls routed to
+      the relevant chunks, see eir_sections.py)
+    - EIR_SECTION_ROUTING: how sectioned extraction picks chunks per
+      section: "bm25" (default), "keywords" or "all"
+    - EIR_SECTION_TOP_K: chunks retrieved per section with bm25 routing
+      (default: 4)
+    - EIR_ENTITY_PREEXTRACTION: extract software, file formats,
+      classification systems, workflow states, the COBie/BCF flags and the
+      estimated value with rules and a dictionary (entity_extractor.py), and
+      leave only the narrative fields to the monolithic LLM prompt
+      (default: true)
+    - EIR_TABLE_PARSING: map LOIN, milestone and role/RACI tables straight
+      to entries (table_parser.py) and send only the remaining text to the
+      LLM (default: true)
+    - EIR_GAP_FILL: after a monolithic extraction, re-extract the sections
+      left empty or nearly so with focused section prompts over their most
+      relevant passages, run concurrently (default: true)
+    - EIR_GAP_FILL_MIN_COVERAGE: sections with fewer than this percentage
+      of their values filled are gap-filled (default: 25)
+    - EIR_GAP_FILL_PASSAGES: passages retrieved per gap-filled section
+      (default: 4)
+    - EIR_ANALYSIS_DEPTH: default analysis depth, "quick", "standard"
+      (default) or "deep" (see ANALYSIS_DEPTHS); analyze() and /analyze-eir
+      take it per call
+    - EIR_FIELD_SCOPED_CONTEXT: build field suggestion prompts from the
+      analysis section the field maps to (FIELD_MAPPING) plus project_info
+      instead of the whole analysis (default: true)
+
+The summary is rendered from the analysis without the LLM
+(summary_renderer.py) and returned at once; at standard and deep depth an
+LLM-polished summary is produced in the background under the analysis id
+(summary_polish.py; EIR_SUMMARY_POLISH*). Every result is kept under that id
+(analysis_store.py), so field suggestions can refer to it.
+
+Chunk results are cached across analyses by content hash, model and prompt
+version (chunk_cache.py; EIR_CHUNK_CACHE*), so re-analysing a revised EIR
+only sends its changed chunks to Ollama.
 """
 
+import contextvars
+import copy
 import json
+import queue as _queue
 import re
 import logging
 import os
 import time
-from typing import Dict, Any, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, NamedTuple, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from pydantic import BaseModel, Field, ValidationError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -25,14 +74,26 @@ except ImportError:
     HAS_JSON_REPAIR = False
     repair_json = None
 
-try:
-    from rapidfuzz import fuzz
-    HAS_RAPIDFUZZ = True
-except ImportError:
-    HAS_RAPIDFUZZ = False
-    fuzz = None
-
 from ollama_generator import get_ollama_generator
+from model_router import ModelRoute, get_model_router
+from job_store import ChunkCheckpoint, chunk_hash
+from concurrency import ConcurrencyAcquireCancelled, get_concurrency_limiter
+from eir_sections import (
+    EIR_SECTIONS, SECTION_ROUTINGS, ExtractionSection, route_sections, section_model, section_query
+)
+from metrics import get_metrics
+from fuzzy_dedup import ListMerger
+from chunk_cache import get_chunk_cache, prompt_version
+from text_extractor import normalize_chunk_text
+from chunk_index import ChunkIndex
+from glossary_index import get_glossary_index
+from table_parser import apply_tables, parse_tables
+from summary_renderer import render_summary
+from summary_polish import POLISH_PENDING, get_summary_polisher
+from analysis_store import StoredAnalysis, get_analysis_store
+from entity_extractor import (
+    apply_entities, backfill_milestone_dates, get_entity_extractor, narrative_prompt, narrative_schema
+)
 
 logger = logging.getLogger(__name__)
 
@@ -252,6 +313,11 @@ EIR DOCUMENT TO ANALYZE:
 
 JSON:"""
 
+# Monolithic prompt and schema without the fields pre-extracted by
+# entity_extractor.py (EIR_ENTITY_PREEXTRACTION)
+NARRATIVE_ANALYSIS_PROMPT = narrative_prompt(EIR_ANALYSIS_PROMPT)
+NARRATIVE_ANALYSIS_SCHEMA = narrative_schema(EirAnalysis.model_json_schema())
+
 
 # Prompt for generating markdown summary (output in English for BEP)
 SUMMARY_PROMPT = """Based on the JSON analysis of the EIR document, generate a concise summary in English in Markdown format.
@@ -357,6 +423,100 @@ CONTENT:"""
 # MAIN ANALYZER CLASS
 # ============================================================================
 
+# Receives progress event dicts, e.g. {"stage": "chunk", "chunks_done": 3, ...}
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class AnalysisCancelled(Exception):
+    """Raised when an analysis is stopped through its cancel_event."""
+
+
+EXTRACTION_MODES = ('monolithic', 'sectioned')
+
+
+class AnalysisDepth(NamedTuple):
+    """What an analysis depth trades: extraction path, workload profiles, models and summary."""
+    name: str
+    extraction_mode: Optional[str]  # None: EIR_EXTRACTION_MODE
+    chunk_workload: str  # workload profile of monolithic extraction calls
+    section_workload: str  # workload profile of section and gap-fill calls
+    model_route: Optional[str]  # model route (model_router.py) for extraction calls whose profile sets no model
+    deterministic: bool  # entity pre-extraction and table parsing whatever their settings
+    gap_fill: Optional[bool]  # None: EIR_GAP_FILL, monolithic extraction only
+    llm_summary: bool  # False: template summary only, no background polish
+
+
+ANALYSIS_DEPTHS: Dict[str, AnalysisDepth] = {
+    # Triage: one non-thinking call per chunk on the small model, no summary polish
+    'quick': AnalysisDepth('quick', 'monolithic', 'analysis_quick', 'analysis_section', 'simple',
+                           deterministic=True, gap_fill=False, llm_summary=False),
+    'standard': AnalysisDepth('standard', None, 'analysis_chunk', 'analysis_section', None,
+                              deterministic=False, gap_fill=None, llm_summary=True),
+    # Section-routed extraction with thinking, then gap-filling
+    'deep': AnalysisDepth('deep', 'sectioned', 'analysis_chunk', 'analysis_section_deep', None,
+                          deterministic=False, gap_fill=True, llm_summary=True),
+}
+
+# Depth of the analysis running in this context; copied into the chunk worker
+# threads with the rest of the request context (see _run_parallel)
+_analysis_depth: contextvars.ContextVar[AnalysisDepth] = contextvars.ContextVar(
+    'eir_analysis_depth', default=ANALYSIS_DEPTHS['standard']
+)
+
+
+class ExtractionUsage:
+    """Calls, token counts and chunk cache use of the extraction of one analysis (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.eval_tokens = 0
+        self.prompt_tokens = 0
+        self.chunks_total = 0
+        self.chunk_term_density: List[float] = []
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        self.time_saved_s = 0.0
+
+    def set_chunks(self, chunks: List[str]) -> None:
+        """Record the document's chunks and their glossary term density (glossary_index.py)."""
+        density = [score['density'] for score in get_glossary_index().chunk_scores(chunks)]
+        with self._lock:
+            self.chunks_total = len(chunks)
+            self.chunk_term_density = density
+
+    def add(self, stats: Dict[str, Any]) -> None:
+        """Add one call, from ``generator.last_call_stats()``."""
+        with self._lock:
+            self.calls += 1
+            self.eval_tokens += stats.get('eval_tokens') or 0
+            self.prompt_tokens += stats.get('prompt_tokens') or 0
+
+    def add_cache_lookup(self, hit_latency_s: Optional[float]) -> None:
+        """Add one chunk cache lookup; ``hit_latency_s`` is the cached call's latency, None on a miss."""
+        with self._lock:
+            self.cache_lookups += 1
+            if hit_latency_s is not None:
+                self.cache_hits += 1
+                self.time_saved_s += hit_latency_s
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'chunks_total': self.chunks_total,
+                'chunk_term_density': list(self.chunk_term_density),
+                'llm_calls': self.calls,
+                'output_tokens': self.eval_tokens,
+                'prompt_tokens': self.prompt_tokens,
+                'cache': {
+                    'lookups': self.cache_lookups,
+                    'hits': self.cache_hits,
+                    'hit_ratio': round(self.cache_hits / self.cache_lookups, 3) if self.cache_lookups else None,
+                    'time_saved_s': round(self.time_saved_s, 1),
+                },
+            }
+
+
 class EirAnalyzer:
     """
     Analyzes EIR documents using Ollama LLM to extract structured information.
@@ -366,6 +526,15 @@ class EirAnalyzer:
     FUZZY_THRESHOLD_GENERAL = 85
     FUZZY_THRESHOLD_OBJECTIVES = 80  # More lenient for objectives and requirements
 
+    # Below this many words left after table parsing, the LLM pass is skipped
+    MIN_LLM_TEXT_WORDS = 20
+
+    # Target size of the passages gap-filled sections are retrieved from
+    GAP_FILL_PASSAGE_CHARS = 1500
+
+    # How long analyze_stream keeps the stream open for the polished summary
+    POLISH_STREAM_WAIT_S = 300
+
     # Mapping of BEP field types to EIR analysis sections
     FIELD_MAPPING = {
         'projectName': 'project_info.name',
@@ -397,6 +566,10 @@ class EirAnalyzer:
         'cobieRequirements': 'handover_requirements',
         'handoverRequirements': 'handover_requirements',
         'informationRisks': 'specific_risks',
+        'roles': 'roles_responsibilities',
+        'rolesResponsibilities': 'roles_responsibilities',
+        'informationManagementResponsibilities': 'roles_responsibilities',
+        'responsibilityMatrix': 'roles_responsibilities',
         # New schema sections
         'trainingRequirements': 'training_requirements',
         'bimCompetencyLevels': 'training_requirements.bim_competency_standards',
@@ -435,12 +608,28 @@ class EirAnalyzer:
             min_value=3000,
             max_value=7500
         )
-        self.auto_latency_threshold = self._get_env_int(
-            "EIR_AUTO_CONCURRENCY_LATENCY",
-            default=60,
-            min_value=20,
-            max_value=180
+        self.extraction_mode = self._resolve_extraction_mode(os.getenv('EIR_EXTRACTION_MODE'))
+        self.section_routing = (os.getenv('EIR_SECTION_ROUTING') or 'bm25').strip().lower()
+        if self.section_routing not in SECTION_ROUTINGS:
+            logger.warning(f"Unknown EIR_SECTION_ROUTING '{self.section_routing}', using bm25")
+            self.section_routing = 'bm25'
+        self.section_top_k = self._get_env_int("EIR_SECTION_TOP_K", default=4, min_value=1, max_value=50)
+        self.entity_preextraction = os.getenv('EIR_ENTITY_PREEXTRACTION', 'true').strip().lower() not in (
+            '0', 'false', 'no', 'off'
+        )
+        self.table_parsing = os.getenv('EIR_TABLE_PARSING', 'true').strip().lower() not in (
+            '0', 'false', 'no', 'off'
+        )
+        self.gap_fill = os.getenv('EIR_GAP_FILL', 'true').strip().lower() not in ('0', 'false', 'no', 'off')
+        self.gap_fill_min_coverage = self._get_env_int(
+            "EIR_GAP_FILL_MIN_COVERAGE", default=25, min_value=1, max_value=100
+        )
+        self.gap_fill_passages = self._get_env_int("EIR_GAP_FILL_PASSAGES", default=4, min_value=1, max_value=20)
+        self.depth = self._resolve_depth(os.getenv('EIR_ANALYSIS_DEPTH'))
+        self.field_scoped_context = os.getenv('EIR_FIELD_SCOPED_CONTEXT', 'true').strip().lower() not in (
+            '0', 'false', 'no', 'off'
         )
+        self._local = threading.local()
 
     @staticmethod
     def _get_env_int(name: str, default: int, min_value: int, max_value: int) -> int:
@@ -460,34 +649,429 @@ class EirAnalyzer:
             return max_value
         return parsed
 
-    def analyze(self, text: str, filename: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    @staticmethod
+    def _resolve_extraction_mode(value: Optional[str], default: str = 'monolithic') -> str:
+        mode = (value or '').strip().lower()
+        if not mode:
+            return default
+        if mode not in EXTRACTION_MODES:
+            logger.warning(f"Unknown EIR extraction mode '{value}', using {default}")
+            return default
+        return mode
+
+    @staticmethod
+    def _resolve_depth(value: Optional[str], default: str = 'standard') -> str:
+        depth = (value or '').strip().lower()
+        if not depth:
+            return default
+        if depth not in ANALYSIS_DEPTHS:
+            logger.warning(f"Unknown EIR analysis depth '{value}', using {default}")
+            return default
+        return depth
+
+    def analyze(
+        self,
+        text: str,
+        filename: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        checkpoint: Optional[ChunkCheckpoint] = None,
+        extraction_mode: Optional[str] = None,
+        depth: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], str]:
         """
         Analyze EIR document text and return structured data.
 
         Args:
             text: Extracted text from EIR document
             filename: Original filename for context
+            progress_callback: Optional callable receiving progress events:
+                {"stage": "entities", "entities": {...}} (pre-extracted fields,
+                    when EIR_ENTITY_PREEXTRACTION is on),
+                {"stage": "tables", "tables": {...}} (entries mapped from
+                    recognised tables, when EIR_TABLE_PARSING finds any),
+                {"stage": "analyzing", "chunks_done": 0, "chunks_total": N},
+                {"stage": "section", "section": "project_info", "value": {...}}
+                    (single-pass documents only, as each top-level field is
+                    generated),
+                {"stage": "chunk", "chunk": i, "chunks_done": n, "chunks_total": N,
+                 "failed": bool, "analysis": {...}},
+                {"stage": "gap_fill", "sections": ["cde", ...]} (monolithic
+                    extraction, when EIR_GAP_FILL re-extracts sections),
+            cancel_event: Optional event; when set, pending chunks are dropped
+                and AnalysisCancelled is raised
+            checkpoint: Optional chunk checkpoint store; completed chunk
+                analyses are saved to it, and chunks already saved (same
+                content hash) are reused instead of re-analysed
+            extraction_mode: "monolithic" or "sectioned"; overrides
+                EIR_EXTRACTION_MODE and the depth's mode for this call
+            depth: "quick", "standard" or "deep" (see ANALYSIS_DEPTHS);
+                overrides EIR_ANALYSIS_DEPTH for this call
 
         Returns:
             Tuple of (analysis_json, summary_markdown)
+
+        Raises:
+            AnalysisCancelled: If cancel_event was set during the analysis
         """
-        logger.info(f"Analyzing EIR document: {filename or 'unknown'}")
+        plan = ANALYSIS_DEPTHS[self._resolve_depth(depth, default=self.depth)]
+        token = _analysis_depth.set(plan)
+        try:
+            return self._analyze(text, filename, progress_callback, cancel_event, checkpoint, extraction_mode, plan)
+        finally:
+            _analysis_depth.reset(token)
+
+    def _analyze(
+        self,
+        text: str,
+        filename: Optional[str],
+        progress_callback: Optional[ProgressCallback],
+        cancel_event: Optional[threading.Event],
+        checkpoint: Optional[ChunkCheckpoint],
+        extraction_mode: Optional[str],
+        depth: AnalysisDepth
+    ) -> Tuple[Dict[str, Any], str]:
+        logger.info(f"Analyzing EIR document: {filename or 'unknown'} ({depth.name})")
         logger.info(f"Text length: {len(text)} chars")
+        self._check_cancelled(cancel_event)
+
+        # Every Ollama call of this analysis shares one fair-share key in the
+        # process-wide concurrency limiter (concurrency.py)
+        owner = f"{filename or 'analysis'}#{uuid.uuid4().hex[:8]}"
+        limiter = get_concurrency_limiter()
+        mode = self._resolve_extraction_mode(extraction_mode, default=depth.extraction_mode or self.extraction_mode)
+        usage = ExtractionUsage()
+        started = time.time()
+        self._local.last_stats = None
+
+        entities = None
+        if self._preextracting():
+            entities = get_entity_extractor().extract(text)
+            self._report_progress(progress_callback, stage='entities', entities=entities)
+
+        # Recognised LOIN / milestone / role tables are mapped directly; only
+        # the remaining text goes to the LLM
+        tables = parse_tables(text) if self.table_parsing or depth.deterministic else None
+        llm_text = text
+        if tables is not None and tables.tables:
+            llm_text = tables.remaining_text
+            self._report_progress(progress_callback, stage='tables', tables=tables.analysis)
 
         # Check if text needs chunking (increased threshold with larger context window)
-        if len(text) > self.single_pass_char_limit:
+        is_large = len(llm_text) > self.single_pass_char_limit
+        llm_skipped = (llm_text is not text
+                       and len(normalize_chunk_text(llm_text).split()) < self.MIN_LLM_TEXT_WORDS)
+        if llm_skipped:
+            # Nothing left for the LLM besides headings, e.g. an XLSX LOIN matrix
+            usage.set_chunks([])
+            self._report_progress(progress_callback, stage='analyzing', chunks_done=0, chunks_total=0)
+            analysis_json = self._empty_analysis_dict()
+        elif mode == 'sectioned':
+            chunks = self._split_chunks(llm_text) if is_large else [llm_text]
+            analysis_json = self._analyze_sectioned(
+                chunks, progress_callback, cancel_event, checkpoint, owner, usage
+            )
+        elif is_large:
             logger.info("Document is large, using chunked analysis")
-            analysis_json = self._analyze_chunked(text)
+            analysis_json = self._analyze_chunked(
+                llm_text, progress_callback, cancel_event, checkpoint, owner, usage
+            )
         else:
-            analysis_json = self._analyze_single(text)
+            usage.set_chunks([llm_text])
+            self._report_progress(progress_callback, stage='analyzing', chunks_done=0, chunks_total=1)
+            text_hash = chunk_hash(llm_text)
+            analysis_json = checkpoint.restore([text_hash]).get(0) if checkpoint else None
+            cache_key = None
+            if analysis_json is None:
+                cache_key, analysis_json = self._cache_lookup(llm_text, None, usage)
+            if analysis_json is None:
+                with self._limited(limiter, cancel_event, owner):
+                    self.generator.reset_call_stats()
+                    call_started = time.time()
+                    if progress_callback is not None:
+                        analysis_json = self._analyze_single_streaming(llm_text, progress_callback)
+                    else:
+                        analysis_json = self._analyze_single(llm_text)
+                    stats = self.generator.last_call_stats()
+                    usage.add(stats)
+                    self._cache_store(cache_key, analysis_json, stats, time.time() - call_started)
+                if checkpoint:
+                    checkpoint.save(0, text_hash, analysis_json)
+            self._report_progress(
+                progress_callback, stage='chunk', chunk=0, chunks_done=1, chunks_total=1,
+                failed=False, analysis=analysis_json
+            )
+            # Clean low-quality placeholder/gibberish entries (merged results
+            # are already sanitized by _merge_analyses)
+            analysis_json = self._sanitize_analysis(analysis_json)
+        if tables is not None and tables.tables:
+            apply_tables(analysis_json, tables.analysis)
+        if entities is not None:
+            apply_entities(analysis_json, entities)
+        gap_fill = None
+        run_gap_fill = depth.gap_fill if depth.gap_fill is not None else (self.gap_fill and mode == 'monolithic')
+        if run_gap_fill and not llm_skipped:
+            gap_fill = self._gap_fill(analysis_json, llm_text, progress_callback, cancel_event, owner, usage)
+        if entities is not None:
+            backfill_milestone_dates(analysis_json, text)
+        self._check_cancelled(cancel_event)
+        self._record_usage(mode, usage, filename)
+
+        # The template summary is returned now; the LLM-polished one follows
+        # in the background, fetched by analysis id (summary_polish.py)
+        summary_markdown = render_summary(analysis_json)
+        stored = get_analysis_store().put(copy.deepcopy(analysis_json))  # the caller owns analysis_json
+        polisher = get_summary_polisher()
+        polish = None
+        if depth.llm_summary and polisher.enabled:
+            polish = polisher.submit(stored.analysis_id, lambda: self.polish_summary(stored))
+
+        self._local.last_stats = {
+            'analysis_id': stored.analysis_id,
+            'summary_polish': polish.status if polish is not None else None,
+            'depth': depth.name,
+            'extraction_mode': mode,
+            'tables_parsed': dict(tables.tables) if tables is not None else {},
+            'gap_filled': gap_fill,
+            **usage.to_dict(),
+            'duration_s': round(time.time() - started, 1),
+        }
+        return analysis_json, summary_markdown
 
-        # Clean low-quality placeholder/gibberish entries
-        analysis_json = self._sanitize_analysis(analysis_json)
+    def last_analysis_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Metadata of the last analyze() call on this thread: the analysis id
+        and the state of its summary polish (``summary_polish``: "pending",
+        "completed", "failed" or None when not polished), depth, extraction mode,
+        chunk count and glossary term density per chunk (hits per 100 words),
+        the gap-fill pass (``gap_filled.sections`` re-extracted, those it
+        ``filled`` and its ``duration_s``; None when it did not run),
+        LLM calls and tokens, and chunk cache use
+        (``cache.hits``, ``cache.hit_ratio``, ``cache.time_saved_s``).
+        """
+        stats = getattr(self._local, 'last_stats', None)
+        return copy.deepcopy(stats) if stats else None
+
+    def _cache_lookup(
+        self,
+        chunk: str,
+        section: Optional[ExtractionSection],
+        usage: Optional[ExtractionUsage]
+    ) -> Tuple[Optional[Tuple[str, str, str]], Optional[Dict[str, Any]]]:
+        """``(cache key, cached analysis or None)``; the key is None when the cache is disabled."""
+        cache = get_chunk_cache()
+        if cache is None:
+            return None, None
+        workload, model = self._extraction_call(section is not None)
+        if section is not None:
+            version_parts = (section.name, section.prompt('{eir_text}'),
+                             section_model(section, EirAnalysis).model_json_schema())
+        else:
+            version_parts = self._monolithic_prompt()
+        profile = self.generator.profiles.get(workload)
+        key = (
+            chunk_hash(normalize_chunk_text(chunk)),
+            model or profile.model or self.generator.model,
+            prompt_version(*version_parts, profile.thinking),
+        )
+        hit = cache.get(*key)
+        if usage is not None:
+            usage.add_cache_lookup(hit[1] if hit else None)
+        return key, (hit[0] if hit else None)
+
+    def _extraction_call(self, section: bool) -> Tuple[str, Optional[str]]:
+        """Workload profile and model override of a (section) extraction call at the running analysis depth."""
+        depth = _analysis_depth.get()
+        workload = depth.section_workload if section else depth.chunk_workload
+        model = None
+        if depth.model_route and not self.generator.profiles.get(workload).model:
+            model = get_model_router().get_route(depth.model_route).model
+        return workload, model
+
+    def _preextracting(self) -> bool:
+        """Whether entities are pre-extracted (EIR_ENTITY_PREEXTRACTION, or the depth requires it)."""
+        return self.entity_preextraction or _analysis_depth.get().deterministic
+
+    def _monolithic_prompt(self) -> Tuple[str, Dict[str, Any]]:
+        """Prompt template and schema of a monolithic call: narrative fields only with pre-extraction on."""
+        if self._preextracting():
+            return NARRATIVE_ANALYSIS_PROMPT, NARRATIVE_ANALYSIS_SCHEMA
+        return EIR_ANALYSIS_PROMPT, EirAnalysis.model_json_schema()
 
-        # Generate summary
-        summary_markdown = self._generate_summary(analysis_json)
+    @staticmethod
+    def _cache_store(key: Optional[Tuple[str, str, str]], analysis: Dict[str, Any],
+                     stats: Dict[str, Any], latency_s: float) -> None:
+        """Cache a chunk result unless the call failed, ran degraded or used another model than keyed."""
+        cache = get_chunk_cache()
+        if (key is None or cache is None or stats.get('status') != 'ok'
+                or stats.get('degraded') or stats.get('model') != key[1]):
+            return
+        cache.put(*key, analysis, latency_s)
 
-        return analysis_json, summary_markdown
+    @staticmethod
+    def _record_usage(mode: str, usage: ExtractionUsage, filename: Optional[str]) -> None:
+        """Per-document extraction cost, for comparing extraction modes via /metrics."""
+        if not usage.calls:
+            return  # fully restored from checkpoints
+        metrics = get_metrics()
+        metrics.observe('eir_extraction_output_tokens', usage.eval_tokens, mode=mode)
+        metrics.observe('eir_extraction_prompt_tokens', usage.prompt_tokens, mode=mode)
+        metrics.observe('eir_extraction_calls', usage.calls, mode=mode)
+        logger.info(
+            f"Extraction of {filename or 'unknown'} ({mode}): {usage.calls} calls, "
+            f"{usage.eval_tokens} output tokens, {usage.prompt_tokens} prompt tokens"
+        )
+
+    @staticmethod
+    @contextmanager
+    def _limited(limiter, cancel_event: Optional[threading.Event], owner: str):
+        """Hold a limiter slot for a call whose latency is not fed back to the AIMD controller."""
+        try:
+            with limiter.slot(cancel_event, owner):
+                yield
+        except ConcurrencyAcquireCancelled:
+            raise AnalysisCancelled("EIR analysis cancelled while waiting for a slot")
+
+    def analyze_stream(
+        self,
+        text: str,
+        filename: Optional[str] = None,
+        depth: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze an EIR document, yielding results as they become available.
+
+        Yields events in this order:
+            {"type": "stage", "stage": "analyzing", "chunks_done": 0, "chunks_total": N}
+            {"type": "partial", "chunk": i, "chunks_done": n, "chunks_total": N,
+             "failed": bool, "analysis_json": {...}}            (one per chunk)
+            {"type": "partial", "section": "project_info", "chunks_done": 0,
+             "chunks_total": 1, "analysis_json": {...}}         (single-pass: one per section)
+            {"type": "stage", "stage": "gap_fill", "sections": [...]} (see analyze)
+            {"type": "done", "analysis_json": {...}, "summary_markdown": "...",
+             "field_values": {...}, "metadata": {...}}          (see direct_field_values,
+                                                                 last_analysis_stats)
+            {"type": "summary", "analysis_id": "...", "summary_markdown": "...",
+             "model": "..."}                                    (once the polish finishes)
+            {"type": "error", "message": "..."}                 (on failure)
+
+        Each "partial" carries the merged and sanitized analysis of every chunk
+        finished so far, with the parsed tables and pre-extracted entities
+        applied, so sections can be rendered before the analysis finishes.
+        "done" carries the template summary; when a polish was queued, the
+        stream stays open until it finishes (up to POLISH_STREAM_WAIT_S) and
+        sends it as "summary".
+        Closing the iterator (client disconnect) cancels the analysis.
+        """
+        output_q: _queue.Queue = _queue.Queue()
+        cancel_event = threading.Event()
+        finished: Dict[int, Dict[str, Any]] = {}
+
+        sections: Dict[str, Any] = {}
+        entities: Dict[str, Any] = {}
+        tables: Dict[str, Any] = {}
+
+        def _partial(analysis: Dict[str, Any]) -> Dict[str, Any]:
+            if tables:
+                apply_tables(analysis, tables)
+            return apply_entities(analysis, entities) if entities else analysis
+
+        def _on_progress(event: Dict[str, Any]) -> None:
+            stage = event.get('stage')
+            if stage == 'entities':
+                entities.update(event['entities'])
+                return
+            if stage == 'tables':
+                tables.update(event['tables'])
+                return
+            if stage == 'section':
+                sections[event['section']] = event['value']
+                output_q.put({
+                    'type': 'partial',
+                    'section': event['section'],
+                    'chunks_done': 0,
+                    'chunks_total': 1,
+                    'analysis_json': _partial(self._sanitize_analysis(copy.deepcopy(sections))),
+                })
+                return
+            if stage != 'chunk':
+                output_q.put({'type': 'stage', **event})
+                return
+            analysis = event.get('analysis')
+            if analysis is not None:
+                finished[event['chunk']] = analysis
+            # Merge in document order so partials agree with the final result;
+            # the merge returns a new, sanitized analysis
+            output_q.put({
+                'type': 'partial',
+                'chunk': event['chunk'],
+                'chunks_done': event['chunks_done'],
+                'chunks_total': event['chunks_total'],
+                'failed': event['failed'],
+                'analysis_json': _partial(self._merge_analyses([finished[i] for i in sorted(finished)])),
+            })
+
+        def _worker():
+            try:
+                analysis_json, summary_markdown = self.analyze(
+                    text, filename, progress_callback=_on_progress, cancel_event=cancel_event, depth=depth
+                )
+                metadata = self.last_analysis_stats()
+                output_q.put({
+                    'type': 'done',
+                    'analysis_json': analysis_json,
+                    'summary_markdown': summary_markdown,
+                    'field_values': self.direct_field_values(analysis_json),
+                    'metadata': metadata,
+                })
+                if metadata['summary_polish'] == POLISH_PENDING:
+                    polish = get_summary_polisher().get(metadata['analysis_id'])
+                    waited = 0.0
+                    while polish is not None and not polish.wait(1.0) and not cancel_event.is_set():
+                        waited += 1.0
+                        if waited >= self.POLISH_STREAM_WAIT_S:
+                            polish = None
+                    if polish is not None and polish.summary_markdown:
+                        output_q.put({
+                            'type': 'summary',
+                            'analysis_id': polish.analysis_id,
+                            'summary_markdown': polish.summary_markdown,
+                            'model': polish.model,
+                        })
+            except AnalysisCancelled:
+                logger.info(f"Streaming analysis of {filename or 'unknown'} cancelled by client")
+            except Exception as exc:
+                logger.error(f"Streaming EIR analysis error: {exc}", exc_info=True)
+                output_q.put({'type': 'error', 'message': str(exc)})
+            finally:
+                output_q.put(None)  # sentinel
+
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(_worker,), daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = output_q.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            # Reached early when the consumer stops iterating
+            cancel_event.set()
+
+    @staticmethod
+    def _report_progress(progress_callback: Optional[ProgressCallback], **event) -> None:
+        """Send a progress event; callback errors never break the analysis."""
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(event)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    @staticmethod
+    def _check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+        if cancel_event is not None and cancel_event.is_set():
+            raise AnalysisCancelled("EIR analysis cancelled")
 
     @retry(
         stop=stop_after_attempt(3),
@@ -498,16 +1082,19 @@ class EirAnalyzer:
     def _analyze_single(self, text: str) -> Dict[str, Any]:
         """Analyze text in a single pass with optimized parameters and retry logic."""
         # Use larger text limit with increased context window
-        prompt = EIR_ANALYSIS_PROMPT.format(eir_text=text[:self.single_pass_char_limit])
+        template, schema = self._monolithic_prompt()
+        prompt = template.format(eir_text=text[:self.single_pass_char_limit])
 
+        workload, model = self._extraction_call(section=False)
         try:
+            # Budget, temperature, num_ctx and thinking mode come from the
+            # depth's workload profile, 'analysis_chunk' by default
+            # (data/workload_profiles.json)
             response = self.generator.generate_text(
                 prompt=prompt,
-                max_length=2000,  # Reduced from 3000 - JSON structure rarely needs more
-                temperature=0.3,  # Low temperature for structured output
-                num_ctx=8192,  # Larger context window to handle bigger documents in one pass
-                format_schema=EirAnalysis.model_json_schema(),  # Native Ollama structured output (v0.5+)
-                thinking_mode=True  # Qwen3: deep reasoning for complex EIR extraction
+                format_schema=schema,  # Native Ollama structured output (v0.5+)
+                workload=workload,
+                model=model
             )
 
             # Parse JSON from response with robust parsing
@@ -520,85 +1107,129 @@ class EirAnalyzer:
             logger.error(f"Analysis failed: {e}")
             return self._empty_analysis_dict()
 
-    def _analyze_chunked(self, text: str) -> Dict[str, Any]:
-        """Analyze long text in chunks using parallel processing for speed."""
+    def _analyze_single_streaming(
+        self,
+        text: str,
+        progress_callback: ProgressCallback
+    ) -> Dict[str, Any]:
+        """
+        Single-pass analysis that reports each top-level section as soon as
+        the structured output closes it. Falls back to _analyze_single() if
+        streaming fails.
+        """
+        template, schema = self._monolithic_prompt()
+        prompt = template.format(eir_text=text[:self.single_pass_char_limit])
+        workload, model = self._extraction_call(section=False)
+        try:
+            for event in self.generator.generate_json_stream(prompt, schema, workload=workload, model=model):
+                if event['type'] == 'value' and len(event['path']) == 1:
+                    self._report_progress(
+                        progress_callback, stage='section', section=event['path'][0], value=event['value']
+                    )
+                elif event['type'] == 'done':
+                    return self._parse_json_response(event['text'])
+        except Exception as e:
+            logger.warning(f"Streaming analysis failed, retrying without streaming: {e}")
+        return self._analyze_single(text)
+
+    def _split_chunks(self, text: str) -> List[str]:
         from text_extractor import TextExtractor
 
         # Larger chunks with increased context window (8192 tokens ~= 7000 token chunks)
+        # Content-defined boundaries keep unchanged passages of a revised
+        # document in identical chunks, so they hit the chunk cache
         extractor = TextExtractor(max_chunk_tokens=self.chunk_token_limit)
-        chunks = extractor.chunk_text(text)
+        return extractor.chunk_text_content_defined(text)
 
-        logger.info(f"Split into {len(chunks)} chunks for parallel analysis")
-
-        # Dynamic worker count: balance between speed and Ollama capacity
-        # Use OLLAMA_MAX_CONCURRENCY env var, or default to min(cpu_count, 6)
-        cpu_count = os.cpu_count() or 4
-        concurrency_env = os.getenv("OLLAMA_MAX_CONCURRENCY", "").strip().lower()
-        auto_mode = concurrency_env in ("", "auto")
-
-        if auto_mode:
-            ollama_concurrency = min(cpu_count, 6)
-        else:
-            try:
-                ollama_concurrency = int(concurrency_env)
-            except ValueError:
-                logger.warning(
-                    f"Invalid OLLAMA_MAX_CONCURRENCY '{concurrency_env}', using auto mode"
-                )
-                ollama_concurrency = min(cpu_count, 6)
-
-        max_workers = min(len(chunks), max(1, min(ollama_concurrency, 6)))
-
-        logger.info(f"Using {max_workers} parallel workers for chunk analysis")
+    def _run_parallel(
+        self,
+        calls: Dict[Any, Callable[[], Any]],
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """
+        Run calls on a thread pool and yield ``(key, result, error)`` as each finishes.
 
-        chunk_analyses: List[Tuple[int, Dict[str, Any]]] = []
-        start_index = 0
+        Concurrency is governed by the shared AIMD limiter (concurrency.py) the
+        calls acquire their slots from; the pool only needs enough threads to
+        reach its upper bound. Each call runs in a copy of the request context
+        so that the request deadline (deadline.py) applies to it.
 
-        # Auto concurrency: sample first chunk to gauge performance
-        if auto_mode and len(chunks) > 1:
-            sample_start = time.time()
-            sample_success = False
-            try:
-                sample_analysis = self._analyze_single(chunks[0])
-                chunk_analyses.append((0, sample_analysis))
-                sample_success = True
-            except Exception as e:
-                logger.warning(f"Sample chunk analysis failed: {e}")
-            sample_time = time.time() - sample_start
-            if sample_success:
-                if sample_time > self.auto_latency_threshold:
-                    max_workers = max(1, min(2, max_workers))
-                    logger.info(
-                        f"Auto concurrency reduced to {max_workers} "
-                        f"(sample {sample_time:.1f}s > {self.auto_latency_threshold}s)"
-                    )
-                else:
-                    logger.info(
-                        f"Auto concurrency kept at {max_workers} "
-                        f"(sample {sample_time:.1f}s)"
+        Raises:
+            AnalysisCancelled: cancel_event was set (checked at least once a second)
+        """
+        limiter = get_concurrency_limiter()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(calls), limiter.max_limit)))
+        cancelled = False
+        try:
+            future_to_key = {
+                executor.submit(contextvars.copy_context().run, call): key
+                for key, call in calls.items()
+            }
+            pending = set(future_to_key)
+            while pending:
+                done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    raise AnalysisCancelled(
+                        f"EIR analysis cancelled with {len(pending) + len(done)}/{len(calls)} calls unfinished"
                     )
-                start_index = 1
+                for future in done:
+                    error = future.exception()
+                    yield future_to_key[future], (None if error else future.result()), error
+        finally:
+            # On cancellation, drop queued calls and don't wait for the
+            # ones already running (their results are discarded)
+            executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+
+    def _analyze_chunked(
+        self,
+        text: str,
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        checkpoint: Optional[ChunkCheckpoint] = None,
+        owner: Optional[str] = None,
+        usage: Optional[ExtractionUsage] = None
+    ) -> Dict[str, Any]:
+        """Analyze long text in chunks using parallel processing for speed."""
+        chunks = self._split_chunks(text)
 
-        if start_index >= len(chunks):
-            analyses_only = [analysis for _, analysis in chunk_analyses]
-            return self._merge_analyses(analyses_only)
+        logger.info(f"Split into {len(chunks)} chunks for parallel analysis")
+        total = len(chunks)
+        if usage is not None:
+            usage.set_chunks(chunks)
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+
+        # Chunks analysed before a restart are taken from the checkpoint
+        restored = checkpoint.restore(hashes) if checkpoint else {}
+        chunk_analyses: List[Tuple[int, Dict[str, Any]]] = sorted(restored.items())
+        remaining = [i for i in range(total) if i not in restored]
+        self._report_progress(
+            progress_callback, stage='analyzing', chunks_done=len(restored), chunks_total=total
+        )
+        if not remaining:
+            return self._merge_analyses([analysis for _, analysis in chunk_analyses])
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all chunks for parallel processing
-            future_to_idx = {
-                executor.submit(self._analyze_single, chunk): i
-                for i, chunk in enumerate(chunks[start_index:], start=start_index)
-            }
+        limiter = get_concurrency_limiter()
+        logger.info(f"Analyzing {len(remaining)} chunks, concurrency limit {limiter.limit}/{limiter.max_limit}")
 
-            # Collect results as they complete
-            for future in as_completed(future_to_idx):
-                idx = future_to_idx[future]
-                try:
-                    analysis = future.result()
-                    chunk_analyses.append((idx, analysis))
-                    logger.info(f"Chunk {idx+1}/{len(chunks)} completed")
-                except Exception as e:
-                    logger.warning(f"Chunk {idx+1} analysis failed: {e}")
+        calls = {
+            i: (lambda chunk=chunks[i]: self._analyze_chunk_limited(chunk, cancel_event, owner, usage))
+            for i in remaining
+        }
+        chunks_done = len(chunk_analyses)
+        for idx, analysis, error in self._run_parallel(calls, cancel_event):
+            chunks_done += 1
+            if error is None:
+                chunk_analyses.append((idx, analysis))
+                if checkpoint:
+                    checkpoint.save(idx, hashes[idx], analysis)
+                logger.info(f"Chunk {idx+1}/{len(chunks)} completed")
+            else:
+                logger.warning(f"Chunk {idx+1} analysis failed: {error}")
+            self._report_progress(
+                progress_callback, stage='chunk', chunk=idx, chunks_done=chunks_done,
+                chunks_total=total, failed=error is not None, analysis=analysis
+            )
 
         # Sort by original order before merging
         chunk_analyses.sort(key=lambda x: x[0])
@@ -607,23 +1238,274 @@ class EirAnalyzer:
         # Merge chunk analyses
         return self._merge_analyses(analyses_only)
 
+    def _analyze_sectioned(
+        self,
+        chunks: List[str],
+        progress_callback: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        checkpoint: Optional[ChunkCheckpoint] = None,
+        owner: Optional[str] = None,
+        usage: Optional[ExtractionUsage] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract each section (eir_sections.py) from the chunks routed to it,
+        all (section, chunk) calls in parallel. A chunk's analysis is complete,
+        checkpointed and reported once all of its sections have finished.
+        """
+        total = len(chunks)
+        if usage is not None:
+            usage.set_chunks(chunks)
+        hashes = [chunk_hash(chunk) for chunk in chunks]
+        restored = checkpoint.restore(hashes) if checkpoint else {}
+        routes = route_sections(chunks, self.section_routing, self.section_top_k, EirAnalysis)
+        calls = {
+            (section.name, i): (
+                lambda section=section, chunk=chunks[i]:
+                    self._analyze_chunk_limited(chunk, cancel_event, owner, usage, section)
+            )
+            for section in EIR_SECTIONS
+            for i in routes[section.name]
+            if i not in restored
+        }
+        logger.info(
+            f"Sectioned extraction ({self.section_routing}): {len(calls)} calls over {total} chunks "
+            f"(monolithic: {total - len(restored)}); routes "
+            + ', '.join(f"{name}={len(idxs)}" for name, idxs in routes.items())
+        )
+
+        sections_left: Dict[int, int] = {}
+        for _, i in calls:
+            sections_left[i] = sections_left.get(i, 0) + 1
+        analyses: Dict[int, Dict[str, Any]] = dict(restored)
+        for i in sections_left:
+            analyses[i] = self._empty_analysis_dict()
+        failed = set()
+        chunks_done = total - len(sections_left)  # restored, or routed to no section
+        self._report_progress(progress_callback, stage='analyzing', chunks_done=chunks_done, chunks_total=total)
+
+        for (name, idx), result, error in self._run_parallel(calls, cancel_event):
+            if error is None:
+                analyses[idx].update(result)
+                if total == 1:
+                    for field, value in result.items():
+                        self._report_progress(progress_callback, stage='section', section=field, value=value)
+            else:
+                failed.add(idx)
+                logger.warning(f"Section {name} of chunk {idx+1} failed: {error}")
+            sections_left[idx] -= 1
+            if sections_left[idx]:
+                continue
+            chunks_done += 1
+            if checkpoint and idx not in failed:
+                checkpoint.save(idx, hashes[idx], analyses[idx])
+            self._report_progress(
+                progress_callback, stage='chunk', chunk=idx, chunks_done=chunks_done,
+                chunks_total=total, failed=idx in failed, analysis=analyses[idx]
+            )
+
+        # Chunks no section was routed to contribute nothing
+        return self._merge_analyses([analyses[i] for i in sorted(analyses)])
+
+    def _gap_fill(
+        self,
+        analysis: Dict[str, Any],
+        text: str,
+        progress_callback: Optional[ProgressCallback],
+        cancel_event: Optional[threading.Event],
+        owner: str,
+        usage: ExtractionUsage
+    ) -> Dict[str, Any]:
+        """
+        Re-extract the sections with less than EIR_GAP_FILL_MIN_COVERAGE of
+        their values filled, each with its focused section prompt over the
+        EIR_GAP_FILL_PASSAGES passages of ``text`` that score best for it
+        (BM25, as in sectioned routing). The calls run concurrently and only
+        fill values that are still empty, in place.
+
+        Returns:
+            ``{"sections": [re-extracted], "filled": [gained values], "duration_s": float}``
+        """
+        started = time.time()
+        report: Dict[str, Any] = {'sections': [], 'filled': [], 'duration_s': 0.0}
+        gaps = [
+            section for section in EIR_SECTIONS
+            if self._section_coverage(analysis, section) * 100 < self.gap_fill_min_coverage
+        ]
+        if not gaps:
+            return report
+
+        passages = self._passages(text)
+        index = ChunkIndex(passages)
+        excerpts: Dict[ExtractionSection, str] = {}
+        for section in gaps:
+            selected = index.top_k(section_query(section, EirAnalysis), self.gap_fill_passages)
+            if selected:  # nothing in the document matches the section
+                excerpts[section] = '\n\n'.join(passages[i] for i in selected)
+        report['sections'] = [section.name for section in excerpts]
+        if excerpts:
+            self._report_progress(progress_callback, stage='gap_fill', sections=report['sections'])
+            calls = {
+                section: (
+                    lambda section=section, excerpt=excerpt:
+                        self._analyze_chunk_limited(excerpt, cancel_event, owner, usage, section)
+                )
+                for section, excerpt in excerpts.items()
+            }
+            for section, result, error in self._run_parallel(calls, cancel_event):
+                if error is not None:
+                    logger.warning(f"Gap-fill of section {section.name} failed: {error}")
+                    continue
+                found = self._sanitize_analysis(result)
+                filled = [self._fill_empty(analysis, field, found[field]) for field in section.fields]
+                if any(filled):
+                    report['filled'].append(section.name)
+
+        report['duration_s'] = round(time.time() - started, 1)
+        get_metrics().observe('eir_gap_fill_sections', len(excerpts))
+        logger.info(
+            f"Gap-fill: {len(gaps)} low-coverage sections, re-extracted "
+            f"{', '.join(report['sections']) or 'none'}, filled {', '.join(report['filled']) or 'none'} "
+            f"in {report['duration_s']}s"
+        )
+        return report
+
+    @classmethod
+    def _section_coverage(cls, analysis: Dict[str, Any], section: ExtractionSection) -> float:
+        """Share of the section's values that are filled (a non-empty list counts as one value)."""
+        filled = total = 0
+        for field in section.fields:
+            field_filled, field_total = cls._value_coverage(analysis.get(field))
+            filled += field_filled
+            total += field_total
+        return filled / total if total else 1.0
+
+    @classmethod
+    def _value_coverage(cls, value: Any) -> Tuple[int, int]:
+        if isinstance(value, dict):
+            counts = [cls._value_coverage(v) for v in value.values()]
+            return sum(f for f, _ in counts), sum(t for _, t in counts)
+        return (1 if value else 0), 1
+
+    @classmethod
+    def _fill_empty(cls, target: Dict[str, Any], key: str, value: Any) -> bool:
+        """Set ``target[key]`` to ``value`` where empty, recursing into nested models; True if anything was set."""
+        current = target.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            merged = dict(current)  # replaced, not mutated (it may be shared)
+            filled = [cls._fill_empty(merged, k, v) for k, v in value.items()]
+            target[key] = merged
+            return any(filled)
+        if current or not value:
+            return False
+        target[key] = value
+        return True
+
+    def _passages(self, text: str) -> List[str]:
+        """Split ``text`` into passages of about GAP_FILL_PASSAGE_CHARS, at blank lines where possible."""
+        limit = self.GAP_FILL_PASSAGE_CHARS
+        passages: List[str] = []
+        lines: List[str] = []
+        size = 0
+        for line in text.splitlines():
+            if lines and (size + len(line) > limit or (not line.strip() and size >= limit // 2)):
+                passages.append('\n'.join(lines).strip())
+                lines, size = [], 0
+            if line.strip() or lines:
+                lines.append(line)
+                size += len(line) + 1
+        if lines:
+            passages.append('\n'.join(lines).strip())
+        return [passage for passage in passages if passage]
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type((ConnectionError, TimeoutError, Exception)),
+        reraise=True
+    )
+    def _extract_section(self, section: ExtractionSection, text: str) -> Dict[str, Any]:
+        """Extract one section from a chunk; returns only that section's fields."""
+        model = section_model(section, EirAnalysis)
+        workload, model_override = self._extraction_call(section=True)
+        try:
+            response = self.generator.generate_text(
+                prompt=section.prompt(text[:self.single_pass_char_limit]),
+                format_schema=model.model_json_schema(),
+                workload=workload,
+                model=model_override
+            )
+            parsed = self._parse_json_response(response)
+        except (ConnectionError, TimeoutError) as e:
+            logger.warning(f"Connection error during {section.name} extraction, will retry: {e}")
+            raise  # Re-raise to trigger retry
+        except Exception as e:
+            logger.error(f"Section {section.name} extraction failed: {e}")
+            parsed = self._empty_analysis_dict()
+        return {field: parsed[field] for field in section.fields if parsed.get(field) is not None}
+
+    def _analyze_chunk_limited(
+        self,
+        chunk: str,
+        cancel_event: Optional[threading.Event] = None,
+        owner: Optional[str] = None,
+        usage: Optional[ExtractionUsage] = None,
+        section: Optional[ExtractionSection] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze one chunk (or one section of it) within a concurrency slot and
+        feed the outcome back to the limiter. Cached results skip the slot.
+        """
+        cache_key, cached = self._cache_lookup(chunk, section, usage)
+        if cached is not None:
+            return cached
+        limiter = get_concurrency_limiter()
+        try:
+            with limiter.slot(cancel_event, owner):
+                self.generator.reset_call_stats()
+                started = time.time()
+                try:
+                    if section is not None:
+                        analysis = self._extract_section(section, chunk)
+                    else:
+                        analysis = self._analyze_single(chunk)
+                except Exception:
+                    limiter.record(time.time() - started, ok=False)
+                    raise
+                stats = self.generator.last_call_stats()
+                if usage is not None:
+                    usage.add(stats)
+                self._cache_store(cache_key, analysis, stats, time.time() - started)
+                if stats.get('status') == 'deadline':
+                    return analysis  # the caller's budget, not Ollama load
+                limiter.record(
+                    (stats.get('latency_ms') or (time.time() - started) * 1000) / 1000,
+                    eval_tokens=stats.get('eval_tokens'),
+                    ok=stats.get('status') == 'ok'
+                )
+                return analysis
+        except ConcurrencyAcquireCancelled:
+            raise AnalysisCancelled("EIR analysis cancelled while waiting for a slot")
+
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse JSON from LLM response with robust error handling.
 
         When Ollama structured output (format_schema) is used the response is
         already valid JSON, so the fast path below succeeds and the repair
         fallbacks are never reached.  A DEBUG log indicates which path ran.
+
+        This is the one place a chunk's analysis is validated against
+        EirAnalysis; merging and sanitizing rely on the dict's shape.
         """
         # Clean response
         text = response.strip()
 
-        # Fast path: structured output (Ollama v0.5+) already returns valid JSON
+        # Fast path: structured output (Ollama v0.5+) already returns valid JSON,
+        # parsed and validated in one pass
         try:
-            data = json.loads(text)
-            validated = EirAnalysis.model_validate(data, strict=False)
+            validated = EirAnalysis.model_validate_json(text, strict=False)
             logger.debug("_parse_json_response: fast path (structured output) succeeded")
             return validated.model_dump()
-        except (json.JSONDecodeError, ValidationError):
+        except ValidationError:
             pass
 
         # Slow path: free-text with possible markdown fences / repair needed
@@ -660,29 +1542,37 @@ class EirAnalyzer:
             try:
                 validated = EirAnalysis(**data)
                 return validated.model_dump()
-            except ValidationError:
+            except (ValidationError, TypeError):
                 # Try more tolerant validation with type coercion
                 try:
                     validated = EirAnalysis.model_validate(data, strict=False)
                     return validated.model_dump()
                 except ValidationError as e:
                     logger.warning(f"Pydantic validation error (lenient mode): {e}")
-                    # Return raw data as last resort
-                    return data
+                    # Last resort: keep the sections that validate on their own
+                    return self._salvage_analysis(data)
         except json.JSONDecodeError as e:
             logger.warning(f"JSON parse error: {e}")
             logger.debug(f"Raw response: {text[:500]}")
             return self._empty_analysis_dict()
 
     def _merge_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Merge multiple chunk analyses into one with fuzzy deduplication."""
+        """
+        Merge multiple chunk analyses into one with fuzzy deduplication.
+
+        List items are collected per target list across all analyses and
+        deduplicated once per list at the end (see fuzzy_dedup.py). The chunk
+        analyses are already validated, so the merged dict is sanitized in
+        place without another validation pass. Returns a new, sanitized dict.
+        """
         if not analyses:
             return self._empty_analysis_dict()
 
         if len(analyses) == 1:
-            return analyses[0]
+            return self._sanitize_analysis(analyses[0])
 
         merged = self._empty_analysis_dict()
+        lists = ListMerger()
 
         for analysis in analyses:
             # Merge project_info (prefer non-null values)
@@ -699,25 +1589,19 @@ class EirAnalyzer:
                     merged.setdefault(list_key, [])
                     # Use lower threshold for objectives and requirements (more lenient)
                     threshold = self.FUZZY_THRESHOLD_OBJECTIVES if list_key in ['bim_objectives', 'other_requirements'] else self.FUZZY_THRESHOLD_GENERAL
-                    for item in analysis[list_key]:
-                        if item and not self._is_duplicate_fuzzy(item, merged[list_key], threshold):
-                            merged[list_key].append(item)
+                    lists.add(merged[list_key], analysis[list_key], threshold)
 
             # Merge delivery_milestones
             if 'delivery_milestones' in analysis:
                 merged.setdefault('delivery_milestones', [])
-                for milestone in analysis['delivery_milestones']:
-                    phase = milestone.get('phase', '')
-                    if not self._milestone_exists(phase, merged['delivery_milestones']):
-                        merged['delivery_milestones'].append(milestone)
+                lists.add(merged['delivery_milestones'], analysis['delivery_milestones'],
+                          self.FUZZY_THRESHOLD_GENERAL, key=lambda milestone: milestone.get('phase', ''))
 
             # Merge roles_responsibilities
             if 'roles_responsibilities' in analysis:
                 merged.setdefault('roles_responsibilities', [])
-                for role in analysis['roles_responsibilities']:
-                    role_name = role.get('role', '')
-                    if not self._role_exists(role_name, merged['roles_responsibilities']):
-                        merged['roles_responsibilities'].append(role)
+                lists.add(merged['roles_responsibilities'], analysis['roles_responsibilities'],
+                          self.FUZZY_THRESHOLD_GENERAL, key=lambda role: role.get('role', ''))
 
             # Merge nested dicts
             for dict_key in ['information_requirements', 'standards_protocols',
@@ -731,9 +1615,7 @@ class EirAnalyzer:
                                 merged[dict_key].setdefault(key, [])
                                 # Use lower threshold for information requirements
                                 threshold = self.FUZZY_THRESHOLD_OBJECTIVES if dict_key == 'information_requirements' else self.FUZZY_THRESHOLD_GENERAL
-                                for item in value:
-                                    if item and not self._is_duplicate_fuzzy(item, merged[dict_key][key], threshold):
-                                        merged[dict_key][key].append(item)
+                                lists.add(merged[dict_key][key], value, threshold)
                             elif not merged[dict_key].get(key):
                                 merged[dict_key][key] = value
 
@@ -745,9 +1627,7 @@ class EirAnalyzer:
                     tgt['bim_competency_standards'] = src['bim_competency_standards']
                 for list_key in ['required_certifications', 'project_specific_training']:
                     tgt.setdefault(list_key, [])
-                    for item in (src.get(list_key) or []):
-                        if item and not self._is_duplicate_fuzzy(item, tgt[list_key], self.FUZZY_THRESHOLD_GENERAL):
-                            tgt[list_key].append(item)
+                    lists.add(tgt[list_key], src.get(list_key) or [], self.FUZZY_THRESHOLD_GENERAL)
 
             # Merge security_requirements (prefer non-null scalar)
             if 'security_requirements' in analysis and analysis['security_requirements']:
@@ -767,9 +1647,7 @@ class EirAnalyzer:
                     tgt['bcf_workflow_required'] = True
                 for list_key in ['exchange_events', 'collaboration_meetings']:
                     tgt.setdefault(list_key, [])
-                    for item in (src.get(list_key) or []):
-                        if item and not self._is_duplicate_fuzzy(item, tgt[list_key], self.FUZZY_THRESHOLD_GENERAL):
-                            tgt[list_key].append(item)
+                    lists.add(tgt[list_key], src.get(list_key) or [], self.FUZZY_THRESHOLD_GENERAL)
 
             # Merge loin_requirements (keyed by stage+discipline)
             if 'loin_requirements' in analysis and analysis['loin_requirements']:
@@ -784,17 +1662,25 @@ class EirAnalyzer:
                         merged['loin_requirements'].append(entry)
                         existing_keys.add(key)
 
-        return self._sanitize_analysis(merged)
+        lists.flush()
+        return self._sanitize_analysis(merged, validate=False)
 
-    def _sanitize_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        """Remove placeholders, gibberish, and empty entries from analysis."""
-        try:
-            validated = EirAnalysis.model_validate(analysis, strict=False).model_dump()
-        except ValidationError:
-            validated = EirAnalysis().model_dump()
-            for key, value in analysis.items():
-                if key in validated:
-                    validated[key] = value
+    def _sanitize_analysis(self, analysis: Dict[str, Any], validate: bool = True) -> Dict[str, Any]:
+        """
+        Remove placeholders, gibberish, and empty entries from analysis.
+
+        By default the analysis is validated into a new dict first. With
+        ``validate=False`` it must be a complete EirAnalysis-shaped dict owned
+        by the caller, and is cleaned in place (nested items are replaced,
+        not mutated).
+        """
+        if not validate:
+            validated = analysis
+        else:
+            try:
+                validated = EirAnalysis.model_validate(analysis, strict=False).model_dump()
+            except ValidationError:
+                validated = self._salvage_analysis(analysis)
 
         # Project info
         project_info = validated.get('project_info', {})
@@ -1042,136 +1928,81 @@ class EirAnalyzer:
 
         return False
 
-    def _is_duplicate_fuzzy(self, item: str, existing_list: List[str], threshold: Optional[int] = None) -> bool:
-        """Check if item is a fuzzy duplicate of any item in existing_list."""
-        if threshold is None:
-            threshold = self.FUZZY_THRESHOLD_GENERAL
-
-        # Handle None or empty items
-        if not item or not isinstance(item, str):
-            return False
-
-        if not HAS_RAPIDFUZZ or not fuzz:
-            # Fallback to exact match
-            return item in existing_list
-
-        for existing in existing_list:
-            # Skip None or non-string values
-            if not existing or not isinstance(existing, str):
-                continue
-            if fuzz.ratio(item.lower(), existing.lower()) >= threshold:
-                return True
-        return False
-
-    def _milestone_exists(self, phase: str, milestones: List[Dict[str, Any]]) -> bool:
-        """Check if milestone with similar phase already exists."""
-        if not phase or not isinstance(phase, str):
-            return False
-        for m in milestones:
-            existing_phase = m.get('phase', '')
-            # Skip None or empty values
-            if not existing_phase or not isinstance(existing_phase, str):
-                continue
-            if HAS_RAPIDFUZZ and fuzz:
-                if fuzz.ratio(phase.lower(), existing_phase.lower()) >= self.FUZZY_THRESHOLD_GENERAL:
-                    return True
-            else:
-                if phase.lower() == existing_phase.lower():
-                    return True
-        return False
-
-    def _role_exists(self, role: str, roles: List[Dict[str, Any]]) -> bool:
-        """Check if role with similar name already exists."""
-        if not role or not isinstance(role, str):
-            return False
-        for r in roles:
-            existing_role = r.get('role', '')
-            # Skip None or empty values
-            if not existing_role or not isinstance(existing_role, str):
-                continue
-            if HAS_RAPIDFUZZ and fuzz:
-                if fuzz.ratio(role.lower(), existing_role.lower()) >= self.FUZZY_THRESHOLD_GENERAL:
-                    return True
-            else:
-                if role.lower() == existing_role.lower():
-                    return True
-        return False
-
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((ConnectionError, TimeoutError, Exception)),
         reraise=True
     )
-    def _generate_summary(self, analysis_json: Dict[str, Any]) -> str:
-        """Generate markdown summary from analysis JSON with optimized parameters and retry logic."""
-        prompt = SUMMARY_PROMPT.format(
-            analysis_json=json.dumps(analysis_json, indent=2, ensure_ascii=False)
-        )
-
-        try:
-            summary = self.generator.generate_text(
-                prompt=prompt,
-                max_length=800,  # Reduced from 1500 - summaries are concise by nature
-                temperature=0.5,
-                num_ctx=4096,  # Sufficient context for summary generation
-                thinking_mode=True  # Qwen3: reasoning improves EIR summary quality
-            )
-            return summary.strip()
-        except (ConnectionError, TimeoutError) as e:
-            logger.warning(f"Connection error during summary generation, will retry: {e}")
-            raise  # Re-raise to trigger retry
-        except Exception as e:
-            logger.error(f"Summary generation failed: {e}")
-            return self._fallback_summary(analysis_json)
-
-    def _fallback_summary(self, analysis: Dict[str, Any]) -> str:
-        """Generate a basic summary if LLM fails."""
-        parts = ["## EIR Analysis\n"]
-
-        # Project info
-        if analysis.get('project_info', {}).get('name'):
-            parts.append(f"**Project:** {analysis['project_info']['name']}\n")
-
-        # Objectives
-        if analysis.get('bim_objectives'):
-            parts.append("\n### BIM Objectives\n")
-            for obj in analysis['bim_objectives'][:5]:
-                parts.append(f"- {obj}\n")
-
-        # Milestones
-        if analysis.get('delivery_milestones'):
-            parts.append("\n### Milestones\n")
-            for ms in analysis['delivery_milestones'][:5]:
-                parts.append(f"- {ms.get('phase', 'N/A')}: {ms.get('description', '')}\n")
+    def polish_summary(self, analysis: StoredAnalysis) -> Tuple[str, Optional[str]]:
+        """
+        LLM-written markdown summary of an analysis and the model that wrote
+        it. Run in the background by the summary polisher; it takes a
+        concurrency slot like any other call, so analyses keep their share.
 
-        return ''.join(parts)
+        Raises:
+            RuntimeError: The call failed or returned nothing (retried; the
+                template summary then stays the summary).
+        """
+        prompt = SUMMARY_PROMPT.format(analysis_json=analysis.context())
+        with self._limited(get_concurrency_limiter(), None, 'summary-polish'):
+            self.generator.reset_call_stats()
+            summary = self.generator.generate_text(prompt=prompt, workload='summary')
+            stats = self.generator.last_call_stats()
+        if stats.get('status') != 'ok' or not summary.strip():
+            raise RuntimeError(f"Summary generation failed: {summary[:200]}")
+        return summary.strip(), stats.get('model')
 
     def _empty_analysis_dict(self) -> Dict[str, Any]:
         """Return empty analysis structure as dict."""
         return EirAnalysis().model_dump()
 
+    def _salvage_analysis(self, data: Any) -> Dict[str, Any]:
+        """Empty analysis with every top-level section of ``data`` that validates on its own."""
+        salvaged = self._empty_analysis_dict()
+        if not isinstance(data, dict):
+            return salvaged
+        for key, value in data.items():
+            if key not in salvaged:
+                continue
+            try:
+                salvaged[key] = EirAnalysis.model_validate({key: value}, strict=False).model_dump()[key]
+            except ValidationError:
+                logger.debug(f"Dropping invalid analysis section '{key}'")
+        return salvaged
+
+    def route_for_field(self, field_type: str) -> ModelRoute:
+        """Pick the model route for a BEP field from its guidance (see model_router.py)."""
+        guidance = FIELD_GUIDANCE.get(field_type, _DEFAULT_FIELD_GUIDANCE)
+        return get_model_router().route(field_type, guidance)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((ConnectionError, TimeoutError, Exception)),
         reraise=True
     )
-    def suggest_for_field(self, analysis_json: Dict[str, Any],
-                          field_type: str, partial_text: str = "") -> str:
+    def suggest_for_field(self, analysis: Union[StoredAnalysis, Dict[str, Any]],
+                          field_type: str, partial_text: str = "",
+                          route: Optional[ModelRoute] = None) -> str:
         """
         Generate a suggestion for a specific BEP field based on EIR analysis.
 
         Args:
-            analysis_json: Parsed EIR analysis
+            analysis: Stored EIR analysis (see analysis_store.py), or the
+                analysis JSON, which is then stored
             field_type: BEP field type (e.g., 'bimGoals', 'projectDescription')
             partial_text: Existing text in the field
+            route: Model route to use; None uses the analyzer's model
 
         Returns:
             Suggested text for the field
         """
+        if not isinstance(analysis, StoredAnalysis):
+            analysis = get_analysis_store().put(analysis)
+
         # First try direct extraction from analysis
-        direct_value = self._extract_field_value(analysis_json, field_type)
+        direct_value = self._extract_field_value(analysis.analysis, field_type)
         if direct_value and not partial_text:
             return direct_value
 
@@ -1183,20 +2014,25 @@ class EirAnalyzer:
         )
 
         # Generate suggestion using LLM with retry logic
+        sections = self.context_sections(field_type) if self.field_scoped_context else None
         prompt = FIELD_SUGGESTION_PROMPT.format(
             field_type=field_type,
             field_guidance=field_guidance,
-            analysis_json=json.dumps(analysis_json, indent=2, ensure_ascii=False),
+            analysis_json=analysis.context(sections),
             partial_text_block=partial_text_block,
         )
 
         try:
             suggestion = self.generator.generate_text(
                 prompt=prompt,
-                max_length=600,
-                temperature=0.4,
-                thinking_mode=True  # Qwen3: deeper reasoning over EIR analysis produces higher-quality field content
+                workload='eir_suggestion',
+                model=route.model if route else None,
+                thinking_mode=route.thinking if route else None
             )
+            stats = self.generator.last_call_stats()
+            if route:
+                get_model_router().record(route, stats)
+            self._record_suggestion_context(sections, stats)
             return suggestion.strip()
         except (ConnectionError, TimeoutError) as e:
             logger.warning(f"Connection error during field suggestion, will retry: {e}")
@@ -1205,6 +2041,44 @@ class EirAnalyzer:
             logger.error(f"Field suggestion failed: {e}")
             return direct_value or ""
 
+    def direct_field_values(self, analysis: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Every FIELD_MAPPING field that can be filled straight from
+        ``analysis``, with no LLM call, mapped to the value suggest_for_field
+        would return for it. Fields with nothing extracted are left out.
+        """
+        values = {}
+        for field_type in self.FIELD_MAPPING:
+            value = self._extract_field_value(analysis, field_type)
+            if value:
+                values[field_type] = value
+        return values
+
+    @classmethod
+    def context_sections(cls, field_type: str) -> Optional[Tuple[str, ...]]:
+        """
+        Analysis sections a field's suggestion prompt is built from: the
+        section its FIELD_MAPPING path starts in, plus project_info. None
+        (the whole analysis) for fields without a mapping.
+        """
+        mapping_path = cls.FIELD_MAPPING.get(field_type)
+        if not mapping_path:
+            return None
+        section = mapping_path.split('.', 1)[0]
+        return ('project_info',) if section == 'project_info' else ('project_info', section)
+
+    @staticmethod
+    def _record_suggestion_context(sections: Optional[Tuple[str, ...]], stats: Dict[str, Any]) -> None:
+        """Prompt tokens and time to first token of a suggestion, by context scope."""
+        if stats.get('status') != 'ok':
+            return
+        metrics = get_metrics()
+        scope = 'full' if sections is None else 'field'
+        if stats.get('prompt_tokens'):
+            metrics.observe('eir_suggestion_prompt_tokens', stats['prompt_tokens'], context=scope)
+        if stats.get('ttft_ms') is not None:
+            metrics.observe('eir_suggestion_ttft_ms', stats['ttft_ms'], context=scope)
+
     def _extract_field_value(self, analysis: Dict[str, Any], field_type: str) -> Optional[str]:
         """Extract a value directly from analysis based on field mapping with rich composition."""
         mapping_path = self.FIELD_MAPPING.get(field_type)
@@ -1240,7 +2114,7 @@ class EirAnalyzer:
                 return '\n'.join(lines)
 
             # Special handling for roles_responsibilities
-            if field_type in ['roles', 'rolesResponsibilities'] and value and isinstance(value[0], dict):
+            if mapping_path == 'roles_responsibilities' and value and isinstance(value[0], dict):
                 lines = []
                 for role in value:
                     role_name = role.get('role', 'N/A')
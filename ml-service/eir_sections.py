@@ -0,0 +1,279 @@
+"""
+EIR Sections Module
+
+Splits the monolithic EIR extraction (one prompt and one grammar covering every
+``EirAnalysis`` section) into focused sections. Each section has a short prompt,
+a sub-schema holding only its fields, and routing, so it is only sent to the
+chunks relevant to it. A chunk about the CDE then pays for generating
+the CDE section, not all 17 top-level fields.
+
+Used by ``EirAnalyzer`` when EIR_EXTRACTION_MODE=sectioned.
+
+Routing strategies (EIR_SECTION_ROUTING):
+    - "bm25" (default): each section gets the EIR_SECTION_TOP_K chunks that
+      score best in a BM25 index of the document (chunk_index.py). The query
+      is built from the section's EirAnalysis field names, its retrieval terms
+      and its ISO 19650 glossary concepts
+    - "keywords": ``always`` sections (requirements, which holds the catch-all
+      ``other_requirements``) get every chunk, other sections every chunk
+      matching one of their keyword patterns
+    - "all": every section gets every chunk (full scan; reference for recall)
+In every strategy ``first_chunk`` sections (project info) get the first chunk.
+"""
+
+import re
+import typing
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+from chunk_index import ChunkIndex, glossary_concept, tokenize
+
+SECTION_ROUTINGS = ('bm25', 'keywords', 'all')
+
+
+class ExtractionSection:
+    """One focused extraction: the EirAnalysis fields it fills, its prompt and routing."""
+
+    def __init__(self, name: str, title: str, fields: Tuple[str, ...], structure: str,
+                 guidance: str = '', keywords: Sequence[str] = (), terms: Sequence[str] = (),
+                 glossary: Sequence[str] = (), always: bool = False, first_chunk: bool = False):
+        self.name = name
+        self.title = title
+        self.fields = fields
+        self.structure = structure
+        self.guidance = guidance
+        self.terms = tuple(terms)
+        self.glossary = tuple(glossary)
+        self.always = always
+        self.first_chunk = first_chunk
+        self._pattern = re.compile('|'.join(keywords), re.IGNORECASE) if keywords else None
+
+    def matches(self, chunk: str) -> bool:
+        return self._pattern is not None and self._pattern.search(chunk) is not None
+
+    def prompt(self, eir_text: str) -> str:
+        return SECTION_PROMPT.format(
+            title=self.title,
+            structure=self.structure,
+            guidance=f"{self.guidance}\n" if self.guidance else '',
+            eir_text=eir_text,
+        )
+
+
+SECTION_PROMPT = """You are an ISO 19650 and BIM information management expert. From the Exchange Information Requirements (EIR) excerpt below, extract only the {title}.
+
+Return ONLY a valid JSON object with exactly this structure:
+{structure}
+
+{guidance}Use null for missing strings and [] for missing lists. Extract only what the excerpt states explicitly; do not invent data or copy placeholder text.
+
+EIR EXCERPT:
+{eir_text}
+
+JSON:"""
+
+
+EIR_SECTIONS: List[ExtractionSection] = [
+    ExtractionSection(
+        name='project',
+        title='project information, BIM objectives and plain language questions',
+        fields=('project_info', 'bim_objectives', 'plain_language_questions'),
+        structure="""{
+  "project_info": {"name": "string or null", "description": "string or null", "location": "string or null",
+                   "client": "string or null", "project_type": "string or null", "estimated_value": "string or null"},
+  "bim_objectives": ["main BIM objectives"],
+  "plain_language_questions": ["plain language questions if present"]
+}""",
+        keywords=(r'project (name|title|description|overview|details|location|value|type)', r'\bclient\b',
+                  r'appointing party', r'\bemployer\b', r'objective', r'\bgoals?\b', r'\bBIM uses?\b',
+                  r'plain language', r'\bPLQs?\b'),
+        terms=('project', 'client', 'appointing', 'employer', 'location', 'objective', 'goal', 'purpose',
+               'question', 'value', 'type', 'use'),
+        glossary=('Plain_Language_Questions',),
+        first_chunk=True,
+    ),
+    ExtractionSection(
+        name='requirements',
+        title='information requirements, specific risks and other requirements',
+        fields=('information_requirements', 'specific_risks', 'other_requirements'),
+        structure="""{
+  "information_requirements": {"OIR": ["Organizational Information Requirements"], "AIR": ["Asset Information Requirements"],
+                               "PIR": ["Project Information Requirements"], "EIR_specifics": ["specific EIR requirements"]},
+  "specific_risks": ["identified specific risks or requirements"],
+  "other_requirements": ["requirements that fit no other BEP section"]
+}""",
+        guidance="Do not list CDE, standards, milestones, roles, quality, handover, security or LOIN requirements here; "
+                 "they are extracted separately.",
+        terms=('oir', 'air', 'pir', 'eir', 'organisational', 'organizational', 'asset', 'risk', 'requirement'),
+        glossary=('AIR', 'EIR', 'PIM', 'AIM'),
+        always=True,
+    ),
+    ExtractionSection(
+        name='milestones',
+        title='delivery milestones',
+        fields=('delivery_milestones',),
+        structure="""{
+  "delivery_milestones": [{"phase": "phase name", "description": "description", "date": "date or null"}]
+}""",
+        keywords=(r'milestone', r'\bstages?\b', r'\bphases?\b', r'programme', r'schedule', r'deadline',
+                  r'gateway', r'\bRIBA\b', r'data drop', r'\b(19|20)\d{2}\b'),
+        terms=('milestone', 'stage', 'phase', 'programme', 'schedule', 'date', 'deadline', 'gateway', 'riba',
+               'delivery', 'drop'),
+        glossary=('MIDP', 'TIDP'),
+    ),
+    ExtractionSection(
+        name='standards',
+        title='standards, protocols and software requirements',
+        fields=('standards_protocols', 'software_requirements'),
+        structure="""{
+  "standards_protocols": {"classification_systems": ["e.g. Uniclass 2015"], "naming_conventions": "string or null",
+                          "file_formats": ["e.g. IFC, PDF"], "lod_loi_requirements": "string or null",
+                          "cad_standards": "string or null"},
+  "software_requirements": ["required software"]
+}""",
+        keywords=(r'standard', r'classification', r'uniclass', r'naming', r'file format', r'\bIFC\b', r'\bDWG\b',
+                  r'\bPDF\b', r'\bCAD\b', r'software', r'revit', r'navisworks', r'archicad', r'solibri',
+                  r'\bLO[DI]\b', r'level of (detail|information)', r'BS ?1192'),
+        terms=('standard', 'classification', 'uniclass', 'naming', 'convention', 'format', 'ifc', 'dwg', 'pdf',
+               'cad', 'software', 'revit', 'navisworks', 'archicad', 'solibri', 'version'),
+        glossary=('IFC', 'Uniclass', 'Information_Container'),
+    ),
+    ExtractionSection(
+        name='cde',
+        title='Common Data Environment (CDE) requirements',
+        fields=('cde_requirements',),
+        structure="""{
+  "cde_requirements": {"platform": "string or null", "workflow_states": ["e.g. WIP, Shared, Published, Archived"],
+                       "access_control": "string or null", "folder_structure": "string or null"}
+}""",
+        keywords=(r'\bCDE\b', r'common data environment', r'workflow state', r'\bWIP\b', r'work in progress',
+                  r'\bpublished\b', r'\barchived?\b', r'folder', r'access control', r'BIM ?360',
+                  r'\bACC\b', r'viewpoint', r'projectwise', r'aconex', r'sharepoint'),
+        terms=('cde', 'platform', 'workflow', 'wip', 'shared', 'published', 'archived', 'archive', 'folder',
+               'access', 'status', 'suitability'),
+        glossary=('CDE',),
+    ),
+    ExtractionSection(
+        name='roles',
+        title='roles and responsibilities, and training and competency requirements',
+        fields=('roles_responsibilities', 'training_requirements'),
+        structure="""{
+  "roles_responsibilities": [{"role": "role name", "responsibilities": ["responsibilities"]}],
+  "training_requirements": {"bim_competency_standards": "string or null", "required_certifications": ["certifications"],
+                            "project_specific_training": ["project-specific training items"]}
+}""",
+        keywords=(r'\broles?\b', r'responsib', r'manager', r'\blead\b', r'coordinator', r'appointed party',
+                  r'task team', r'training', r'competen', r'certif', r'\bskills?\b'),
+        terms=('role', 'responsibility', 'responsibilities', 'manager', 'lead', 'coordinator', 'appointed',
+               'team', 'training', 'competency', 'certification', 'skill'),
+        glossary=('Information_Manager', 'Lead_Appointed_Party', 'Appointed_Party', 'Task_Team'),
+    ),
+    ExtractionSection(
+        name='quality_handover',
+        title='quality assurance and asset handover requirements',
+        fields=('quality_requirements', 'handover_requirements'),
+        structure="""{
+  "quality_requirements": {"model_checking": "string or null", "clash_detection": "string or null",
+                           "validation_procedures": "string or null"},
+  "handover_requirements": {"cobie_required": false, "asset_data": "string or null", "documentation": ["required documentation"]}
+}""",
+        keywords=(r'quality', r'check', r'clash', r'validat', r'review', r'audit', r'handover', r'cobie',
+                  r'asset data', r'as[- ]built', r'O&M', r'operation and maintenance', r'facilit'),
+        terms=('quality', 'check', 'checking', 'clash', 'validation', 'review', 'audit', 'handover', 'cobie',
+               'asset', 'built', 'maintenance', 'operation', 'facility', 'documentation'),
+        glossary=('COBie', 'Clash_Detection', 'AIM', 'Federation'),
+    ),
+    ExtractionSection(
+        name='security_protocols',
+        title='information security requirements and information exchange protocols',
+        fields=('security_requirements', 'information_protocols'),
+        structure="""{
+  "security_requirements": {"classification_scheme": "e.g. UK OFFICIAL SENSITIVE or null",
+                            "data_handling_requirements": "string or null", "access_control_policy": "string or null"},
+  "information_protocols": {"exchange_events": ["named trigger points for information delivery"],
+                            "coordination_frequency": "e.g. fortnightly or null", "bcf_workflow_required": false,
+                            "collaboration_meetings": ["coordination or BIM meeting types"]}
+}""",
+        guidance="Exchange events are named trigger points for information delivery, e.g. Design Freeze, Stage Gate 3, Handover.",
+        keywords=(r'secur', r'confidential', r'sensitiv', r'\bGDPR\b', r'\bOFFICIAL\b', r'retention',
+                  r'data handling', r'authenticat', r'exchange', r'information delivery', r'data drop',
+                  r'coordination', r'meeting', r'fortnight', r'weekly', r'monthly', r'\bBCF\b', r'collaborat'),
+        terms=('security', 'secure', 'confidential', 'sensitive', 'gdpr', 'official', 'retention', 'handling',
+               'authentication', 'exchange', 'event', 'coordination', 'meeting', 'frequency', 'weekly',
+               'fortnightly', 'monthly', 'bcf', 'collaboration', 'protocol'),
+        glossary=('Information_Protocol',),
+    ),
+    ExtractionSection(
+        name='loin',
+        title='Level of Information Need (LOIN) requirements by stage and discipline',
+        fields=('loin_requirements',),
+        structure="""{
+  "loin_requirements": [{"stage": "e.g. RIBA Stage 4 or null", "discipline": "string or null", "lod": "e.g. LOD 300 or null",
+                         "loi": "string or null", "notes": "string or null"}]
+}""",
+        guidance="Read every row of any LOD/LOI/LOIN matrix or table as one entry.",
+        keywords=(r'\bLOIN\b', r'information need', r'\bLO[DGI]\b', r'level of (detail|definition|information)',
+                  r'geometr', r'alphanumer', r'matrix'),
+        terms=('loin', 'lod', 'loi', 'log', 'level', 'detail', 'definition', 'need', 'geometrical', 'geometry',
+               'alphanumeric', 'alphanumerical', 'matrix'),
+        glossary=('Level_of_Information_Need', 'LOD'),
+    ),
+]
+
+
+def _field_names(model: Type[BaseModel]) -> Set[str]:
+    """Field names of ``model`` and of the models nested in its fields."""
+    names: Set[str] = set()
+    for name, field in model.model_fields.items():
+        names.add(name)
+        for arg in (field.annotation, *typing.get_args(field.annotation)):
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                names |= _field_names(arg)
+    return names
+
+
+def section_query(section: ExtractionSection, analysis_model: Optional[Type[BaseModel]] = None) -> List[str]:
+    """BM25 query terms: the section's field names, retrieval terms and glossary concepts."""
+    words = list(section.terms)
+    if analysis_model is not None:
+        words += [name.replace('_', ' ') for name in _field_names(section_model(section, analysis_model))]
+    query = tokenize(' '.join(words))
+    query += [glossary_concept(term) for term in section.glossary]
+    return sorted(set(query))
+
+
+def route_sections(
+    chunks: Sequence[str],
+    routing: str = 'bm25',
+    top_k: int = 4,
+    analysis_model: Optional[Type[BaseModel]] = None
+) -> Dict[str, List[int]]:
+    """Chunk indexes each section is extracted from (see module docstring)."""
+    index = ChunkIndex(chunks) if routing == 'bm25' else None
+    routes: Dict[str, List[int]] = {}
+    for section in EIR_SECTIONS:
+        if routing == 'all':
+            selected = set(range(len(chunks)))
+        elif index is not None:
+            selected = set(index.top_k(section_query(section, analysis_model), top_k))
+        else:
+            selected = {i for i, chunk in enumerate(chunks) if section.always or section.matches(chunk)}
+        if section.first_chunk and chunks:
+            selected.add(0)
+        routes[section.name] = sorted(selected)
+    return routes
+
+
+_section_models: Dict[str, Type[BaseModel]] = {}
+
+
+def section_model(section: ExtractionSection, analysis_model: Type[BaseModel]) -> Type[BaseModel]:
+    """Pydantic model holding only the section's fields of ``analysis_model`` (its grammar and validator)."""
+    model: Optional[Type[BaseModel]] = _section_models.get(section.name)
+    if model is None:
+        fields = {name: (analysis_model.model_fields[name].annotation, analysis_model.model_fields[name])
+                  for name in section.fields}
+        class_name = 'Eir' + ''.join(part.title() for part in section.name.split('_')) + 'Section'
+        model = _section_models[section.name] = create_model(class_name, **fields)
+    return model
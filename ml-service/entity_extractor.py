@@ -0,0 +1,303 @@
+"""
+Entity Extractor Module
+
+Deterministic, rule- and dictionary-based pre-extraction of the lexical parts
+of an EIR analysis: required software, file formats, classification systems,
+CDE workflow states, the COBie and BCF flags and the estimated project value.
+These used to cost LLM output tokens in every chunk. With pre-extraction on,
+EirAnalyzer removes them from the monolithic prompt and schema
+(``narrative_prompt`` / ``narrative_schema``). The LLM then only generates the
+narrative fields, and the extracted entities are applied to its result
+(``apply_entities``). Milestone dates missing from the LLM output are
+back-filled from the source line that names the milestone.
+
+The dictionary (data/eir_entity_dictionary.json) lists software, formats,
+classification systems and workflow states with their aliases. It is seeded
+from the ISO 19650 glossary (data/iso19650_glossary.json): a term linked
+from an entry adds its full name as an alias ("Industry Foundation Classes"
+for IFC).
+
+Benchmark against the LLM baseline: ``python benchmark_entities.py``.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from fuzzy_dedup import dedupe
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DICTIONARY_PATH = Path(__file__).parent / 'data' / 'eir_entity_dictionary.json'
+DEFAULT_GLOSSARY_PATH = Path(__file__).parent / 'data' / 'iso19650_glossary.json'
+
+# EirAnalysis fields filled by the extractor instead of the LLM, as paths
+PREEXTRACTED_FIELDS: Tuple[Tuple[str, ...], ...] = (
+    ('software_requirements',),
+    ('standards_protocols', 'classification_systems'),
+    ('standards_protocols', 'file_formats'),
+    ('cde_requirements', 'workflow_states'),
+    ('handover_requirements', 'cobie_required'),
+    ('information_protocols', 'bcf_workflow_required'),
+    ('project_info', 'estimated_value'),
+)
+
+LIST_THRESHOLD = 85  # fuzz.ratio from which an LLM list item duplicates an extracted one
+
+_VERSION_RE = re.compile(r'[ \t]?(?:v(?:ersion)?\s?)?(\d+x\d+|\d{4}(?!\d)|\d+(?:\.\d+)+|\d{1,2}(?![\d.]))', re.IGNORECASE)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.;!?])\s+|\n+')
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|isn't|aren't|won't)\b", re.IGNORECASE)
+_WORKFLOW_CONTEXT_RE = re.compile(r'\b(?:CDE|common data environment|workflow|states?|status(?:es)?)\b', re.IGNORECASE)
+_VALUE_CONTEXT_RE = re.compile(r'\b(?:value|budget|cost|contract sum|worth|fee)\b', re.IGNORECASE)
+_MONEY_RE = re.compile(
+    r'(?:[£$€]\s?\d[\d,]*(?:\.\d+)?|\b\d[\d,]*(?:\.\d+)?\s?(?:GBP|USD|EUR)\b)'
+    r'(?:\s?(?:million|billion|bn|m|k)\b)?',
+    re.IGNORECASE
+)
+_NON_WORD_RE = re.compile(r'[\W_]+')
+_MONTHS = (r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|'
+           r'Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)')
+DATE_RE = re.compile(
+    rf'\b(?:\d{{1,2}}(?:st|nd|rd|th)?\s+)?{_MONTHS}\.?,?\s+\d{{4}}\b'
+    r'|\b\d{1,2}[/.-]\d{1,2}[/.-](?:\d{4}|\d{2})\b'
+    r'|\b\d{4}-\d{2}-\d{2}\b'
+    r'|\bQ[1-4]\s+\d{4}\b',
+    re.IGNORECASE
+)
+
+
+class _Category:
+    """Alias matcher for one dictionary category (e.g. software)."""
+
+    def __init__(self, entries: List[Dict[str, Any]], glossary: Dict[str, Any], report_name: bool = False):
+        # lowercased alias -> (entry index, displayed text, versioned)
+        self._aliases: Dict[str, Tuple[int, str, bool]] = {}
+        self._exact: Dict[str, Tuple[int, str, bool]] = {}
+        for index, entry in enumerate(entries):
+            versioned = bool(entry.get('versioned'))
+            for alias in entry.get('aliases') or [entry['name']]:
+                shown = entry['name'] if report_name else alias
+                if entry.get('case_sensitive'):
+                    self._exact[alias] = (index, shown, versioned)
+                else:
+                    self._aliases[alias.lower()] = (index, shown, versioned)
+            term = glossary.get(entry.get('glossary') or '')
+            if term and term.get('full_name'):
+                self._aliases.setdefault(term['full_name'].lower(), (index, entry['name'], versioned))
+        self._pattern = self._compile(list(self._aliases), re.IGNORECASE)
+        self._exact_pattern = self._compile(list(self._exact), 0)
+
+    @staticmethod
+    def _compile(aliases: List[str], flags: int) -> Optional[Pattern]:
+        if not aliases:
+            return None
+        alternation = '|'.join(re.escape(a) for a in sorted(aliases, key=len, reverse=True))
+        return re.compile(rf'(?<![\w/-])(?:{alternation})(?![\w/])', flags)
+
+    def find(self, text: str) -> List[Tuple[int, int, str, Optional[str]]]:
+        """``(position, entry index, displayed text, version or None)`` of every match, in text order."""
+        found = []
+        for pattern, table, fold in ((self._pattern, self._aliases, True), (self._exact_pattern, self._exact, False)):
+            if pattern is None:
+                continue
+            for match in pattern.finditer(text):
+                index, shown, versioned = table[match.group().lower() if fold else match.group()]
+                version = _VERSION_RE.match(text, match.end()) if versioned else None
+                found.append((match.start(), index, shown, version.group(1) if version else None))
+        found.sort()
+        return found
+
+    def extract(self, text: str) -> List[str]:
+        """
+        One match per entry (and version), in order, as first spelled. An
+        unversioned mention is dropped when a versioned one of the same
+        entry exists ("Revit" next to "Revit 2024").
+        """
+        found = self.find(text)
+        versioned_entries = {index for _, index, _, version in found if version}
+        results: List[str] = []
+        seen = set()
+        for _, index, shown, version in found:
+            if not version and index in versioned_entries:
+                continue
+            if (index, version) not in seen:
+                seen.add((index, version))
+                results.append(f"{shown} {version}" if version else shown)
+        return results
+
+
+class EntityExtractor:
+    """Rule- and dictionary-based extraction of the lexical EirAnalysis fields."""
+
+    def __init__(self, dictionary_path: Optional[Path] = None, glossary_path: Optional[Path] = None):
+        dictionary = self._load(dictionary_path or DEFAULT_DICTIONARY_PATH)
+        glossary = self._load(glossary_path or DEFAULT_GLOSSARY_PATH).get('terms', {})
+        self.software = _Category(dictionary.get('software', []), glossary)
+        self.file_formats = _Category(dictionary.get('file_formats', []), glossary)
+        self.classification_systems = _Category(dictionary.get('classification_systems', []), glossary)
+        self.workflow_states = _Category(dictionary.get('workflow_states', []), glossary, report_name=True)
+        cobie = [e for e in dictionary.get('file_formats', []) if e.get('name') in ('COBie', 'BCF')]
+        self._flags = {e['name']: _Category([e], glossary) for e in cobie}
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load entity dictionary {path}: {e}")
+            return {}
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """Partial EirAnalysis dict holding the PREEXTRACTED_FIELDS found in ``text``."""
+        started = time.perf_counter()
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+        entities = {
+            'software_requirements': self.software.extract(text),
+            'standards_protocols': {
+                'classification_systems': self.classification_systems.extract(text),
+                'file_formats': self.file_formats.extract(text),
+            },
+            'cde_requirements': {'workflow_states': self._workflow_states(sentences)},
+            'handover_requirements': {'cobie_required': self._required('COBie', sentences)},
+            'information_protocols': {'bcf_workflow_required': self._required('BCF', sentences)},
+            'project_info': {'estimated_value': self._estimated_value(text)},
+        }
+        get_metrics().observe('eir_entity_extraction_ms', (time.perf_counter() - started) * 1000)
+        return entities
+
+    def _workflow_states(self, sentences: List[str]) -> List[str]:
+        """States named where the CDE workflow is discussed, or where several states are listed together."""
+        states: List[str] = []
+        for sentence in sentences:
+            found = self.workflow_states.extract(sentence)
+            if len(found) >= 2 or (found and _WORKFLOW_CONTEXT_RE.search(sentence)):
+                states.extend(s for s in found if s not in states)
+        return states
+
+    def _required(self, name: str, sentences: List[str]) -> bool:
+        """Whether a sentence names ``name`` without negating it."""
+        category = self._flags.get(name)
+        if category is None:
+            return False
+        return any(category.find(s) and not _NEGATION_RE.search(s) for s in sentences)
+
+    @staticmethod
+    def _estimated_value(text: str) -> Optional[str]:
+        """First amount of money on a line about the project value, budget or cost."""
+        for line in text.splitlines():
+            if _VALUE_CONTEXT_RE.search(line):
+                match = _MONEY_RE.search(line)
+                if match:
+                    return match.group().strip()
+        return None
+
+
+def apply_entities(analysis: Dict[str, Any], entities: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply pre-extracted entities to an analysis in place. Extracted list items
+    come first. LLM items are kept after them unless they duplicate one
+    (fuzzily, or as part of it: "Revit" next to "Autodesk Revit 2024").
+    Flags are or-ed, and the extracted estimated value wins when found.
+    """
+    for path in PREEXTRACTED_FIELDS:
+        source: Any = entities
+        target = analysis
+        for part in path[:-1]:
+            source = source.get(part) or {}
+            target = target.setdefault(part, {})
+        field = path[-1]
+        value = source.get(field)
+        if isinstance(value, list):
+            folded = [_fold(item) for item in value]
+            current = [item for item in target.get(field) or []
+                       if not isinstance(item, str) or not any(_fold(item) in f for f in folded)]
+            target[field] = value + dedupe(current, LIST_THRESHOLD, existing=value)
+        elif isinstance(value, bool):
+            target[field] = bool(target.get(field)) or value
+        elif value:
+            target[field] = value
+    return analysis
+
+
+def _fold(text: str) -> str:
+    """Lowercased words of ``text`` separated by single spaces, padded for whole-word ``in`` tests."""
+    return f" {_NON_WORD_RE.sub(' ', text.lower()).strip()} "
+
+
+def backfill_milestone_dates(analysis: Dict[str, Any], text: str) -> Dict[str, Any]:
+    """Fill missing milestone dates from the first source line naming the phase and a date (in place)."""
+    milestones = [m for m in analysis.get('delivery_milestones') or []
+                  if isinstance(m, dict) and not m.get('date') and len(m.get('phase') or '') >= 3]
+    if not milestones:
+        return analysis
+    lines = [(_fold(line), line) for line in text.splitlines() if DATE_RE.search(line)]
+    for milestone in milestones:
+        phase = _fold(milestone['phase'])
+        for folded, line in lines:
+            if phase in folded:
+                milestone['date'] = DATE_RE.search(line).group()
+                break
+    return analysis
+
+
+def _schema_node(schema: Dict[str, Any], node: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve a local ``$ref`` of a JSON schema node."""
+    ref = node.get('$ref')
+    if ref and ref.startswith('#/$defs/'):
+        return schema['$defs'][ref[len('#/$defs/'):]]
+    return node
+
+
+def narrative_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an EirAnalysis JSON schema without the PREEXTRACTED_FIELDS."""
+    schema = json.loads(json.dumps(schema))
+    for path in PREEXTRACTED_FIELDS:
+        node = schema
+        for part in path[:-1]:
+            node = _schema_node(schema, node.get('properties', {}).get(part, {}))
+        node.get('properties', {}).pop(path[-1], None)
+        if path[-1] in node.get('required', []):
+            node['required'].remove(path[-1])
+    return schema
+
+
+def narrative_prompt(template: str) -> str:
+    """
+    The monolithic extraction prompt without the structure lines of the
+    PREEXTRACTED_FIELDS (one ``"field": ...`` line each), fixing the comma
+    before a closing brace.
+    """
+    removed = tuple(f'"{path[-1]}":' for path in PREEXTRACTED_FIELDS)
+    lines: List[str] = []
+    dropped = False
+    for line in template.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith(removed):
+            dropped = True
+            continue
+        if dropped and stripped.startswith('}') and lines and lines[-1].rstrip().endswith(','):
+            lines[-1] = lines[-1].rstrip()[:-1]
+        dropped = False
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+# Module-level singleton
+_extractor: Optional[EntityExtractor] = None
+_extractor_lock = threading.Lock()
+
+
+def get_entity_extractor() -> EntityExtractor:
+    """Get or create the singleton EntityExtractor."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = EntityExtractor()
+    return _extractor
@@ -0,0 +1,207 @@
+"""
+Glossary Index Module
+
+Multi-pattern matcher over the ISO 19650 glossary (data/iso19650_glossary.json).
+Every term's key ("Lead_Appointed_Party" -> "Lead Appointed Party"), full name
+and aliases are compiled once into an Aho-Corasick automaton. Tagging a
+document is then a single linear pass over its text, whatever the number of
+terms, instead of one regex scan per term.
+
+Matching is case-insensitive, except for acronyms (no spaces, two or more
+capitals: "AIR", "CDE", "COBie"), which must match exactly so that "air" and
+"aim" in running text are not tagged. Matches are whole words, a trailing
+plural "s" is allowed ("CDEs", "Task Teams"), and overlapping matches resolve
+leftmost-longest ("Lead Appointed Party" rather than "Appointed Party").
+
+Term density (glossary term hits per 100 words) per page and per chunk is a
+cheap relevance signal: /extract-text returns it per page for triage, and
+analysis metadata reports it per chunk.
+"""
+
+import json
+import logging
+import re
+import string
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GLOSSARY_PATH = Path(__file__).parent / 'data' / 'iso19650_glossary.json'
+
+TOP_TERMS = 5  # most frequent terms reported per page / chunk
+
+# Length-preserving fold, so offsets in the folded text are offsets in the original
+_FOLD = str.maketrans(
+    string.ascii_uppercase + '‘’\n\r\t',
+    string.ascii_lowercase + "''" + '   '
+)
+_PAGE_MARKER_RE = re.compile(r'^--- Page (\d+) ---$', re.MULTILINE)
+
+
+class TermMatch(NamedTuple):
+    """One glossary term occurrence: term key and ``[start, end)`` offsets in the text."""
+    term: str
+    start: int
+    end: int
+
+
+class GlossaryIndex:
+    """Aho-Corasick automaton over the glossary term names."""
+
+    def __init__(self, glossary_path: Optional[Path] = None):
+        terms = self._load(glossary_path or DEFAULT_GLOSSARY_PATH)
+        # (pattern as written, term key, case-sensitive)
+        self._patterns: List[Tuple[str, str, bool]] = []
+        seen = set()
+        for key, entry in terms.items():
+            names = [key.replace('_', ' '), entry.get('full_name') or '', *(entry.get('aliases') or [])]
+            for name in names:
+                name = ' '.join(name.split())
+                if not name:
+                    continue
+                case_sensitive = ' ' not in name and sum(c.isupper() for c in name) >= 2
+                folded = name if case_sensitive else name.translate(_FOLD)
+                if (folded, case_sensitive) not in seen:
+                    seen.add((folded, case_sensitive))
+                    self._patterns.append((name, key, case_sensitive))
+        self.terms = len(terms)
+        self._delta, self._outputs = self._build([name.translate(_FOLD) for name, _, _ in self._patterns])
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('terms', {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load ISO 19650 glossary for term tagging: {e}")
+            return {}
+
+    @staticmethod
+    def _build(patterns: Sequence[str]) -> Tuple[List[Dict[str, int]], List[Tuple[int, ...]]]:
+        """
+        Trie of ``patterns`` with failure links, flattened into a full
+        transition table: ``delta[state][char]`` is the next state (0 when
+        absent), and ``outputs[state]`` the patterns ending there.
+        """
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(index)
+
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state].extend(outputs[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+        return delta, [tuple(out) for out in outputs]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def tag(self, text: str) -> List[TermMatch]:
+        """Non-overlapping glossary term matches in ``text``, in order (one pass)."""
+        started = time.perf_counter()
+        delta, outputs, patterns = self._delta, self._outputs, self._patterns
+        candidates: List[Tuple[int, int, int]] = []
+        state = 0
+        for i, char in enumerate(text.translate(_FOLD)):
+            state = delta[state].get(char, 0)
+            for index in outputs[state]:
+                name, _, case_sensitive = patterns[index]
+                start, end = i + 1 - len(name), i + 1
+                if case_sensitive and text[start:end] != name:
+                    continue
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    if text[end] not in 'sS' or (end + 1 < len(text) and text[end + 1].isalnum()):
+                        continue
+                    end += 1
+                candidates.append((start, -end, index))
+
+        matches: List[TermMatch] = []
+        last_end = 0
+        for start, neg_end, index in sorted(candidates):
+            if start >= last_end:
+                matches.append(TermMatch(patterns[index][1], start, -neg_end))
+                last_end = -neg_end
+        get_metrics().observe('glossary_tag_ms', (time.perf_counter() - started) * 1000)
+        return matches
+
+    @staticmethod
+    def _score(matches: Sequence[TermMatch], words: int) -> Dict[str, Any]:
+        counts = Counter(m.term for m in matches)
+        return {
+            'words': words,
+            'term_hits': len(matches),
+            'distinct_terms': len(counts),
+            'density': round(100 * len(matches) / words, 2) if words else 0.0,
+            'top_terms': [term for term, _ in counts.most_common(TOP_TERMS)],
+        }
+
+    def score(self, text: str) -> Dict[str, Any]:
+        """Term hits, distinct terms, density (hits per 100 words) and top terms of ``text``."""
+        return self._score(self.tag(text), len(text.split()))
+
+    def chunk_scores(self, chunks: Sequence[str]) -> List[Dict[str, Any]]:
+        """``score`` of every chunk, in order."""
+        return [self.score(chunk) for chunk in chunks]
+
+    def page_scores(self, text: str) -> List[Dict[str, Any]]:
+        """
+        ``score`` of every page of extracted text, split at the
+        ``--- Page N ---`` markers of PDF extraction (one page without them).
+        The whole text is tagged in one pass.
+        """
+        markers = list(_PAGE_MARKER_RE.finditer(text))
+        if not markers:
+            return [{'page': 1, **self.score(text)}]
+        bounds = [m.start() for m in markers] + [len(text)]
+        by_page: List[List[TermMatch]] = [[] for _ in markers]
+        for match in self.tag(text):
+            page = bisect_right(bounds, match.start) - 1
+            if page >= 0:
+                by_page[page].append(match)
+        return [
+            {'page': int(marker.group(1)),
+             **self._score(by_page[i], len(text[marker.end():bounds[i + 1]].split()))}
+            for i, marker in enumerate(markers)
+        ]
+
+    def describe(self) -> Dict[str, Any]:
+        return {'terms': self.terms, 'patterns': len(self._patterns), 'states': len(self._delta)}
+
+
+# Module-level singleton
+_index: Optional[GlossaryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_glossary_index() -> GlossaryIndex:
+    """Get or create the singleton GlossaryIndex (built once, at service startup)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = GlossaryIndex()
+                get_metrics().register_collector('glossary_index', _index.describe)
+    return _index
@@ -0,0 +1,199 @@
+"""
+Job Store Module
+
+SQLite persistence for EIR analysis jobs (jobs.py). Every job state change
+and every completed chunk analysis is written through to the store, so a
+restart of the ML service loses neither queued jobs nor the chunks already
+analysed: on startup unfinished jobs are re-queued and their analysis
+resumes from the stored chunk checkpoints.
+
+Configuration:
+    - EIR_JOB_DB: path of the SQLite database
+      (default: ml-service/state/eir_jobs.sqlite3; use a persistent volume)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).parent / 'state' / 'eir_jobs.sqlite3'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    model TEXT NOT NULL,
+    depth TEXT,
+    idempotency_key TEXT,
+    text TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    progress_json TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    result_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_idempotency_key ON jobs (idempotency_key);
+CREATE TABLE IF NOT EXISTS chunk_checkpoints (
+    job_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    chunk_hash TEXT NOT NULL,
+    analysis_json TEXT NOT NULL,
+    PRIMARY KEY (job_id, chunk_index)
+);
+"""
+
+
+def chunk_hash(chunk: str) -> str:
+    """Content hash identifying a chunk, so checkpoints never apply to different text."""
+    return hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+
+class JobStore:
+    """Thread-safe SQLite store for analysis jobs and their chunk checkpoints."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or os.getenv('EIR_JOB_DB', '').strip() or DEFAULT_DB_PATH)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+            self._conn.commit()
+        logger.info(f"Job store opened at {self.path}")
+
+    def _migrate(self) -> None:
+        """Add the columns introduced after a database was created (caller holds the lock)."""
+        columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+        if 'depth' not in columns:
+            self._conn.execute('ALTER TABLE jobs ADD COLUMN depth TEXT')
+
+    def save_job(self, job: Dict[str, Any]) -> None:
+        """Insert or update a job (``AnalysisJob.to_record()``)."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (job_id, status, filename, model, depth, idempotency_key, text,
+                                  created_at, started_at, finished_at, progress_json,
+                                  cancel_requested, result_json, error)
+                VALUES (:job_id, :status, :filename, :model, :depth, :idempotency_key, :text,
+                        :created_at, :started_at, :finished_at, :progress_json,
+                        :cancel_requested, :result_json, :error)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    status = excluded.status,
+                    text = excluded.text,
+                    started_at = excluded.started_at,
+                    finished_at = excluded.finished_at,
+                    progress_json = excluded.progress_json,
+                    cancel_requested = excluded.cancel_requested,
+                    result_json = excluded.result_json,
+                    error = excluded.error
+                """,
+                {
+                    **job,
+                    'progress_json': json.dumps(job.get('progress') or {}),
+                    'cancel_requested': int(bool(job.get('cancel_requested'))),
+                    'result_json': json.dumps(job['result']) if job.get('result') is not None else None,
+                },
+            )
+            self._conn.commit()
+
+    def save_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        """Update only the progress of a stored job (per-chunk updates; see ``save_job``)."""
+        with self._lock:
+            self._conn.execute('UPDATE jobs SET progress_json = ? WHERE job_id = ?',
+                               (json.dumps(progress), job_id))
+            self._conn.commit()
+
+    def load_jobs(self) -> List[Dict[str, Any]]:
+        """All stored jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM jobs ORDER BY created_at').fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['progress'] = json.loads(job.pop('progress_json') or '{}')
+            result_json = job.pop('result_json')
+            job['result'] = json.loads(result_json) if result_json else None
+            job['cancel_requested'] = bool(job['cancel_requested'])
+            jobs.append(job)
+        return jobs
+
+    def delete_jobs(self, job_ids: Iterable[str]) -> None:
+        ids = [(job_id,) for job_id in job_ids]
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany('DELETE FROM chunk_checkpoints WHERE job_id = ?', ids)
+            self._conn.executemany('DELETE FROM jobs WHERE job_id = ?', ids)
+            self._conn.commit()
+
+    def save_chunk(self, job_id: str, chunk_index: int, hash_: str, analysis: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO chunk_checkpoints (job_id, chunk_index, chunk_hash, analysis_json) '
+                'VALUES (?, ?, ?, ?)',
+                (job_id, chunk_index, hash_, json.dumps(analysis)),
+            )
+            self._conn.commit()
+
+    def load_chunks(self, job_id: str) -> Dict[int, Dict[str, Any]]:
+        """Stored checkpoints of a job: ``{chunk_index: {"hash": ..., "analysis": {...}}}``."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT chunk_index, chunk_hash, analysis_json FROM chunk_checkpoints WHERE job_id = ?',
+                (job_id,),
+            ).fetchall()
+        return {
+            row['chunk_index']: {'hash': row['chunk_hash'], 'analysis': json.loads(row['analysis_json'])}
+            for row in rows
+        }
+
+    def delete_chunks(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM chunk_checkpoints WHERE job_id = ?', (job_id,))
+            self._conn.commit()
+
+
+class ChunkCheckpoint:
+    """
+    Chunk checkpoints of one job, as used by ``EirAnalyzer.analyze()``.
+
+    ``restore`` only returns checkpoints whose stored hash matches the chunk
+    at the same index, so a change in chunking never mixes analyses.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+
+    def restore(self, hashes: List[str]) -> Dict[int, Dict[str, Any]]:
+        stored = self.store.load_chunks(self.job_id)
+        restored = {
+            idx: entry['analysis']
+            for idx, entry in stored.items()
+            if idx < len(hashes) and entry['hash'] == hashes[idx]
+        }
+        if restored:
+            logger.info(f"Job {self.job_id}: resuming with {len(restored)}/{len(hashes)} chunks from checkpoint")
+        return restored
+
+    def save(self, chunk_index: int, hash_: str, analysis: Dict[str, Any]) -> None:
+        try:
+            self.store.save_chunk(self.job_id, chunk_index, hash_, analysis)
+        except sqlite3.Error as e:
+            # A lost checkpoint only costs a re-analysis after a restart
+            logger.warning(f"Job {self.job_id}: failed to checkpoint chunk {chunk_index}: {e}")
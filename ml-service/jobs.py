@@ -0,0 +1,345 @@
+"""
+Analysis Jobs Module
+
+Runs EIR analyses as background jobs so callers don't have to hold an HTTP
+request open for the whole chunked analysis and summary. A job is submitted
+with ``POST /jobs/analyze-eir``, polled with ``GET /jobs/{id}`` (status and
+per-chunk progress) and cancelled with ``DELETE /jobs/{id}``.
+
+Submissions may carry an idempotency key: a retried submission with the same
+key attaches to the job already queued, running or completed instead of
+starting a second analysis.
+
+Jobs and their completed chunk analyses are persisted in SQLite (job_store.py).
+After a restart, unfinished jobs are re-queued and resume from their chunk
+checkpoints; only the chunks that had not finished are sent to Ollama again.
+
+Configuration:
+    - EIR_JOB_WORKERS: concurrent analyses (default: 1, max: 4)
+    - EIR_JOB_TTL: seconds finished jobs are kept for polling (default: 3600)
+    - EIR_JOB_DB: SQLite database path (see job_store.py)
+    - EIR_JOB_PROGRESS_INTERVAL: minimum seconds between stored per-chunk
+      progress updates (default: 2; polling always sees live progress)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from eir_analyzer import AnalysisCancelled, get_analyzer
+from job_store import ChunkCheckpoint, JobStore
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+TERMINAL_STATES = {JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED}
+
+
+def _env_int(name: str, default: int, min_value: int, max_value: int) -> int:
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    try:
+        return max(min_value, min(max_value, int(value)))
+    except ValueError:
+        logger.warning(f"Invalid {name} value '{value}', using default {default}")
+        return default
+
+
+class AnalysisJob:
+    """State of one EIR analysis job."""
+
+    def __init__(self, text: str, filename: Optional[str], model: str,
+                 idempotency_key: Optional[str] = None, depth: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.text: Optional[str] = text
+        self.filename = filename
+        self.model = model
+        self.depth = depth
+        self.idempotency_key = idempotency_key
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Any] = {
+            'stage': JOB_QUEUED,
+            'chunks_done': 0,
+            'chunks_total': None,
+            'chunks_failed': 0,
+        }
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.progress_saved_at = 0.0
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'AnalysisJob':
+        """Rebuild a job from a ``JobStore.load_jobs()`` record."""
+        job = cls(record['text'], record['filename'], record['model'], record['idempotency_key'],
+                  record.get('depth'))
+        job.id = record['job_id']
+        job.status = record['status']
+        job.created_at = record['created_at']
+        job.started_at = record['started_at']
+        job.finished_at = record['finished_at']
+        job.progress.update(record['progress'])
+        job.result = record['result']
+        job.error = record['error']
+        if record['cancel_requested']:
+            job.cancel_event.set()
+        return job
+
+    def to_record(self) -> Dict[str, Any]:
+        """Full state for the job store (includes the source text while unfinished)."""
+        record = self.to_dict()
+        record['text'] = self.text
+        record['idempotency_key'] = self.idempotency_key
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'model': self.model,
+            'depth': self.depth,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'progress': dict(self.progress),
+            'cancel_requested': self.cancel_event.is_set(),
+            'error': self.error,
+            'result': self.result,
+        }
+
+
+class JobManager:
+    """Queues analysis jobs onto a small worker pool and tracks their state."""
+
+    def __init__(self, workers: Optional[int] = None, ttl_s: Optional[int] = None,
+                 store: Optional[JobStore] = None):
+        self.workers = workers or _env_int('EIR_JOB_WORKERS', default=1, min_value=1, max_value=4)
+        self.ttl_s = ttl_s or _env_int('EIR_JOB_TTL', default=3600, min_value=60, max_value=7 * 86400)
+        self.store = store or JobStore()
+        self.progress_interval_s = _env_int('EIR_JOB_PROGRESS_INTERVAL', default=2, min_value=0, max_value=60)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='eir-job')
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._restore()
+
+    def _persist(self, job: AnalysisJob) -> None:
+        try:
+            self.store.save_job(job.to_record())
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist job {job.id}: {e}")
+
+    def _persist_progress(self, job: AnalysisJob) -> None:
+        job.progress_saved_at = time.monotonic()
+        try:
+            self.store.save_progress(job.id, dict(job.progress))
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist progress of job {job.id}: {e}")
+
+    def _restore(self) -> None:
+        """Reload stored jobs and re-queue the ones a restart interrupted."""
+        resumed = 0
+        for record in self.store.load_jobs():
+            job = AnalysisJob.from_record(record)
+            self._jobs[job.id] = job
+            if job.idempotency_key:
+                self._by_key[job.idempotency_key] = job.id
+            if job.status in TERMINAL_STATES:
+                continue
+            if job.cancel_event.is_set() or not job.text:
+                self._finish(job, JOB_CANCELLED)
+                continue
+            job.status = JOB_QUEUED
+            job.progress['stage'] = JOB_QUEUED
+            self._persist(job)
+            self._executor.submit(self._run, job)
+            resumed += 1
+        if resumed:
+            get_metrics().inc('eir_jobs_resumed_total', resumed)
+            logger.info(f"Resumed {resumed} unfinished EIR analysis job(s) from {self.store.path}")
+
+    def submit(self, text: str, filename: Optional[str], model: str,
+               idempotency_key: Optional[str] = None,
+               depth: Optional[str] = None) -> Tuple[AnalysisJob, bool]:
+        """
+        Queue an analysis.
+
+        Returns:
+            (job, created) — ``created`` is False when the idempotency key
+            matched a job that is still queued, running or completed.
+        """
+        self._prune()
+        with self._lock:
+            if idempotency_key:
+                existing = self._jobs.get(self._by_key.get(idempotency_key, ''))
+                if existing and existing.status not in (JOB_FAILED, JOB_CANCELLED):
+                    get_metrics().inc('eir_jobs_idempotent_replays_total')
+                    logger.info(f"Idempotency key matched job {existing.id} ({existing.status})")
+                    return existing, False
+
+            job = AnalysisJob(text, filename, model, idempotency_key, depth)
+            self._jobs[job.id] = job
+            if idempotency_key:
+                self._by_key[idempotency_key] = job.id
+            self._persist(job)
+
+        get_metrics().inc('eir_jobs_submitted_total')
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued EIR analysis job {job.id} for {filename or 'unknown'}")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._prune()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[AnalysisJob]:
+        """
+        Request cancellation. Queued jobs are cancelled at once; running jobs
+        stop at the next chunk boundary (chunks already sent to Ollama finish
+        in the background and are discarded).
+        """
+        job = self.get(job_id)
+        if job is None or job.status in TERMINAL_STATES:
+            return job
+        job.cancel_event.set()
+        with self._lock:
+            if job.status == JOB_QUEUED:
+                self._finish(job, JOB_CANCELLED)
+            else:
+                self._persist(job)
+        logger.info(f"Cancellation requested for job {job.id}")
+        return job
+
+    def _on_progress(self, job: AnalysisJob, event: Dict[str, Any]) -> None:
+        progress = job.progress
+        stage = event.get('stage')
+        if stage in ('section', 'entities', 'tables'):
+            return  # section previews and pre-extracted entries are only used by streaming
+        if stage == 'chunk':
+            progress['chunks_done'] = event.get('chunks_done', progress['chunks_done'])
+            progress['chunks_total'] = event.get('chunks_total', progress['chunks_total'])
+            if event.get('failed'):
+                progress['chunks_failed'] += 1
+            # Chunk results are checkpointed separately; the stored progress only
+            # needs to be roughly current, so per-chunk writes are throttled
+            last_chunk = progress['chunks_total'] is not None and progress['chunks_done'] >= progress['chunks_total']
+            if not last_chunk and time.monotonic() - job.progress_saved_at < self.progress_interval_s:
+                return
+        else:
+            progress['stage'] = stage
+            if 'chunks_total' in event:
+                progress['chunks_total'] = event['chunks_total']
+            if 'chunks_done' in event:
+                progress['chunks_done'] = event['chunks_done']
+        self._persist_progress(job)
+
+    def _run(self, job: AnalysisJob) -> None:
+        with self._lock:
+            if job.status != JOB_QUEUED:
+                return  # cancelled while queued
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            job.progress.update(stage='starting', chunks_done=0, chunks_failed=0)
+            self._persist(job)
+
+        try:
+            analyzer = get_analyzer(model=job.model)
+            analysis_json, summary_markdown = analyzer.analyze(
+                text=job.text,
+                filename=job.filename,
+                progress_callback=lambda event: self._on_progress(job, event),
+                cancel_event=job.cancel_event,
+                checkpoint=ChunkCheckpoint(self.store, job.id),
+                depth=job.depth
+            )
+            metadata = analyzer.last_analysis_stats()
+            job.result = {
+                'analysis_json': analysis_json,
+                'summary_markdown': summary_markdown,
+                'field_values': analyzer.direct_field_values(analysis_json),
+                'analysis_id': metadata['analysis_id'],
+                'model': job.model,
+                'metadata': metadata,
+            }
+            status = JOB_COMPLETED
+        except AnalysisCancelled:
+            status = JOB_CANCELLED
+        except Exception as e:
+            logger.error(f"EIR analysis job {job.id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            status = JOB_FAILED
+
+        with self._lock:
+            self._finish(job, status)
+        get_metrics().observe('eir_job_duration_s', job.finished_at - job.started_at, status=status)
+        logger.info(f"EIR analysis job {job.id} {status} in {job.finished_at - job.started_at:.1f}s")
+
+    def _finish(self, job: AnalysisJob, status: str) -> None:
+        job.status = status
+        job.progress['stage'] = status
+        job.finished_at = time.time()
+        job.text = None  # the source text is no longer needed
+        self._persist(job)
+        try:
+            self.store.delete_chunks(job.id)  # the result (if any) is stored with the job
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to drop checkpoints of job {job.id}: {e}")
+        get_metrics().inc('eir_jobs_total', status=status)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in TERMINAL_STATES and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                job = self._jobs.pop(job_id)
+                if job.idempotency_key and self._by_key.get(job.idempotency_key) == job_id:
+                    del self._by_key[job.idempotency_key]
+        if expired:
+            try:
+                self.store.delete_jobs(expired)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to delete expired jobs: {e}")
+
+    def describe(self) -> Dict[str, Any]:
+        """Job counts by status (published via /metrics)."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'workers': self.workers, 'ttl_s': self.ttl_s, 'store': self.store.path, 'jobs': counts}
+
+
+# Module-level singleton
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get or create the singleton JobManager instance."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+                get_metrics().register_collector('eir_jobs', _manager.describe)
+    return _manager
@@ -0,0 +1,125 @@
+"""
+Incremental JSON Module
+
+Parses JSON that arrives in pieces (Ollama's token stream under a
+``format`` schema) and reports values as soon as they are complete, so
+callers can use ``project_info`` or ``questions[0]`` while the rest of the
+document is still being generated.
+
+Reported values are:
+    - each member of the root object, e.g. ``("project_info",)``
+    - each element of an array that is a root member, e.g. ``("questions", 0)``
+    - each element of a root array, e.g. ``(0,)``
+
+Text before the root value (e.g. an empty ``<think></think>`` block) and
+after it is ignored.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JsonPath = Tuple[Any, ...]
+_WHITESPACE = ' \t\r\n'
+
+
+class IncrementalJsonParser:
+    """Feed text with ``feed()``; completed values are returned as ``(path, value)``."""
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        # One frame per open container: kind, start offset, current key/index
+        self._stack: List[Dict[str, Any]] = []
+        self._token_start: Optional[int] = None
+        self._in_string = False
+        self._in_scalar = False
+        self._escape = False
+        self.done = False
+        self.value: Any = None
+
+    def feed(self, chunk: str) -> List[Tuple[JsonPath, Any]]:
+        """Consume more text and return the values completed by it."""
+        events: List[Tuple[JsonPath, Any]] = []
+        if self.done or not chunk:
+            return events
+        self._text += chunk
+        text = self._text
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._end_token(text[self._token_start:i + 1], events)
+                i += 1
+                continue
+            if self._in_scalar:
+                if ch not in ',}]' and ch not in _WHITESPACE:
+                    i += 1
+                    continue
+                # The delimiter ends the scalar and is then handled below
+                self._in_scalar = False
+                self._end_token(text[self._token_start:i], events)
+
+            if not self._stack and ch not in '{[':
+                pass  # preamble before the root value
+            elif ch in '{[':
+                self._stack.append({
+                    'kind': 'object' if ch == '{' else 'array',
+                    'start': i,
+                    'key': None if ch == '{' else 0,
+                    'expect_key': ch == '{',
+                })
+            elif ch in '}]':
+                frame = self._stack.pop()
+                self._end_value(text[frame['start']:i + 1], events)
+            elif ch == ',':
+                frame = self._stack[-1]
+                if frame['kind'] == 'array':
+                    frame['key'] += 1
+                else:
+                    frame['expect_key'] = True
+            elif ch == '"':
+                self._in_string = True
+                self._token_start = i
+            elif ch not in _WHITESPACE and ch != ':':
+                self._in_scalar = True
+                self._token_start = i
+            i += 1
+        self._pos = i
+        return events
+
+    def _end_token(self, raw: str, events: List[Tuple[JsonPath, Any]]) -> None:
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame['kind'] == 'object' and frame['expect_key']:
+            try:
+                frame['key'] = json.loads(raw)
+            except ValueError:
+                frame['key'] = raw.strip('"')
+            frame['expect_key'] = False
+            return
+        self._end_value(raw, events)
+
+    def _end_value(self, raw: str, events: List[Tuple[JsonPath, Any]]) -> None:
+        if not self._stack:
+            self.done = True
+            try:
+                self.value = json.loads(raw)
+            except ValueError as e:
+                logger.debug(f"Streamed JSON root did not parse: {e}")
+            return
+
+        path = tuple(frame['key'] for frame in self._stack)
+        parent = self._stack[-1]
+        if len(path) == 1 or (len(path) == 2 and parent['kind'] == 'array'):
+            try:
+                events.append((path, json.loads(raw)))
+            except ValueError as e:
+                logger.debug(f"Skipping unparsable streamed value at {path}: {e}")
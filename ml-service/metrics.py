@@ -0,0 +1,187 @@
+"""
+Metrics Registry Module
+
+Lightweight in-process metrics for the ML service: counters, gauges and
+latency/size summaries, plus named collectors that publish structured state
+(e.g. the effective workload profiles). Exposed as JSON by ``GET /metrics``.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _label_str(key: _LabelKey) -> str:
+    return ",".join(f"{k}={v}" for k, v in key)
+
+
+class _Summary:
+    """Running count/sum/min/max plus a bounded window for percentiles."""
+
+    def __init__(self, window: int = 200):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        idx = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def recent_avg(self) -> Optional[float]:
+        if not self.recent:
+            return None
+        return sum(self.recent) / len(self.recent)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of labelled metrics.
+
+    Metric names follow the ``<subsystem>_<what>[_unit]`` convention, e.g.
+    ``ollama_request_latency_ms``. Labels are free-form keyword arguments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[_LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[_LabelKey, _Summary]] = {}
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+        self._started_at = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """Increment a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to an absolute value."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation in a summary (latency, token count, ...)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            summary = series.get(key)
+            if summary is None:
+                summary = series[key] = _Summary()
+            summary.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def get_gauge(self, name: str, **labels) -> Optional[float]:
+        """Return the current value of a gauge, or None if never set."""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_label_key(labels))
+
+    def get_summary(self, name: str, **labels) -> Optional[Dict[str, Any]]:
+        """Return a summary snapshot (plus ``recent_avg``), or None if empty."""
+        with self._lock:
+            summary = self._summaries.get(name, {}).get(_label_key(labels))
+            if summary is None:
+                return None
+            snap = summary.snapshot()
+            snap["recent_avg"] = summary.recent_avg()
+            return snap
+
+    def register_collector(self, name: str, collector: Callable[[], Any]) -> None:
+        """
+        Register a callable whose return value is embedded in snapshots.
+
+        Collectors are evaluated lazily on every snapshot, so they always
+        reflect current state (e.g. hot-reloaded configuration).
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-serialisable dict."""
+        with self._lock:
+            counters = {
+                name: {_label_str(k): v for k, v in series.items()}
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: {_label_str(k): v for k, v in series.items()}
+                for name, series in self._gauges.items()
+            }
+            summaries = {
+                name: {_label_str(k): s.snapshot() for k, s in series.items()}
+                for name, series in self._summaries.items()
+            }
+            collectors = dict(self._collectors)
+
+        collected = {}
+        for name, collector in collectors.items():
+            try:
+                collected[name] = collector()
+            except Exception as e:
+                collected[name] = {"error": str(e)}
+
+        return {
+            "uptime_s": round(time.time() - self._started_at, 1),
+            "counters": counters,
+            "gauges": gauges,
+            "summaries": summaries,
+            **collected,
+        }
+
+    def reset(self) -> None:
+        """Clear all series (collectors are kept)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+# Module-level singleton
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create the process-wide MetricsRegistry instance."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry()
+    return _metrics
@@ -0,0 +1,241 @@
+"""
+Model Router Module
+
+Routes field-suggestion requests to a model by field complexity: short,
+list-style fields go to a small fast model and long-form ISO 19650 authoring
+fields go to the large model. Routes, explicit per-field assignments and the
+heuristic thresholds live in the ``routing`` section of
+``data/workload_profiles.json`` (hot-reloaded with the profiles).
+
+Each route carries a latency SLO; per-route latency, token counts, SLO
+breaches and the estimated savings against the large route are published
+via ``GET /metrics`` under ``model_routing``.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from metrics import get_metrics
+from workload_profiles import get_workload_profiles
+
+logger = logging.getLogger(__name__)
+
+# Route used for anything the heuristic cannot classify, and the baseline
+# that savings are measured against.
+BASELINE_ROUTE = 'complex'
+
+# Built-in routing table, used when the profile file has no routing section
+_DEFAULT_ROUTING: Dict[str, Any] = {
+    'enabled': True,
+    'simple_guidance_max_chars': 120,
+    'simple_markers': ['plain list format'],
+    'routes': {
+        'simple': {
+            'model': None,
+            'model_env': ['OLLAMA_SMALL_MODEL', 'OLLAMA_QUESTIONS_MODEL'],
+            'thinking': False,
+            'slo_ms': 10000,
+        },
+        'complex': {
+            'model': None,
+            'model_env': [],
+            'thinking': None,
+            'slo_ms': 45000,
+        },
+    },
+    'fields': {},
+}
+
+
+class ModelRoute:
+    """A resolved route: model (None = service default), thinking override and SLO."""
+
+    def __init__(self, name: str, model: Optional[str], thinking: Optional[bool],
+                 slo_ms: Optional[float], reason: str = ''):
+        self.name = name
+        self.model = model
+        self.thinking = thinking
+        self.slo_ms = slo_ms
+        self.reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'thinking': self.thinking,
+            'slo_ms': self.slo_ms,
+        }
+
+
+class ModelRouter:
+    """
+    Classifies fields into routes and records per-route outcomes.
+
+    Classification order:
+        1. explicit ``routing.fields`` entry
+        2. fields listed in the caller's complex set -> complex
+        3. guidance containing a simple marker (e.g. "Plain list format") -> simple
+        4. guidance no longer than ``simple_guidance_max_chars`` -> simple
+        5. otherwise -> complex
+    """
+
+    def __init__(self):
+        self.profiles = get_workload_profiles()
+
+    def _config(self) -> Dict[str, Any]:
+        section = self.profiles.section('routing')
+        if not section:
+            return _DEFAULT_ROUTING
+        merged = dict(_DEFAULT_ROUTING)
+        merged.update(section)
+        return merged
+
+    @staticmethod
+    def _resolve_model(route_cfg: Dict[str, Any]) -> Optional[str]:
+        if route_cfg.get('model'):
+            return route_cfg['model']
+        env_names = route_cfg.get('model_env') or []
+        if isinstance(env_names, str):
+            env_names = [env_names]
+        for env_name in env_names:
+            value = os.getenv(env_name, '').strip()
+            if value:
+                return value
+        return None
+
+    def _build_route(self, name: str, reason: str) -> ModelRoute:
+        routes = self._config().get('routes') or {}
+        route_cfg = routes.get(name)
+        if route_cfg is None:
+            logger.warning(f"Unknown model route '{name}', falling back to '{BASELINE_ROUTE}'")
+            name = BASELINE_ROUTE
+            route_cfg = routes.get(name) or {}
+        return ModelRoute(
+            name=name,
+            model=self._resolve_model(route_cfg),
+            thinking=route_cfg.get('thinking'),
+            slo_ms=route_cfg.get('slo_ms'),
+            reason=reason,
+        )
+
+    def get_route(self, name: str) -> ModelRoute:
+        """Resolve a route by name (unknown names resolve to the baseline route)."""
+        return self._build_route(name, 'by name')
+
+    def classify(self, field_name: str, guidance: str = '',
+                 complex_fields: Iterable[str] = ()) -> Tuple[str, str]:
+        """Return ``(route_name, reason)`` for a field."""
+        config = self._config()
+        if not config.get('enabled', True):
+            return BASELINE_ROUTE, 'routing disabled'
+
+        explicit = (config.get('fields') or {}).get(field_name)
+        if explicit:
+            return explicit, 'routing table'
+        if field_name in complex_fields:
+            return 'complex', 'complex field'
+
+        guidance_lower = (guidance or '').lower()
+        for marker in config.get('simple_markers') or []:
+            if marker.lower() in guidance_lower:
+                return 'simple', f"marker '{marker}'"
+
+        max_chars = config.get('simple_guidance_max_chars') or 0
+        if guidance and len(guidance) <= max_chars:
+            return 'simple', f'guidance <= {max_chars} chars'
+        return BASELINE_ROUTE, 'default'
+
+    def route(self, field_name: str, guidance: str = '',
+              complex_fields: Iterable[str] = ()) -> ModelRoute:
+        """Classify a field and resolve its route."""
+        name, reason = self.classify(field_name, guidance, complex_fields)
+        route = self._build_route(name, reason)
+        logger.debug(f"Routed field '{field_name}' to '{route.name}' ({reason}), model={route.model}")
+        return route
+
+    def record(self, route: ModelRoute, stats: Dict[str, Any]) -> None:
+        """
+        Record the outcome of a routed generation.
+
+        Args:
+            route: The route the request was sent to
+            stats: ``OllamaGenerator.last_call_stats()`` for the call
+        """
+        if not stats:
+            return
+        metrics = get_metrics()
+        metrics.inc('route_requests_total', route=route.name, model=stats.get('model'),
+                    status=stats.get('status'))
+        if stats.get('status') != 'ok':
+            return
+
+        latency_ms = stats.get('latency_ms') or 0.0
+        metrics.observe('route_latency_ms', latency_ms, route=route.name)
+        if stats.get('eval_tokens'):
+            metrics.observe('route_eval_tokens', stats['eval_tokens'], route=route.name)
+        if route.slo_ms and latency_ms > route.slo_ms:
+            metrics.inc('route_slo_breaches_total', route=route.name)
+            logger.warning(
+                f"Route '{route.name}' SLO breached: {latency_ms:.0f}ms > {route.slo_ms}ms "
+                f"(model={stats.get('model')})"
+            )
+
+    def describe(self) -> Dict[str, Any]:
+        """Per-route configuration, SLO attainment and estimated savings."""
+        metrics = get_metrics()
+        config = self._config()
+        baseline_latency = metrics.get_summary('route_latency_ms', route=BASELINE_ROUTE)
+        baseline_tokens = metrics.get_summary('route_eval_tokens', route=BASELINE_ROUTE)
+
+        routes = {}
+        for name in (config.get('routes') or {}):
+            route = self._build_route(name, '')
+            latency = metrics.get_summary('route_latency_ms', route=name)
+            tokens = metrics.get_summary('route_eval_tokens', route=name)
+            breaches = metrics.get_counter('route_slo_breaches_total', route=name)
+            count = latency['count'] if latency else 0
+
+            entry: Dict[str, Any] = {
+                **route.to_dict(),
+                'requests': count,
+                'latency_ms': latency,
+                'eval_tokens': tokens,
+                'slo_breaches': breaches,
+                'slo_attainment': round(1 - breaches / count, 4) if count else None,
+            }
+
+            # Savings are estimated against the recent average of the large route
+            if name != BASELINE_ROUTE and latency and baseline_latency:
+                saved_ms = baseline_latency['recent_avg'] - latency['recent_avg']
+                entry['estimated_savings'] = {
+                    'latency_ms_per_request': round(saved_ms, 1),
+                    'latency_ms_total': round(saved_ms * count, 1),
+                    'eval_tokens_per_request': (
+                        round(baseline_tokens['recent_avg'] - tokens['recent_avg'], 1)
+                        if tokens and baseline_tokens else None
+                    ),
+                }
+            routes[name] = entry
+
+        return {
+            'enabled': config.get('enabled', True),
+            'baseline_route': BASELINE_ROUTE,
+            'routes': routes,
+        }
+
+
+# Module-level singleton
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create the singleton ModelRouter instance."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+                get_metrics().register_collector('model_routing', _router.describe)
+    return _router
@@ -5,6 +5,7 @@ Uses Ollama's local LLM API to generate high-quality BEP content.
 Replaces the PyTorch LSTM model with a modern, faster, and more accurate solution.
 """
 
+import contextvars
 import json as _json
 import os
 import queue as _queue
@@ -13,12 +14,19 @@ import time
 import logging
 import threading
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional
 
 import requests
 from pydantic import BaseModel
 
+from deadline import SAFETY_MARGIN_S, DeadlineExceeded, current_deadline, get_throughput_estimator
+from degradation import DegradationPlan, get_degradation_controller
+from json_stream import IncrementalJsonParser
 from load_help_content import load_field_prompts_from_help_content
+from metrics import get_metrics
+from model_router import get_model_router
+from ttl_cache import TTLCache
+from workload_profiles import get_workload_profiles
 
 
 class _QuestionItem(BaseModel):
@@ -57,6 +65,11 @@ class OllamaGenerator:
         - OLLAMA_MODEL: Model name (default: llama3.1:8b)
         - OLLAMA_TIMEOUT: Request timeout in seconds (default: 60)
         - OLLAMA_DEFAULT_TEMPERATURE: Default temperature (default: 0.7)
+
+    Per-workload model and runtime options (temperature, num_predict, num_ctx,
+    num_batch, keep_alive, ...) are resolved from the workload profile file,
+    see workload_profiles.py. Interactive workloads are degraded under load,
+    see degradation.py.
     """
 
     # Regex patterns for cleaning AI-generated text (compiled once for performance)
@@ -106,6 +119,19 @@ class OllamaGenerator:
         # Connection state
         self._connection_verified = False
 
+        # Per-workload model/options (hot-reloaded from data/workload_profiles.json)
+        self.profiles = get_workload_profiles()
+
+        # Load-aware degradation of interactive requests
+        self.degradation = get_degradation_controller()
+
+        # Large-model refinements from two-tier streaming, per field
+        _refine_ttl = os.getenv("SUGGESTION_REFINEMENT_CACHE_TTL", "").strip()
+        self._refinements = TTLCache(maxsize=256, ttl_s=float(_refine_ttl) if _refine_ttl else 3600.0)
+
+        # Stats of the most recent generation on the calling thread
+        self._local = threading.local()
+
         # Load field-specific system prompts from helpContentData.js
         # This provides a single source of truth for AI prompts across the application
         logger.info("Loading field prompts from helpContentData.js...")
@@ -215,7 +241,8 @@ class OllamaGenerator:
         self._connection_verified = False
         return False
 
-    def _apply_thinking_mode(self, prompt: str, thinking_mode: Optional[bool]) -> str:
+    def _apply_thinking_mode(self, prompt: str, thinking_mode: Optional[bool],
+                             model: Optional[str] = None) -> str:
         """
         Prepend Qwen3 thinking mode directive to the prompt if applicable.
 
@@ -228,11 +255,114 @@ class OllamaGenerator:
         """
         if thinking_mode is None:
             return prompt
-        if not self.model.startswith('qwen3'):
+        if not (model or self.model).startswith('qwen3'):
             return prompt
         prefix = '/think' if thinking_mode else '/no_think'
         return f"{prefix}\n{prompt}"
 
+    def _build_payload(
+        self,
+        prompt: str,
+        workload: Optional[str] = None,
+        model: Optional[str] = None,
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None,
+        num_ctx: Optional[int] = None,
+        thinking_mode: Optional[bool] = None,
+        format_schema: Optional[dict] = None,
+        stream: bool = False
+    ) -> dict:
+        """
+        Build an /api/generate payload for a workload.
+
+        Explicit arguments override the workload profile, which overrides the
+        profile file defaults and finally the generator's own defaults. The
+        degradation applied (if any) is available via last_call_stats().
+        """
+        profile = self.profiles.get(workload)
+        effective_model = model or profile.model or self.model
+
+        options = dict(profile.options)
+        options.setdefault("temperature", self.default_temperature)
+        options.setdefault("num_predict", 200)
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_length is not None:
+            options["num_predict"] = max_length
+        if num_ctx is not None:
+            options["num_ctx"] = num_ctx
+
+        thinking = thinking_mode if thinking_mode is not None else profile.thinking
+        effective_model, thinking, options, plan = self.degradation.apply(
+            workload, effective_model, thinking, options
+        )
+        self._local.degradation = plan
+
+        payload = {
+            "model": effective_model,
+            "prompt": self._apply_thinking_mode(prompt, thinking, effective_model),
+            "stream": stream,
+            "options": options
+        }
+        if profile.keep_alive is not None:
+            payload["keep_alive"] = profile.keep_alive
+        if format_schema is not None:
+            payload["format"] = format_schema
+        return payload
+
+    def _record_generation(
+        self,
+        workload: Optional[str],
+        model: str,
+        elapsed_s: float,
+        data: Optional[dict] = None,
+        status: str = "ok"
+    ) -> None:
+        """Record per-workload request count, latency and token throughput."""
+        metrics = get_metrics()
+        labels = {"workload": workload or "default", "model": model}
+        data = data or {}
+        eval_count = data.get("eval_count")
+        prompt_eval_count = data.get("prompt_eval_count")
+        eval_duration = data.get("eval_duration")  # nanoseconds
+        prompt_eval_duration = data.get("prompt_eval_duration")
+        self._local.last_stats = {
+            "workload": workload or "default",
+            "model": model,
+            "status": status,
+            "latency_ms": elapsed_s * 1000,
+            "eval_tokens": eval_count,
+            "prompt_tokens": prompt_eval_count,
+            # Time to first token as Ollama reports it: model load plus prompt evaluation
+            "ttft_ms": ((data.get("load_duration") or 0) + prompt_eval_duration) / 1e6
+            if prompt_eval_duration is not None else None,
+        }
+
+        metrics.inc("ollama_requests_total", status=status, **labels)
+        if status != "ok":
+            return
+        metrics.observe("ollama_request_latency_ms", elapsed_s * 1000, **labels)
+        self.degradation.observe(workload, elapsed_s * 1000)
+        get_throughput_estimator().observe(model, data)
+        if eval_count:
+            metrics.observe("ollama_eval_tokens", eval_count, **labels)
+            if eval_duration:
+                metrics.observe("ollama_eval_tokens_per_s", eval_count / (eval_duration / 1e9), **labels)
+        if prompt_eval_count:
+            metrics.observe("ollama_prompt_tokens", prompt_eval_count, **labels)
+
+    def last_call_stats(self) -> dict:
+        """Model, latency, token counts and degradation of the last generation on this thread."""
+        stats = dict(getattr(self._local, "last_stats", None) or {})
+        plan = getattr(self._local, "degradation", None) or DegradationPlan()
+        stats.update(plan.to_dict())
+        return stats
+
+    def reset_call_stats(self) -> None:
+        """Forget the last call's stats (e.g. before a call that may hit a cache)."""
+        self._local.last_stats = None
+        self._local.degradation = None
+
     def _calculate_timeout(self, max_length: int) -> int:
         """
         Calculate dynamic timeout based on generation length.
@@ -268,74 +398,69 @@ class OllamaGenerator:
     def generate_text(
         self,
         prompt: str,
-        max_length: int = 200,
+        max_length: Optional[int] = None,
         temperature: Optional[float] = None,
         retries: int = 2,
         num_ctx: Optional[int] = None,
         format_schema: Optional[dict] = None,
-        thinking_mode: Optional[bool] = None
+        thinking_mode: Optional[bool] = None,
+        workload: Optional[str] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate text based on a prompt.
 
         Args:
             prompt: Starting text prompt.
-            max_length: Maximum number of tokens to generate.
-            temperature: Sampling temperature (0.1-2.0). If None, uses
-                        default_temperature from config.
+            max_length: Maximum number of tokens to generate. If None, uses
+                       the workload profile's num_predict.
+            temperature: Sampling temperature (0.1-2.0). If None, uses the
+                        workload profile, then default_temperature from config.
             retries: Number of retry attempts for transient errors.
             num_ctx: Context window size (default: 2048, can increase for larger docs).
             format_schema: Optional JSON schema dict to enforce structured output via
                           Ollama's native format param (v0.5+). When set, Ollama
                           generates grammar-constrained JSON matching the schema.
+            thinking_mode: Qwen3 thinking directive. If None, uses the workload profile.
+            workload: Workload profile name (e.g. 'analysis_chunk', 'summary').
+            model: Per-call model override (takes precedence over the profile).
 
         Returns:
-            Generated text, or error message if generation fails.
+            Generated text, or error message if generation fails (including
+            when the request deadline, see deadline.py, cannot be met).
         """
-        if temperature is None:
-            temperature = self.default_temperature
-
-        prompt = self._apply_thinking_mode(prompt, thinking_mode)
-        effective_timeout = self._calculate_timeout(max_length)
+        payload = self._build_payload(
+            prompt, workload=workload, model=model, max_length=max_length,
+            temperature=temperature, num_ctx=num_ctx, thinking_mode=thinking_mode,
+            format_schema=format_schema
+        )
+        effective_timeout = self._calculate_timeout(payload["options"]["num_predict"])
+        deadline = current_deadline()
         last_error: Optional[Exception] = None
 
         for attempt in range(retries + 1):
+            started = time.time()
             try:
-                options = {
-                    "temperature": temperature,
-                    "num_predict": max_length,
-                    "top_p": 0.9,
-                    "top_k": 40
-                }
-
-                # Add num_ctx if specified for larger context windows
-                if num_ctx is not None:
-                    options["num_ctx"] = num_ctx
-
-                payload = {
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": options
-                }
-                if format_schema is not None:
-                    payload["format"] = format_schema
-
+                timeout = effective_timeout
+                if deadline is not None:
+                    timeout = deadline.fit(payload, effective_timeout)
                 logger.debug(
-                    f"Generating text: max_length={max_length}, "
-                    f"temperature={temperature}, timeout={effective_timeout}s"
+                    f"Generating text: workload={workload}, model={payload['model']}, "
+                    f"options={payload['options']}, timeout={timeout}s"
                 )
 
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=effective_timeout
-                )
+                with self.degradation.track(workload):
+                    response = requests.post(
+                        f"{self.base_url}/api/generate",
+                        json=payload,
+                        timeout=timeout
+                    )
 
                 if response.status_code == 200:
                     try:
                         data = response.json()
                         generated = data.get('response', '').strip()
+                        self._record_generation(workload, payload["model"], time.time() - started, data)
                         return generated
                     except ValueError as e:
                         # JSON decode error
@@ -348,13 +473,24 @@ class OllamaGenerator:
                     )
                     # Don't retry on client errors (4xx)
                     if 400 <= response.status_code < 500:
+                        self._record_generation(workload, payload["model"], 0.0, status="error")
                         return "Error: Unable to generate text. Please check Ollama service."
                     raise requests.exceptions.HTTPError(
                         f"Server error: {response.status_code}"
                     )
 
+            except DeadlineExceeded as e:
+                logger.warning(f"Not generating for workload={workload}: {e}")
+                self._record_generation(workload, payload["model"], 0.0, status="deadline")
+                return "Error: Request deadline exceeded."
             except requests.exceptions.Timeout as e:
                 last_error = e
+                # A timeout is the strongest latency signal there is
+                self.degradation.observe(workload, (time.time() - started) * 1000)
+                if deadline is not None and deadline.remaining_s() <= SAFETY_MARGIN_S:
+                    deadline.mark_exceeded('aborted')
+                    self._record_generation(workload, payload["model"], 0.0, status="deadline")
+                    return "Error: Request deadline exceeded."
                 logger.warning(
                     f"Request timeout (attempt {attempt + 1}/{retries + 1})"
                 )
@@ -376,8 +512,88 @@ class OllamaGenerator:
 
         # All retries exhausted
         logger.error(f"Generation failed after {retries + 1} attempts: {last_error}")
+        self._record_generation(workload, payload["model"], 0.0, status="error")
         return "Error: Unable to generate text after multiple attempts. Please try again."
 
+    def generate_json_stream(
+        self,
+        prompt: str,
+        format_schema: dict,
+        workload: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        thinking_mode: Optional[bool] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream grammar-constrained JSON, yielding values as soon as they close.
+
+        Yields:
+            {"type": "value", "path": ("questions", 0), "value": {...}}
+                for each completed root member / element of a root-level
+                array (see json_stream.py)
+            {"type": "done", "value": <parsed root or None>, "text": <raw JSON>}
+
+        Raises:
+            DeadlineExceeded, requests.exceptions.RequestException: the
+                request failed; nothing is retried (callers fall back to
+                generate_text()).
+        """
+        payload = self._build_payload(
+            prompt, workload=workload, model=model, temperature=temperature,
+            thinking_mode=thinking_mode, format_schema=format_schema, stream=True
+        )
+        timeout = self._calculate_timeout(payload["options"]["num_predict"])
+        deadline = current_deadline()
+        parser = IncrementalJsonParser()
+        accumulated = []
+        final_chunk = None
+        first_value = True
+        started = time.time()
+        try:
+            if deadline is not None:
+                timeout = deadline.fit(payload, timeout)
+            with self.degradation.track(workload):
+                response = requests.post(
+                    f"{self.base_url}/api/generate", json=payload, stream=True, timeout=timeout
+                )
+                try:
+                    response.raise_for_status()
+                    for raw_line in response.iter_lines():
+                        if deadline is not None and deadline.remaining_s() <= 0:
+                            deadline.mark_exceeded('aborted')
+                            raise DeadlineExceeded("Request deadline exceeded")
+                        if not raw_line:
+                            continue
+                        try:
+                            chunk = _json.loads(raw_line)
+                        except _json.JSONDecodeError:
+                            continue
+                        token = chunk.get("response", "")
+                        if token:
+                            accumulated.append(token)
+                            for path, value in parser.feed(token):
+                                if first_value:
+                                    first_value = False
+                                    get_metrics().observe(
+                                        "ollama_time_to_first_value_ms", (time.time() - started) * 1000,
+                                        workload=workload or "default", model=payload["model"]
+                                    )
+                                yield {"type": "value", "path": path, "value": value}
+                        if chunk.get("done"):
+                            final_chunk = chunk
+                            break
+                finally:
+                    # Also reached when the consumer stops early: stops Ollama generating
+                    response.close()
+        except DeadlineExceeded:
+            self._record_generation(workload, payload["model"], 0.0, status="deadline")
+            raise
+        except Exception:
+            self._record_generation(workload, payload["model"], 0.0, status="error")
+            raise
+        self._record_generation(workload, payload["model"], time.time() - started, final_chunk)
+        yield {"type": "done", "value": parser.value, "text": "".join(accumulated).strip()}
+
     @lru_cache(maxsize=128)
     def _get_cached_suggestion(self, field_type: str, cache_key: str) -> str:
         """
@@ -393,14 +609,13 @@ class OllamaGenerator:
         field_config = self.field_prompts.get(field_type, self.default_prompt)
         context = field_config.get('context', 'Provide professional BIM content.')
         context = self._add_table_guidance(context)
-        temperature = field_config.get('temperature', 0.5)
 
         prompt = f"{context}\n\nGenerate professional content for this section."
 
         generated = self.generate_text(
             prompt=prompt,
-            max_length=200,
-            temperature=temperature
+            temperature=field_config.get('temperature'),
+            workload='field_suggestion'
         )
 
         return self._clean_suggestion(generated, '')
@@ -409,10 +624,10 @@ class OllamaGenerator:
         self,
         field_type: str,
         partial_text: str = '',
-        max_length: int = 200,
+        max_length: Optional[int] = None,
         temperature: Optional[float] = None,
         use_cache: bool = True,
-        thinking_mode: Optional[bool] = False
+        thinking_mode: Optional[bool] = None
     ) -> str:
         """
         Generate field-specific suggestion.
@@ -420,11 +635,13 @@ class OllamaGenerator:
         Args:
             field_type: Type of BEP field (e.g., 'modelValidation', 'bimUses').
             partial_text: Existing text in the field to continue from.
-            max_length: Maximum tokens to generate.
+            max_length: Maximum tokens to generate. If None, uses the
+                       'field_suggestion' workload profile.
             temperature: Override temperature for this generation. If None,
-                        uses field-specific or default (0.5 for BEP content).
+                        uses field-specific or the workload profile value.
             use_cache: If True and no partial_text, return cached result when
                       available.
+            thinking_mode: Qwen3 thinking directive. If None, uses the workload profile.
 
         Returns:
             Generated suggestion text.
@@ -452,12 +669,13 @@ class OllamaGenerator:
         context = field_config.get('context', 'Provide professional BIM content.')
         context = self._add_table_guidance(context)
 
-        # Determine temperature: parameter > field config > default
+        # Determine temperature: parameter > field config > workload profile
         if temperature is None:
-            temperature = field_config.get('temperature', 0.5)
+            temperature = field_config.get('temperature')
 
-        # Use cache for suggestions without partial text
-        if use_cache and not partial_text:
+        # Use cache for suggestions without partial text. Skipped while degraded
+        # so that reduced-quality output is never cached.
+        if use_cache and not partial_text and not self.degradation.level()[0]:
             # Create cache key from field type (config is already loaded)
             cache_key = f"{field_type}_{hash(context)}"
             try:
@@ -478,7 +696,8 @@ class OllamaGenerator:
             prompt=prompt,
             max_length=max_length,
             temperature=temperature,
-            thinking_mode=thinking_mode
+            thinking_mode=thinking_mode,
+            workload='field_suggestion'
         )
 
         # Clean up the suggestion
@@ -490,9 +709,9 @@ class OllamaGenerator:
         self,
         field_type: str,
         partial_text: str = '',
-        max_length: int = 200,
+        max_length: Optional[int] = None,
         temperature: Optional[float] = None,
-        thinking_mode: Optional[bool] = False
+        thinking_mode: Optional[bool] = None
     ):
         """
         Generator: yields SSE event dicts for streaming field suggestions.
@@ -514,20 +733,145 @@ class OllamaGenerator:
         field_type = field_type.strip()
         partial_text = (partial_text or '').strip()[:2000]
 
-        # Resolve field config and prompt (identical to suggest_for_field)
+        prompt, field_temperature = self._field_prompt(field_type, partial_text)
+        if temperature is None:
+            temperature = field_temperature
+
+        payload = self._build_payload(
+            prompt, workload='field_suggestion', max_length=max_length,
+            temperature=temperature, thinking_mode=thinking_mode, stream=True
+        )
+        yield from self._stream_payload(payload, 'field_suggestion', partial_text, self._local.degradation)
+
+    def _field_prompt(self, field_type: str, partial_text: str):
+        """Return (prompt, field temperature) for a field suggestion (as suggest_for_field)."""
         field_config = self.field_prompts.get(field_type, self.default_prompt)
         context = field_config.get('context', 'Provide professional BIM content.')
         context = self._add_table_guidance(context)
-        if temperature is None:
-            temperature = field_config.get('temperature', 0.5)
 
         if partial_text and len(partial_text) > 10:
             prompt = f"{context}\n\nContinue this text professionally:\n{partial_text}"
         else:
             prompt = f"{context}\n\nGenerate professional content for this section."
+        return prompt, field_config.get('temperature')
+
+    def suggest_for_field_two_tier_stream(
+        self,
+        field_type: str,
+        partial_text: str = '',
+        max_length: Optional[int] = None,
+        temperature: Optional[float] = None
+    ):
+        """
+        Generator: stream a small-model draft, then replace it with a large-model refinement.
+
+        The draft streams from the 'simple' route model (see model_router.py)
+        while this generator's model produces the refined text concurrently
+        ('field_refinement' workload). Event types are those of
+        suggest_for_field_stream plus:
+
+          {"type": "done",    "fullText": "draft…", "draft": true, "refining": true}
+          {"type": "replace", "fullText": "refined…", "model": "qwen3:8b"}
+
+        The stream simply ends after "done" if refinement fails. Refinements are
+        cached per field and partial text; a cache hit is returned as a single
+        "done" event with "refined": true. Falls back to plain streaming when
+        no small model is configured.
+        """
+        if not field_type or not isinstance(field_type, str):
+            yield {"type": "error", "message": "field_type must be a non-empty string"}
+            return
+
+        field_type = field_type.strip()
+        partial_text = (partial_text or '').strip()[:2000]
+        metrics = get_metrics()
+
+        cache_key = (field_type, partial_text, self.model)
+        cached = self._refinements.get(cache_key)
+        if cached:
+            metrics.inc("two_tier_requests_total", outcome="cached")
+            yield {"type": "done", "fullText": cached, "refined": True, "cached": True}
+            return
+
+        draft_model = get_model_router().get_route('simple').model
+        if not draft_model or draft_model == self.model:
+            logger.debug("No small draft model configured; streaming from the main model only")
+            yield from self.suggest_for_field_stream(field_type, partial_text, max_length, temperature)
+            return
+
+        prompt, field_temperature = self._field_prompt(field_type, partial_text)
+        if temperature is None:
+            temperature = field_temperature
+
+        # Refinement adds load; skip it once the controller is shortening output
+        refine = self.degradation.level()[0] < 2
+        refined: dict = {}
+
+        def _refine():
+            started = time.time()
+            text = self.generate_text(prompt=prompt, temperature=temperature, retries=0,
+                                      workload='field_refinement')
+            if text and not text.startswith("Error:"):
+                refined["text"] = self._clean_suggestion(text, partial_text)
+                refined["model"] = self.last_call_stats().get("model")
+                metrics.observe("two_tier_refinement_latency_ms", (time.time() - started) * 1000)
+
+        # Copy the request context so the refinement honours the request deadline
+        refine_t = threading.Thread(target=contextvars.copy_context().run, args=(_refine,), daemon=True)
+        if refine:
+            refine_t.start()
+
+        draft_payload = self._build_payload(
+            prompt, workload='field_suggestion', model=draft_model, max_length=max_length,
+            temperature=temperature, thinking_mode=False, stream=True
+        )
+        draft_done = False
+        for event in self._stream_payload(draft_payload, 'field_suggestion', partial_text,
+                                          self._local.degradation):
+            if event["type"] == "error" and refine:
+                # The refinement can still answer the request on its own
+                logger.warning(f"Draft generation failed, waiting for refinement: {event['message']}")
+                continue
+            if event["type"] == "done":
+                event = {**event, "draft": True, "refining": refine}
+                draft_done = True
+            yield event
+
+        if not refine:
+            metrics.inc("two_tier_requests_total", outcome="draft_only")
+            return
 
-        prompt = self._apply_thinking_mode(prompt, thinking_mode)
-        effective_timeout = self._calculate_timeout(max_length)
+        refine_timeout = self._calculate_timeout(
+            self.profiles.get('field_refinement').options.get("num_predict", 200)
+        )
+        refine_t.join(timeout=refine_timeout + 10)
+        text = refined.get("text")
+        if not text:
+            metrics.inc("two_tier_requests_total", outcome="refinement_failed")
+            if not draft_done:
+                yield {"type": "error", "message": "Draft and refinement both failed"}
+            return
+
+        self._refinements.put(cache_key, text)
+        metrics.inc("two_tier_requests_total", outcome="replaced" if draft_done else "refined_only")
+        if draft_done:
+            yield {"type": "replace", "fullText": text, "model": refined.get("model") or self.model}
+        else:
+            yield {"type": "done", "fullText": text, "refined": True}
+
+    def _stream_payload(self, payload: dict, workload: str, partial_text: str = '',
+                        degradation: Optional[DegradationPlan] = None):
+        """
+        Generator: run a streaming Ollama request and yield SSE event dicts.
+
+        Emits THINKING_STAGES messages until the first token arrives, then one
+        "token" event per Ollama chunk and a final cleaned "done" event. The
+        "done" event carries the degradation flags so the UI can offer to
+        refine a degraded result later.
+        """
+        degradation = degradation or DegradationPlan()
+        effective_timeout = self._calculate_timeout(payload["options"]["num_predict"])
+        deadline = current_deadline()  # captured here: the reader runs in its own thread
         output_q: _queue.Queue = _queue.Queue()
         first_token_event = threading.Event()
 
@@ -539,44 +883,56 @@ class OllamaGenerator:
                 output_q.put({"type": "stage", "message": msg})
 
         def _ollama_reader():
+            started = time.time()
             try:
-                payload = {
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": True,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_length,
-                        "top_p": 0.9,
-                        "top_k": 40,
-                    }
-                }
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    stream=True,
-                    timeout=effective_timeout
-                )
-                response.raise_for_status()
-                accumulated = []
-                for raw_line in response.iter_lines():
-                    if not raw_line:
-                        continue
-                    try:
-                        chunk = _json.loads(raw_line)
-                    except _json.JSONDecodeError:
-                        continue
-                    token = chunk.get("response", "")
-                    if token:
-                        first_token_event.set()
-                        accumulated.append(token)
-                        output_q.put({"type": "token", "text": token})
-                    if chunk.get("done"):
-                        break
+                timeout = effective_timeout
+                if deadline is not None:
+                    timeout = deadline.fit(payload, effective_timeout)
+                with self.degradation.track(workload):
+                    response = requests.post(
+                        f"{self.base_url}/api/generate",
+                        json=payload,
+                        stream=True,
+                        timeout=timeout
+                    )
+                    response.raise_for_status()
+                    accumulated = []
+                    final_chunk = None
+                    for raw_line in response.iter_lines():
+                        if deadline is not None and deadline.remaining_s() <= 0:
+                            # Closing the connection makes Ollama stop generating
+                            response.close()
+                            deadline.mark_exceeded('aborted')
+                            raise DeadlineExceeded("Request deadline exceeded")
+                        if not raw_line:
+                            continue
+                        try:
+                            chunk = _json.loads(raw_line)
+                        except _json.JSONDecodeError:
+                            continue
+                        token = chunk.get("response", "")
+                        if token:
+                            if not first_token_event.is_set():
+                                get_metrics().observe(
+                                    "ollama_time_to_first_token_ms", (time.time() - started) * 1000,
+                                    workload=workload, model=payload["model"]
+                                )
+                            first_token_event.set()
+                            accumulated.append(token)
+                            output_q.put({"type": "token", "text": token})
+                        if chunk.get("done"):
+                            final_chunk = chunk
+                            break
+                self._record_generation(workload, payload["model"], time.time() - started, final_chunk)
                 full_text = self._clean_suggestion("".join(accumulated), partial_text)
-                output_q.put({"type": "done", "fullText": full_text})
+                output_q.put({"type": "done", "fullText": full_text, **degradation.to_dict()})
+            except DeadlineExceeded as exc:
+                logger.warning("Streaming stopped at deadline (%s): %s", workload, exc)
+                self._record_generation(workload, payload["model"], 0.0, status="deadline")
+                output_q.put({"type": "error", "message": str(exc)})
             except Exception as exc:
-                logger.error("Streaming Ollama error: %s", exc)
+                logger.error("Streaming Ollama error (%s): %s", workload, exc)
+                self._record_generation(workload, payload["model"], 0.0, status="error")
                 output_q.put({"type": "error", "message": str(exc)})
             finally:
                 output_q.put(None)  # sentinel
@@ -600,8 +956,9 @@ class OllamaGenerator:
         ollama_t.join(timeout=2.0)
 
     def clear_cache(self) -> None:
-        """Clear the suggestion cache."""
+        """Clear the suggestion and refinement caches."""
         self._get_cached_suggestion.cache_clear()
+        self._refinements.clear()
         logger.debug("Suggestion cache cleared")
 
     def _clean_suggestion(
@@ -704,8 +1061,84 @@ class OllamaGenerator:
         Returns:
             List of question dicts: [{"id": "q1", "text": "...", "hint": "..."}, ...]
         """
-        import json as _json
+        prompt = self._questions_prompt(field_type, field_label, field_context)
+        _schema = _QuestionsList.model_json_schema()
+        raw = self.generate_text(prompt=prompt, format_schema=_schema, workload='questions')
+
+        # Parse questions — structured output makes this reliable; keep fallback for edge cases
+        questions = self._parse_questions_json(raw)
 
+        # Validate we got at least 2 questions; retry once if not
+        if len(questions) < 2:
+            logger.warning("First question generation produced < 2 questions, retrying…")
+            # Nudge temperature up slightly so the retry doesn't repeat the same output
+            retry_temperature = self.profiles.get('questions').options.get('temperature', 0.4) + 0.1
+            raw = self.generate_text(
+                prompt=prompt, temperature=retry_temperature,
+                format_schema=_schema, workload='questions'
+            )
+            questions = self._parse_questions_json(raw)
+
+        # Fallback: hardcoded generic questions
+        if len(questions) < 2:
+            logger.warning("Using fallback generic questions for %s", field_type)
+            questions = [
+                {"id": "q1", "text": f"What are the key objectives for {field_label}?",
+                 "hint": "Think about the main goals and outcomes."},
+                {"id": "q2", "text": "What is the project type and scale?",
+                 "hint": "e.g., commercial office, 10,000 sqm, £50M budget"},
+                {"id": "q3", "text": "Are there specific standards or requirements to address?",
+                 "hint": "e.g., BREEAM, Passivhaus, client-specific standards"},
+            ]
+
+        return questions[:5]  # Cap at 5
+
+    def generate_questions_for_field_stream(
+        self,
+        field_type: str,
+        field_label: str,
+        field_context: Optional[dict] = None
+    ):
+        """
+        Stream questions one by one as the structured output produces them.
+
+        Yields:
+            {"type": "question", "question": {"id": "q1", "text": "...", "hint": "..."}}
+            {"type": "done", "questions": [...]}   (authoritative final list)
+
+        If streaming fails or yields fewer than 2 questions, the final list
+        comes from generate_questions_for_field() (retry, then generic
+        questions), so "done" may differ from the streamed questions.
+        """
+        prompt = self._questions_prompt(field_type, field_label, field_context)
+        questions = []
+        try:
+            for event in self.generate_json_stream(
+                prompt, _QuestionsList.model_json_schema(), workload='questions'
+            ):
+                if event["type"] != "value" or event["path"][0] != "questions" or len(event["path"]) != 2:
+                    continue
+                if not isinstance(event["value"], dict) or len(questions) >= 5:
+                    continue
+                question = self._normalise_question(event["value"], len(questions))
+                if not question["text"]:
+                    continue
+                questions.append(question)
+                yield {"type": "question", "question": question}
+        except Exception as e:
+            logger.warning("Streaming question generation failed for %s: %s", field_type, e)
+
+        if len(questions) < 2:
+            questions = self.generate_questions_for_field(field_type, field_label, field_context)
+        yield {"type": "done", "questions": questions}
+
+    def _questions_prompt(
+        self,
+        field_type: str,
+        field_label: str,
+        field_context: Optional[dict] = None
+    ) -> str:
+        """Build the question-generation prompt for a BEP field."""
         step_name = (field_context or {}).get('step_name', 'Unknown')
         existing_fields = (field_context or {}).get('existing_fields', {})
 
@@ -736,38 +1169,7 @@ class OllamaGenerator:
             "each question should gather different information. "
             'Respond with JSON only: {"questions": [{"id": "q1", "text": "...", "hint": "..."}, ...]}'
         )
-
-        _schema = _QuestionsList.model_json_schema()
-        raw = self.generate_text(
-            prompt=prompt, max_length=220, temperature=0.4, num_ctx=1024,
-            format_schema=_schema, thinking_mode=False
-        )
-
-        # Parse questions — structured output makes this reliable; keep fallback for edge cases
-        questions = self._parse_questions_json(raw)
-
-        # Validate we got at least 2 questions; retry once if not
-        if len(questions) < 2:
-            logger.warning("First question generation produced < 2 questions, retrying…")
-            raw = self.generate_text(
-                prompt=prompt, max_length=220, temperature=0.5, num_ctx=1024,
-                format_schema=_schema, thinking_mode=False
-            )
-            questions = self._parse_questions_json(raw)
-
-        # Fallback: hardcoded generic questions
-        if len(questions) < 2:
-            logger.warning("Using fallback generic questions for %s", field_type)
-            questions = [
-                {"id": "q1", "text": f"What are the key objectives for {field_label}?",
-                 "hint": "Think about the main goals and outcomes."},
-                {"id": "q2", "text": "What is the project type and scale?",
-                 "hint": "e.g., commercial office, 10,000 sqm, £50M budget"},
-                {"id": "q3", "text": "Are there specific standards or requirements to address?",
-                 "hint": "e.g., BREEAM, Passivhaus, client-specific standards"},
-            ]
-
-        return questions[:5]  # Cap at 5
+        return prompt
 
     def _parse_questions_json(self, raw: str) -> list:
         """Parse a JSON list of questions from raw LLM output.
@@ -821,7 +1223,7 @@ class OllamaGenerator:
         answers: list,
         field_context: Optional[dict] = None,
         field_label: Optional[str] = None,
-        thinking_mode: Optional[bool] = False
+        thinking_mode: Optional[bool] = None
     ) -> str:
         """
         Generate BEP content incorporating user answers to guided questions.
@@ -874,8 +1276,7 @@ class OllamaGenerator:
             "Generate content (150-250 words):"
         )
 
-        generated = self.generate_text(prompt=prompt, max_length=400, temperature=0.5,
-                                       thinking_mode=thinking_mode)
+        generated = self.generate_text(prompt=prompt, thinking_mode=thinking_mode, workload='answers')
         cleaned = self._clean_suggestion(generated, '')
 
         return cleaned
@@ -886,7 +1287,7 @@ class OllamaGenerator:
         answers: list,
         field_context: Optional[dict] = None,
         field_label: Optional[str] = None,
-        thinking_mode: Optional[bool] = False
+        thinking_mode: Optional[bool] = None
     ):
         """
         Generator: yields SSE event dicts for streaming answer-based content generation.
@@ -927,78 +1328,8 @@ class OllamaGenerator:
             "Generate content (150-250 words):"
         )
 
-        prompt = self._apply_thinking_mode(prompt, thinking_mode)
-        effective_timeout = self._calculate_timeout(400)
-        output_q: _queue.Queue = _queue.Queue()
-        first_token_event = threading.Event()
-
-        def _stage_emitter():
-            for msg in THINKING_STAGES:
-                signalled = first_token_event.wait(timeout=0.8)
-                if signalled:
-                    break
-                output_q.put({"type": "stage", "message": msg})
-
-        def _ollama_reader():
-            try:
-                payload = {
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": True,
-                    "options": {
-                        "temperature": 0.5,
-                        "num_predict": 400,
-                        "top_p": 0.9,
-                        "top_k": 40,
-                    }
-                }
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    stream=True,
-                    timeout=effective_timeout
-                )
-                response.raise_for_status()
-                accumulated = []
-                for raw_line in response.iter_lines():
-                    if not raw_line:
-                        continue
-                    try:
-                        chunk = _json.loads(raw_line)
-                    except _json.JSONDecodeError:
-                        continue
-                    token = chunk.get("response", "")
-                    if token:
-                        first_token_event.set()
-                        accumulated.append(token)
-                        output_q.put({"type": "token", "text": token})
-                    if chunk.get("done"):
-                        break
-                full_text = self._clean_suggestion("".join(accumulated), '')
-                output_q.put({"type": "done", "fullText": full_text})
-            except Exception as exc:
-                logger.error("Streaming generate_from_answers error: %s", exc)
-                output_q.put({"type": "error", "message": str(exc)})
-            finally:
-                output_q.put(None)  # sentinel
-
-        stage_t = threading.Thread(target=_stage_emitter, daemon=True)
-        ollama_t = threading.Thread(target=_ollama_reader, daemon=True)
-        stage_t.start()
-        ollama_t.start()
-
-        while True:
-            try:
-                item = output_q.get(timeout=effective_timeout + 10)
-            except _queue.Empty:
-                yield {"type": "error", "message": "Generation timed out"}
-                break
-            if item is None:
-                break
-            yield item
-
-        stage_t.join(timeout=2.0)
-        ollama_t.join(timeout=2.0)
+        payload = self._build_payload(prompt, workload='answers', thinking_mode=thinking_mode, stream=True)
+        yield from self._stream_payload(payload, 'answers', degradation=self._local.degradation)
 
 
 # Global instance for singleton pattern
@@ -0,0 +1,136 @@
+"""
+Summary Polish Module
+
+Produces the LLM-written EIR summary in the background. ``analyze()``
+returns the template summary (summary_renderer.py) at once and queues the
+polish under the analysis id (see analysis_store.py). Clients
+fetch the result with ``GET /analysis/{analysis_id}/summary`` or wait for it
+on ``GET /analysis/{analysis_id}/summary-stream``. Polishes are kept in a TTL
+cache, so an identical analysis (e.g. a re-analysed, unchanged EIR served
+from the chunk cache) reuses the finished or running polish.
+
+Configuration:
+    - EIR_SUMMARY_POLISH: polish summaries with the LLM in the background
+      (default: true); false returns the template summary only
+    - EIR_SUMMARY_POLISH_WORKERS: concurrent polish calls (default: 1)
+    - EIR_SUMMARY_POLISH_TTL: seconds a polish is kept (default: 3600)
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import get_metrics
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+POLISH_PENDING = 'pending'
+POLISH_COMPLETED = 'completed'
+POLISH_FAILED = 'failed'
+
+MAX_POLISHES = 512
+
+
+class SummaryPolish:
+    """State of one background polish."""
+
+    def __init__(self, analysis_id: str):
+        self.analysis_id = analysis_id
+        self.status = POLISH_PENDING
+        self.summary_markdown: Optional[str] = None
+        self.model: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    def finish(self, status: str, summary_markdown: Optional[str] = None,
+               model: Optional[str] = None, error: Optional[str] = None) -> None:
+        self.summary_markdown = summary_markdown
+        self.model = model
+        self.error = error
+        self.finished_at = time.time()
+        self.status = status
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the polish finished (True) or ``timeout`` passed (False)."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'analysis_id': self.analysis_id,
+            'status': self.status,
+            'summary_markdown': self.summary_markdown,
+            'model': self.model,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class SummaryPolisher:
+    """Runs summary polishes on a small thread pool and keeps them by analysis id."""
+
+    def __init__(self, workers: Optional[int] = None, ttl_s: Optional[float] = None):
+        self.enabled = os.getenv('EIR_SUMMARY_POLISH', 'true').strip().lower() not in ('0', 'false', 'no', 'off')
+        self.workers = workers or max(1, int(os.getenv('EIR_SUMMARY_POLISH_WORKERS', '1')))
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv('EIR_SUMMARY_POLISH_TTL', '3600'))
+        self._polishes = TTLCache(maxsize=MAX_POLISHES, ttl_s=self.ttl_s)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='summary-polish')
+
+    def submit(self, analysis_id: str, polish: Callable[[], Tuple[str, Optional[str]]]) -> SummaryPolish:
+        """
+        Queue ``polish`` (returning the summary and the model that wrote it)
+        for ``analysis_id``, unless a polish of it is running or finished.
+        """
+        with self._lock:
+            existing = self._polishes.get(analysis_id)
+            if existing is not None and existing.status != POLISH_FAILED:
+                get_metrics().inc('eir_summary_polish_total', status='reused')
+                return existing
+            job = SummaryPolish(analysis_id)
+            self._polishes.put(analysis_id, job)
+        # Not run in the request context: the polish outlives the request and its deadline
+        self._executor.submit(self._run, job, polish)
+        return job
+
+    def _run(self, job: SummaryPolish, polish: Callable[[], Tuple[str, Optional[str]]]) -> None:
+        try:
+            summary, model = polish()
+            job.finish(POLISH_COMPLETED, summary_markdown=summary, model=model)
+        except Exception as e:
+            logger.warning(f"Summary polish of analysis {job.analysis_id} failed: {e}")
+            job.finish(POLISH_FAILED, error=str(e))
+        self._polishes.put(job.analysis_id, job)  # kept for the full TTL once finished
+        metrics = get_metrics()
+        metrics.inc('eir_summary_polish_total', status=job.status)
+        metrics.observe('eir_summary_polish_ms', (job.finished_at - job.created_at) * 1000, status=job.status)
+
+    def get(self, analysis_id: str) -> Optional[SummaryPolish]:
+        return self._polishes.get(analysis_id)
+
+    def describe(self) -> Dict[str, Any]:
+        return {'enabled': self.enabled, 'workers': self.workers, 'ttl_s': self.ttl_s,
+                'polishes': len(self._polishes)}
+
+
+# Module-level singleton
+_polisher: Optional[SummaryPolisher] = None
+_polisher_lock = threading.Lock()
+
+
+def get_summary_polisher() -> SummaryPolisher:
+    """Get or create the singleton SummaryPolisher."""
+    global _polisher
+    if _polisher is None:
+        with _polisher_lock:
+            if _polisher is None:
+                _polisher = SummaryPolisher()
+                get_metrics().register_collector('summary_polish', _polisher.describe)
+    return _polisher
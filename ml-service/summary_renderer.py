@@ -0,0 +1,176 @@
+"""
+Summary Renderer Module
+
+Renders an EIR analysis (``EirAnalysis`` dict) as a Markdown summary without
+the LLM: one section per analysis section, in the order a BEP author reads
+them, with milestones and LOIN entries as tables. Empty sections are left
+out. Rendering takes well under a millisecond, so every analysis returns a
+summary at once; the LLM-polished summary, when enabled, follows in the
+background (summary_polish.py).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Labels of the scalar/list values listed under a section heading
+_PROJECT_FIELDS = (('client', 'Client'), ('location', 'Location'), ('project_type', 'Project type'),
+                   ('estimated_value', 'Estimated value'))
+_INFORMATION_REQUIREMENTS = (('OIR', 'Organizational Information Requirements (OIR)'),
+                             ('AIR', 'Asset Information Requirements (AIR)'),
+                             ('PIR', 'Project Information Requirements (PIR)'),
+                             ('EIR_specifics', 'Exchange Information Requirements'))
+_STANDARDS_FIELDS = (('classification_systems', 'Classification'), ('naming_conventions', 'Naming conventions'),
+                     ('file_formats', 'File formats'), ('lod_loi_requirements', 'LOD / LOI'),
+                     ('cad_standards', 'CAD standards'))
+_CDE_FIELDS = (('platform', 'Platform'), ('access_control', 'Access control'),
+               ('folder_structure', 'Folder structure'))
+_QUALITY_FIELDS = (('model_checking', 'Model checking'), ('clash_detection', 'Clash detection'),
+                   ('validation_procedures', 'Validation'))
+_PROTOCOL_FIELDS = (('exchange_events', 'Exchange events'), ('coordination_frequency', 'Coordination frequency'),
+                    ('collaboration_meetings', 'Collaboration meetings'))
+_SECURITY_FIELDS = (('classification_scheme', 'Classification scheme'),
+                    ('data_handling_requirements', 'Data handling'), ('access_control_policy', 'Access control'))
+_TRAINING_FIELDS = (('bim_competency_standards', 'Competency standards'),
+                    ('required_certifications', 'Required certifications'),
+                    ('project_specific_training', 'Project-specific training'))
+_HANDOVER_FIELDS = (('asset_data', 'Asset data'), ('documentation', 'Documentation'))
+
+
+def _cell(value: Any) -> str:
+    """A value as one Markdown table cell."""
+    return ' '.join(str(value or '').split()).replace('|', '\\|') or '-'
+
+
+def _labelled(values: Dict[str, Any], fields: Sequence[Tuple[str, str]]) -> List[str]:
+    """``- **Label:** value`` lines for the set fields; lists are comma-joined."""
+    lines = []
+    for key, label in fields:
+        value = values.get(key)
+        if isinstance(value, list):
+            value = ', '.join(str(v) for v in value if v)
+        if value:
+            lines.append(f"- **{label}:** {value}")
+    return lines
+
+
+def _bullets(items: Iterable[Any]) -> List[str]:
+    return [f"- {item}" for item in items if item]
+
+
+def _table(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[str]:
+    lines = [f"| {' | '.join(header)} |", f"|{'|'.join('---' for _ in header)}|"]
+    lines += [f"| {' | '.join(_cell(value) for value in row)} |" for row in rows]
+    return lines
+
+
+def _project_section(analysis: Dict[str, Any]) -> List[str]:
+    info = analysis.get('project_info') or {}
+    lines = []
+    if info.get('name'):
+        lines.append(f"**{info['name']}**")
+    if info.get('description'):
+        lines += ([''] if lines else []) + [info['description']]
+    details = _labelled(info, _PROJECT_FIELDS)
+    if details:
+        lines += ([''] if lines else []) + details
+    return lines
+
+
+def _information_requirements_section(analysis: Dict[str, Any]) -> List[str]:
+    requirements = analysis.get('information_requirements') or {}
+    lines: List[str] = []
+    for key, title in _INFORMATION_REQUIREMENTS:
+        items = _bullets(requirements.get(key) or [])
+        if items:
+            lines += ([''] if lines else []) + [f"### {title}"] + items
+    return lines
+
+
+def _milestones_section(analysis: Dict[str, Any]) -> List[str]:
+    milestones = [m for m in analysis.get('delivery_milestones') or [] if m.get('phase') or m.get('description')]
+    if not milestones:
+        return []
+    return _table(('Phase', 'Description', 'Date'),
+                  ((m.get('phase'), m.get('description'), m.get('date')) for m in milestones))
+
+
+def _cde_section(analysis: Dict[str, Any]) -> List[str]:
+    cde = analysis.get('cde_requirements') or {}
+    lines = _labelled(cde, _CDE_FIELDS[:1])
+    if cde.get('workflow_states'):
+        lines.append(f"- **Workflow states:** {' → '.join(cde['workflow_states'])}")
+    return lines + _labelled(cde, _CDE_FIELDS[1:])
+
+
+def _roles_section(analysis: Dict[str, Any]) -> List[str]:
+    lines = []
+    for entry in analysis.get('roles_responsibilities') or []:
+        if not entry.get('role'):
+            continue
+        responsibilities = '; '.join(r for r in entry.get('responsibilities') or [] if r)
+        lines.append(f"- **{entry['role']}**" + (f": {responsibilities}" if responsibilities else ''))
+    return lines
+
+
+def _loin_section(analysis: Dict[str, Any]) -> List[str]:
+    entries = [e for e in analysis.get('loin_requirements') or [] if any(e.values())]
+    if not entries:
+        return []
+    return _table(('Stage', 'Discipline', 'LOD', 'LOI', 'Notes'),
+                  ((e.get('stage'), e.get('discipline'), e.get('lod'), e.get('loi'), e.get('notes'))
+                   for e in entries))
+
+
+def _protocols_section(analysis: Dict[str, Any]) -> List[str]:
+    protocols = analysis.get('information_protocols') or {}
+    lines = _labelled(protocols, _PROTOCOL_FIELDS)
+    if protocols.get('bcf_workflow_required'):
+        lines.append("- **BCF issue workflow:** required")
+    return lines
+
+
+def _handover_section(analysis: Dict[str, Any]) -> List[str]:
+    handover = analysis.get('handover_requirements') or {}
+    lines = ["- **COBie:** required"] if handover.get('cobie_required') else []
+    return lines + _labelled(handover, _HANDOVER_FIELDS)
+
+
+def _nested(key: str, fields: Sequence[Tuple[str, str]]):
+    return lambda analysis: _labelled(analysis.get(key) or {}, fields)
+
+
+def _listed(key: str):
+    return lambda analysis: _bullets(analysis.get(key) or [])
+
+
+# (heading, renderer) in document order
+_SECTIONS = (
+    ('Project Overview', _project_section),
+    ('BIM Objectives', _listed('bim_objectives')),
+    ('Key Information Requirements', _information_requirements_section),
+    ('Delivery Milestones', _milestones_section),
+    ('Standards and Protocols', _nested('standards_protocols', _STANDARDS_FIELDS)),
+    ('Software', _listed('software_requirements')),
+    ('Common Data Environment', _cde_section),
+    ('Roles and Responsibilities', _roles_section),
+    ('Level of Information Need', _loin_section),
+    ('Quality Assurance', _nested('quality_requirements', _QUALITY_FIELDS)),
+    ('Information Exchange Protocols', _protocols_section),
+    ('Information Security', _nested('security_requirements', _SECURITY_FIELDS)),
+    ('Training and Competency', _nested('training_requirements', _TRAINING_FIELDS)),
+    ('Asset Handover', _handover_section),
+    ('Risks', _listed('specific_risks')),
+    ('Other Requirements', _listed('other_requirements')),
+    ('Plain Language Questions', _listed('plain_language_questions')),
+)
+
+
+def render_summary(analysis: Optional[Dict[str, Any]]) -> str:
+    """Markdown summary of every non-empty section of ``analysis``."""
+    parts = []
+    for heading, render in _SECTIONS:
+        lines = render(analysis or {})
+        if lines:
+            parts.append(f"## {heading}\n" + '\n'.join(lines))
+    if not parts:
+        return "## EIR Analysis\nNo requirements were extracted from the document."
+    return '\n\n'.join(parts) + '\n'
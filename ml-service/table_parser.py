@@ -0,0 +1,285 @@
+"""
+Table Parser Module
+
+Deterministic parsing of the requirement tables in extracted EIR text.
+TextExtractor flattens PDF, DOCX and XLSX tables into ``[Table] ... [/Table]``
+blocks, one ``a | b | c`` line per row. Tables recognised by their header
+keywords are mapped straight into EirAnalysis entries, and removed from the
+text the LLM sees:
+
+- LOIN tables, one row per stage (and discipline) with LOD / LOI columns, or a
+  LOIN matrix with disciplines down the side, stages across the top and
+  "LOD 300 / LOI 3" style cells -> ``loin_requirements``
+- milestone tables (milestone or stage, plus a date column)
+  -> ``delivery_milestones``
+- role tables (role + responsibilities) and RACI matrices (tasks down the
+  side, roles across the top, R/A/C/I cells; a role's responsibilities are
+  the tasks it is Responsible or Accountable for) -> ``roles_responsibilities``
+
+A table split over pages continues the recognised table before it when a
+page break separates them, it has the same number of columns and its first
+row is not a header (it holds LOD / LOI values or dates, or no header
+keywords). Unrecognised tables stay in the text for the LLM.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from entity_extractor import DATE_RE
+from fuzzy_dedup import dedupe
+
+DEDUPE_THRESHOLD = 85  # fuzz.ratio from which an LLM milestone / role duplicates a table row
+
+TABLE_BLOCK_RE = re.compile(r'\[Table\]\n(.*?)\n\[/Table\]', re.DOTALL)
+_PAGE_MARKER_RE = re.compile(r'^--- Page \d+ ---$', re.MULTILINE)
+
+# Column kinds, tried in this order for every header cell
+_COLUMN_PATTERNS: List[Tuple[str, re.Pattern]] = [(kind, re.compile(pattern, re.IGNORECASE)) for kind, pattern in (
+    ('lod', r'\bLOD\b|\blevel of (?:detail|development)\b|\bgeometr|\bgraphical'),
+    ('loi', r'\bLOI\b|\blevel of information\b|\balphanumer|\bnon-graphical'),
+    ('date', r'\bdates?\b|\bdeadline|\bdue\b|\btarget\b|\bprogramme\b|\bcompletion\b|\bwhen\b'),
+    ('milestone', r'\bmilestones?\b|\bdata drops?\b|\bexchange|\bevents?\b|\bgates?\b'),
+    ('stage', r'\bstages?\b|\bphases?\b|\bRIBA\b|\bwork stage'),
+    ('discipline', r'\bdisciplines?\b|\btrades?\b|\bpackages?\b|\btask teams?\b|\belements?\b|\bsystems?\b'),
+    ('responsibilities', r'\bresponsibilit|\bduties\b|\btasks?\b|\bactivit'),
+    ('role', r'\broles?\b|\bparty\b|\bparties\b|\borgani[sz]ation|\bposition\b|\bappointment\b'),
+    ('notes', r'\bnotes?\b|\bcomments?\b|\bremarks?\b|\bpurpose\b'),
+    ('description', r'\bdescription\b|\bdetails?\b|\bdeliverables?\b|\binformation\b|\brequirements?\b|\bscope\b'),
+)]
+_LOIN_TITLE_RE = re.compile(r'\bLOIN\b|\blevel of information need\b', re.IGNORECASE)
+_STAGE_HEADER_RE = re.compile(r'\b(?:stage|RIBA|phase|gate)\s*[0-9A-G]\b|^\s*[0-7]\s*$', re.IGNORECASE)
+_LOD_RE = re.compile(r'\bLOD\s*[0-9]{1,3}\b|\bLOD\s*[A-G]\b', re.IGNORECASE)
+_LOI_RE = re.compile(r'\bLOI\s*[0-9]{1,3}\b|\bLOI\s*[A-G]\b', re.IGNORECASE)
+_RACI_CELL_RE = re.compile(r'^[RACIS](?:\s*[/,+]?\s*[RACIS])*$', re.IGNORECASE)
+_LIST_SPLIT_RE = re.compile(r'\s*(?:;|•|·)\s*')
+_EMPTY_CELLS = {'', '-', '–', '—', 'n/a', 'na', 'tbc', 'tbd', 'none'}
+
+
+class ParsedTables(NamedTuple):
+    """Entries mapped from recognised tables, the text without those tables, and tables parsed per kind."""
+    analysis: Dict[str, List[Dict[str, Any]]]
+    remaining_text: str
+    tables: Dict[str, int]
+
+
+def _cell(value: str) -> Optional[str]:
+    value = ' '.join(value.split())
+    return None if value.lower() in _EMPTY_CELLS else value
+
+
+def _rows(block: str) -> List[List[Optional[str]]]:
+    rows = []
+    for line in block.split('\n'):
+        if line.strip():
+            rows.append([_cell(cell) for cell in line.split(' | ')])
+    return rows
+
+
+def _column_kinds(header: List[Optional[str]]) -> Dict[str, int]:
+    """First column of each kind in a header row."""
+    kinds: Dict[str, int] = {}
+    for index, cell in enumerate(header):
+        if not cell:
+            continue
+        for kind, pattern in _COLUMN_PATTERNS:
+            if pattern.search(cell):
+                kinds.setdefault(kind, index)
+                break
+    return kinds
+
+
+def _looks_like_header(row: List[Optional[str]]) -> bool:
+    """Header keywords in some cell, and no LOD / LOI values or dates in any."""
+    cells = [cell for cell in row if cell]
+    if any(_LOD_RE.search(c) or _LOI_RE.search(c) or DATE_RE.search(c) for c in cells):
+        return False
+    return any(_STAGE_HEADER_RE.search(c) or any(p.search(c) for _, p in _COLUMN_PATTERNS) for c in cells)
+
+
+def _body_share(rows: List[List[Optional[str]]], pattern: re.Pattern) -> float:
+    """Share of the non-empty body cells (first column excluded) matching ``pattern``."""
+    cells = [cell for row in rows for cell in row[1:] if cell]
+    return sum(1 for cell in cells if pattern.search(cell)) / len(cells) if cells else 0.0
+
+
+class _Layout(NamedTuple):
+    """How a recognised table maps to entries: its kind, header row and column positions."""
+    kind: str          # 'loin', 'loin_matrix', 'milestones', 'roles', 'raci'
+    header: List[Optional[str]]
+    columns: Dict[str, int]
+
+
+def _layout(rows: List[List[Optional[str]]]) -> Optional[_Layout]:
+    """Recognise a table from its header row (and, for matrices, its body cells)."""
+    if len(rows) < 2 or len(rows[0]) < 2:
+        return None
+    header, body = rows[0], rows[1:]
+    columns = _column_kinds(header)
+    stage_headers = sum(1 for cell in header[1:] if cell and _STAGE_HEADER_RE.search(cell))
+    loin_cells = re.compile(f"{_LOD_RE.pattern}|{_LOI_RE.pattern}", re.IGNORECASE)
+    if stage_headers >= 2 and _body_share(body, loin_cells) >= 0.5:
+        return _Layout('loin_matrix', header, columns)
+    if 'stage' in columns and ('lod' in columns or 'loi' in columns or
+                               any(cell and _LOIN_TITLE_RE.search(cell) for cell in header)):
+        return _Layout('loin', header, columns)
+    if 'date' in columns and ('milestone' in columns or 'stage' in columns):
+        return _Layout('milestones', header, columns)
+    if len(header) >= 3 and _body_share(body, _RACI_CELL_RE) >= 0.6:
+        return _Layout('raci', header, columns)
+    if 'role' in columns and 'responsibilities' in columns:
+        return _Layout('roles', header, columns)
+    return None
+
+
+def _get(row: List[Optional[str]], columns: Dict[str, int], kind: str) -> Optional[str]:
+    index = columns.get(kind)
+    return row[index] if index is not None and index < len(row) else None
+
+
+def _loin_rows(layout: _Layout, rows: List[List[Optional[str]]]) -> List[Dict[str, Any]]:
+    columns = layout.columns
+    used = set(columns.values())
+    entries = []
+    for row in rows:
+        stage, discipline = _get(row, columns, 'stage'), _get(row, columns, 'discipline')
+        if not stage and not discipline:
+            continue
+        notes = [_get(row, columns, 'notes')] + [
+            f"{layout.header[i]}: {row[i]}" for i in range(len(row))
+            if i not in used and row[i] and i < len(layout.header) and layout.header[i]
+        ]
+        entries.append({
+            'stage': stage,
+            'discipline': discipline,
+            'lod': _get(row, columns, 'lod'),
+            'loi': _get(row, columns, 'loi'),
+            'notes': '; '.join(n for n in notes if n) or None,
+        })
+    return entries
+
+
+def _loin_matrix_rows(layout: _Layout, rows: List[List[Optional[str]]]) -> List[Dict[str, Any]]:
+    entries = []
+    for row in rows:
+        discipline = row[0]
+        for index in range(1, min(len(row), len(layout.header))):
+            stage, cell = layout.header[index], row[index]
+            if not stage or not cell:
+                continue
+            lod, loi = _LOD_RE.search(cell), _LOI_RE.search(cell)
+            rest = _cell(_LOI_RE.sub('', _LOD_RE.sub('', cell)).strip(' /,;-'))
+            entries.append({
+                'stage': stage,
+                'discipline': discipline,
+                'lod': lod.group().upper() if lod else None,
+                'loi': loi.group().upper() if loi else None,
+                'notes': None if (lod or loi) and not rest else rest,
+            })
+    return entries
+
+
+def _milestone_rows(layout: _Layout, rows: List[List[Optional[str]]]) -> List[Dict[str, Any]]:
+    columns = layout.columns
+    phase_kind = 'stage' if 'stage' in columns else 'milestone'
+    entries = []
+    for row in rows:
+        phase = _get(row, columns, phase_kind)
+        description = _get(row, columns, 'description') or (
+            _get(row, columns, 'milestone') if phase_kind == 'stage' else None
+        )
+        if not phase and not description:
+            continue
+        entries.append({'phase': phase or 'N/A', 'description': description or '',
+                        'date': _get(row, columns, 'date')})
+    return entries
+
+
+def _role_rows(layout: _Layout, rows: List[List[Optional[str]]]) -> List[Dict[str, Any]]:
+    entries = []
+    for row in rows:
+        role = _get(row, layout.columns, 'role')
+        if not role:
+            continue
+        duties = _get(row, layout.columns, 'responsibilities')
+        entries.append({'role': role, 'responsibilities': [d for d in _LIST_SPLIT_RE.split(duties or '') if d]})
+    return entries
+
+
+def _raci_rows(layout: _Layout, rows: List[List[Optional[str]]]) -> List[Dict[str, Any]]:
+    entries = []
+    for index in range(1, len(layout.header)):
+        role = layout.header[index]
+        if not role:
+            continue
+        tasks = [row[0] for row in rows
+                 if row[0] and index < len(row) and row[index] and re.search(r'[RA]', row[index], re.IGNORECASE)]
+        entries.append({'role': role, 'responsibilities': tasks})
+    return entries
+
+
+# Layout kind -> (EirAnalysis field, row mapper)
+_MAPPERS = {
+    'loin': ('loin_requirements', _loin_rows),
+    'loin_matrix': ('loin_requirements', _loin_matrix_rows),
+    'milestones': ('delivery_milestones', _milestone_rows),
+    'roles': ('roles_responsibilities', _role_rows),
+    'raci': ('roles_responsibilities', _raci_rows),
+}
+
+
+def parse_tables(text: str) -> ParsedTables:
+    """Map the recognised tables of ``text`` to EirAnalysis entries and cut them from the text."""
+    analysis: Dict[str, List[Dict[str, Any]]] = {}
+    tables: Dict[str, int] = {}
+    pieces: List[str] = []
+    position = 0
+    previous: Optional[_Layout] = None
+    for match in TABLE_BLOCK_RE.finditer(text):
+        rows = _rows(match.group(1))
+        if not rows:
+            continue
+        if (previous is not None and len(rows[0]) == len(previous.header)
+                and _PAGE_MARKER_RE.search(text, position, match.start()) and not _looks_like_header(rows[0])):
+            layout, body = previous, rows  # continuation of a table split over pages
+        else:
+            layout, body = _layout(rows), rows[1:]
+            if layout is None:
+                previous = None
+                continue
+            tables[layout.kind] = tables.get(layout.kind, 0) + 1
+        field, mapper = _MAPPERS[layout.kind]
+        entries = mapper(layout, body)
+        if layout.kind == 'raci' and layout is previous:
+            # A continued RACI matrix adds tasks to the roles of its first part
+            for entry, more in zip(analysis[field][-len(entries):], entries):
+                entry['responsibilities'].extend(more['responsibilities'])
+        else:
+            analysis.setdefault(field, []).extend(entries)
+        previous = layout
+        pieces.append(text[position:match.start()])
+        position = match.end()
+    pieces.append(text[position:])
+    return ParsedTables(analysis, ''.join(pieces) if tables else text, tables)
+
+
+def apply_tables(analysis: Dict[str, Any], parsed: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Put the table entries in front of the analysis lists (in place). LLM
+    entries are kept after them unless they repeat a table row: the same
+    stage and discipline for LOIN, a similar phase or role name otherwise.
+    """
+    loin = parsed.get('loin_requirements')
+    if loin:
+        keys = {((e.get('stage') or '').lower(), (e.get('discipline') or '').lower()) for e in loin}
+        analysis['loin_requirements'] = loin + [
+            e for e in analysis.get('loin_requirements') or []
+            if ((e.get('stage') or '').lower(), (e.get('discipline') or '').lower()) not in keys
+        ]
+    for field, key in (('delivery_milestones', 'phase'), ('roles_responsibilities', 'role')):
+        entries = parsed.get(field)
+        if entries:
+            def get_key(entry: Dict[str, Any], key: str = key) -> Any:
+                return entry.get(key)
+            analysis[field] = entries + dedupe(analysis.get(field) or [], DEDUPE_THRESHOLD,
+                                               key=get_key, existing=entries)
+    return analysis
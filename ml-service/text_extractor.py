@@ -1,13 +1,19 @@
 """
 Text Extractor Module
 
-Extracts text content from PDF and DOCX documents for EIR analysis.
+Extracts text content from PDF, DOCX and XLSX documents for EIR analysis.
 Supports chunking for large documents that exceed LLM context windows.
+Tables are flattened into ``[Table] ... [/Table]`` blocks (one
+``a | b | c`` line per row), which table_parser.py maps to LOIN, milestone
+and role entries. XLSX support (LOIN matrices, responsibility matrices)
+needs openpyxl.
 """
 
 import os
 import io
+import hashlib
 import logging
+import re
 from typing import List, Tuple, Optional
 from pathlib import Path
 
@@ -18,19 +24,56 @@ import pdfplumber
 from docx import Document as DocxDocument
 from docx.opc.exceptions import PackageNotFoundError
 
+# XLSX extraction (optional)
+try:
+    import openpyxl
+    HAS_OPENPYXL = True
+except ImportError:
+    openpyxl = None
+    HAS_OPENPYXL = False
+
 logger = logging.getLogger(__name__)
 
+# Page markers added during PDF extraction, and page footers from the source
+_PAGE_LINE_RE = re.compile(r'^\s*(?:--- Page \d+ ---|Page \d+(?: of \d+)?)\s*$', re.IGNORECASE | re.MULTILINE)
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?] )')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _is_anchor_line(line: str, target_chars: int) -> bool:
+    """
+    Whether a content-defined chunk may end after ``line``. Lines are picked
+    by a hash of their text, with probability proportional to their length,
+    so chunks average about ``target_chars``. Blank lines and page markers
+    never anchor: they do not identify a passage.
+    """
+    content = line.strip()
+    if not content or _PAGE_LINE_RE.match(content):
+        return False
+    digest = hashlib.blake2b(_WHITESPACE_RE.sub(' ', content).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64 < len(line) / target_chars
+
+
+def normalize_chunk_text(chunk: str) -> str:
+    """
+    Chunk text without page markers and with whitespace collapsed, for
+    content hashing: a passage that only moved to another page (or was
+    re-flowed) hashes the same.
+    """
+    return _WHITESPACE_RE.sub(' ', _PAGE_LINE_RE.sub('', chunk)).strip()
+
 
 class TextExtractor:
     """
-    Extracts text from PDF and DOCX files with support for:
+    Extracts text from PDF, DOCX and XLSX files with support for:
     - Multi-page PDFs
     - Tables in PDFs (converted to text)
     - DOCX paragraphs and tables
+    - XLSX worksheets (one table per sheet)
     - Text chunking for large documents
     """
 
-    SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc'}
+    SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.xlsx'}
 
     def __init__(self, max_chunk_tokens: int = 4000):
         """
@@ -71,6 +114,8 @@ class TextExtractor:
             return self.extract_from_pdf(file_bytes)
         elif ext in {'.docx', '.doc'}:
             return self.extract_from_docx(file_bytes)
+        elif ext == '.xlsx':
+            return self.extract_from_xlsx(file_bytes)
 
     def extract_from_pdf(self, file_bytes: bytes) -> Tuple[str, dict]:
         """
@@ -175,6 +220,61 @@ class TextExtractor:
 
         return full_text, metadata
 
+    def extract_from_xlsx(self, file_bytes: bytes) -> Tuple[str, dict]:
+        """
+        Extract text from an XLSX workbook: each non-empty worksheet becomes
+        one page holding its name and one table.
+
+        Args:
+            file_bytes: XLSX file content as bytes
+
+        Returns:
+            Tuple of (extracted_text, metadata)
+        """
+        if not HAS_OPENPYXL:
+            raise RuntimeError("XLSX extraction requires openpyxl (pip install openpyxl)")
+
+        text_parts = []
+        metadata = {
+            'pages': 0,
+            'tables_found': 0,
+            'extraction_method': 'openpyxl'
+        }
+
+        try:
+            workbook = openpyxl.load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+            try:
+                for sheet in workbook.worksheets:
+                    rows = [
+                        ['' if value is None else str(value) for value in row]
+                        for row in sheet.iter_rows(values_only=True)
+                    ]
+                    table_text = self._table_to_text(self._trim_columns(rows))
+                    if not table_text:
+                        continue
+                    metadata['pages'] += 1
+                    metadata['tables_found'] += 1
+                    text_parts.append(f"\n--- Page {metadata['pages']} ---\n")
+                    text_parts.append(f"Sheet: {sheet.title}")
+                    text_parts.append(f"\n[Table]\n{table_text}\n[/Table]")
+            finally:
+                workbook.close()
+        except Exception as e:
+            logger.error(f"XLSX extraction error: {e}")
+            raise RuntimeError(f"Failed to extract text from XLSX: {e}")
+
+        full_text = '\n'.join(text_parts)
+        metadata['word_count'] = len(full_text.split())
+        metadata['char_count'] = len(full_text)
+
+        return full_text, metadata
+
+    @staticmethod
+    def _trim_columns(rows: List[List[str]]) -> List[List[str]]:
+        """Drop the empty columns a worksheet's used range carries on the right."""
+        width = max((i + 1 for row in rows for i, cell in enumerate(row) if cell.strip()), default=0)
+        return [row[:width] for row in rows]
+
     def _table_to_text(self, table: List[List[str]]) -> str:
         """
         Convert a table (list of rows) to formatted text.
@@ -193,10 +293,11 @@ class TextExtractor:
         if not table:
             return ""
 
-        # Format as simple text table
+        # Format as simple text table, one line per row (line breaks inside
+        # cells are joined so table_parser can read rows back)
         lines = []
         for row in table:
-            cells = [str(cell).strip() if cell else '' for cell in row]
+            cells = [' '.join(str(cell).split()) if cell else '' for cell in row]
             lines.append(' | '.join(cells))
 
         return '\n'.join(lines)
@@ -252,6 +353,58 @@ class TextExtractor:
 
         return chunks
 
+    def chunk_text_content_defined(self, text: str) -> List[str]:
+        """
+        Split text into chunks whose boundaries depend only on local content.
+
+        A line ends a chunk when a hash of its text falls under a threshold
+        (once the chunk has a minimum size), or when the next line would
+        exceed the token limit. An insertion or edit therefore only moves the
+        boundaries around it: unchanged passages of a revised document land
+        in byte-identical chunks, which the chunk analysis cache can reuse.
+        Chunks do not overlap.
+
+        Args:
+            text: Full text to chunk
+
+        Returns:
+            List of text chunks
+        """
+        max_chars = self.max_chunk_tokens * self.chars_per_token
+        if len(text) <= max_chars:
+            return [text]
+        min_chars = max_chars // 8
+        target_chars = max_chars * 2 // 5
+
+        chunks = []
+        current: List[str] = []
+        size = 0
+        for line in self._content_units(text, max_chars // 2):
+            if current and size + len(line) > max_chars:
+                chunks.append(''.join(current).strip())
+                current, size = [], 0
+            current.append(line)
+            size += len(line)
+            if size >= min_chars and _is_anchor_line(line, target_chars):
+                chunks.append(''.join(current).strip())
+                current, size = [], 0
+        if current:
+            chunks.append(''.join(current).strip())
+        return [chunk for chunk in chunks if chunk]
+
+    @staticmethod
+    def _content_units(text: str, max_unit_chars: int) -> List[str]:
+        """Lines of ``text`` (with newlines); overlong lines split at sentences, then hard."""
+        units = []
+        for line in text.splitlines(keepends=True):
+            if len(line) <= max_unit_chars:
+                units.append(line)
+                continue
+            for sentence in _SENTENCE_END_RE.split(line):
+                for start in range(0, len(sentence), max_unit_chars):
+                    units.append(sentence[start:start + max_unit_chars])
+        return units
+
     def estimate_tokens(self, text: str) -> int:
         """
         Estimate the number of tokens in text.
@@ -0,0 +1,57 @@
+"""
+TTL Cache Module
+
+Small thread-safe LRU cache with per-entry expiry, for results that are
+produced outside the calling function (e.g. background refinements) and so
+cannot use functools.lru_cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """LRU cache whose entries expire ``ttl_s`` seconds after insertion."""
+
+    def __init__(self, maxsize: int = 256, ttl_s: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove and return a value (None if missing)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
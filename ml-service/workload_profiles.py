@@ -0,0 +1,200 @@
+"""
+Workload Profiles Module
+
+Maps each generation workload (EIR chunk analysis, summary, field suggestion,
+questions, EIR-authoring field, ...) to a model and Ollama runtime options,
+declared in ``data/workload_profiles.json``. The file is hot-reloaded when it
+changes, so throughput can be tuned per workload without code changes.
+
+Resolution order for every option: explicit caller override > workload
+profile > ``defaults`` section of the file > built-in fallback.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_PATH = Path(__file__).parent / 'data' / 'workload_profiles.json'
+
+# Keys accepted inside a profile's "options" block (forwarded to Ollama)
+OLLAMA_OPTION_KEYS = {
+    'temperature', 'num_predict', 'num_ctx', 'top_p', 'top_k', 'min_p',
+    'repeat_penalty', 'seed', 'num_batch', 'num_thread', 'num_gpu',
+}
+
+
+class WorkloadProfile:
+    """Effective (merged) settings for one workload."""
+
+    def __init__(self, name: str, model: Optional[str], thinking: Optional[bool],
+                 keep_alive: Optional[str], options: Dict[str, Any]):
+        self.name = name
+        self.model = model
+        self.thinking = thinking
+        self.keep_alive = keep_alive
+        self.options = options
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'thinking': self.thinking,
+            'keep_alive': self.keep_alive,
+            'options': dict(self.options),
+        }
+
+
+class WorkloadProfileRegistry:
+    """
+    Loads workload profiles from JSON and reloads them when the file changes.
+
+    Configuration:
+        - OLLAMA_WORKLOAD_PROFILES: path to the profile file
+          (default: data/workload_profiles.json)
+        - OLLAMA_PROFILE_RELOAD_INTERVAL: seconds between mtime checks (default: 2)
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.path = Path(path or os.getenv('OLLAMA_WORKLOAD_PROFILES', '').strip() or DEFAULT_PROFILES_PATH)
+        _interval_str = os.getenv('OLLAMA_PROFILE_RELOAD_INTERVAL', '').strip()
+        self.reload_interval = reload_interval if reload_interval is not None else (
+            float(_interval_str) if _interval_str else 2.0
+        )
+        self._lock = threading.Lock()
+        self._raw: Dict[str, Any] = {}
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        """(Re)load the profile file, keeping the last good config on error."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            logger.warning(f"Workload profile file not found: {self.path}; using built-in defaults")
+            self._raw = {}
+            self._mtime = None
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self._validate(raw)
+        except (OSError, ValueError) as e:
+            logger.error(f"Invalid workload profile file {self.path}: {e}; keeping previous profiles")
+            self._mtime = mtime
+            return
+
+        self._raw = raw
+        self._mtime = mtime
+        get_metrics().inc('workload_profile_reloads_total')
+        logger.info(f"Loaded {len(raw.get('profiles', {}))} workload profiles from {self.path}")
+
+    @staticmethod
+    def _validate(raw: Any) -> None:
+        """Raise ValueError unless ``raw`` has the shape ``get()`` relies on."""
+        if not isinstance(raw, dict):
+            raise ValueError("the file must contain a JSON object")
+        profiles = raw.get('profiles') or {}
+        if not isinstance(profiles, dict):
+            raise ValueError("'profiles' must be an object")
+        sections = [('defaults', raw.get('defaults'))]
+        sections += [(f"profiles.{name}", profile) for name, profile in profiles.items()]
+        for where, section in sections:
+            if section is None:
+                continue
+            if not isinstance(section, dict):
+                raise ValueError(f"'{where}' must be an object")
+            if not isinstance(section.get('options', {}), (dict, type(None))):
+                raise ValueError(f"'{where}.options' must be an object")
+
+    def _maybe_reload(self) -> None:
+        now = time.time()
+        if now - self._last_check < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.reload_interval:
+                return
+            self._last_check = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except OSError:
+                mtime = None
+            if mtime != self._mtime:
+                self._load()
+
+    def get(self, workload: Optional[str]) -> WorkloadProfile:
+        """
+        Return the effective profile for a workload.
+
+        Unknown or empty workload names resolve to the ``defaults`` section.
+        """
+        self._maybe_reload()
+        raw = self._raw
+        defaults = raw.get('defaults', {}) or {}
+        profile = (raw.get('profiles', {}) or {}).get(workload or '', {}) or {}
+
+        options = {}
+        for source in (defaults.get('options') or {}, profile.get('options') or {}):
+            for key, value in source.items():
+                if key not in OLLAMA_OPTION_KEYS:
+                    logger.debug(f"Ignoring unknown Ollama option '{key}' in workload '{workload}'")
+                    continue
+                options[key] = value
+        options = {k: v for k, v in options.items() if v is not None}
+
+        def _pick(key: str) -> Any:
+            if profile.get(key) is not None:
+                return profile[key]
+            return defaults.get(key)
+
+        return WorkloadProfile(
+            name=workload or 'default',
+            model=_pick('model'),
+            thinking=_pick('thinking'),
+            keep_alive=_pick('keep_alive'),
+            options=options,
+        )
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """Return a top-level section of the profile file (e.g. 'routing')."""
+        self._maybe_reload()
+        value = self._raw.get(name)
+        return value if isinstance(value, dict) else {}
+
+    def names(self) -> List[str]:
+        """Names of all declared profiles."""
+        self._maybe_reload()
+        return sorted((self._raw.get('profiles', {}) or {}).keys())
+
+    def describe(self) -> Dict[str, Any]:
+        """Effective settings for every profile (published via /metrics)."""
+        return {
+            'source': str(self.path),
+            'version': self._raw.get('version'),
+            'loaded_mtime': self._mtime,
+            'profiles': {name: self.get(name).to_dict() for name in self.names()},
+        }
+
+
+# Module-level singleton
+_registry: Optional[WorkloadProfileRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_workload_profiles() -> WorkloadProfileRegistry:
+    """Get or create the singleton WorkloadProfileRegistry instance."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = WorkloadProfileRegistry()
+                get_metrics().register_collector('workload_profiles', _registry.describe)
+    return _registry
@@ -258,6 +258,7 @@ db.exec(`
     extracted_text TEXT,
     analysis_json TEXT,
     summary_markdown TEXT,
+    field_values TEXT,
     status TEXT DEFAULT 'uploaded' CHECK(status IN ('uploaded', 'extracting', 'extracted', 'analyzing', 'analyzed', 'error')),
     error_message TEXT,
     created_at TEXT NOT NULL,
@@ -404,6 +405,17 @@ try {
   console.warn("Could not create share_token index:", err.message);
 }
 
+// Migration: add field_values to client_documents (BEP fields derived from the analysis without the LLM)
+const clientDocumentColumns = db.prepare("PRAGMA table_info(client_documents)").all();
+if (!clientDocumentColumns.some(col => col.name === 'field_values')) {
+  try {
+    db.exec('ALTER TABLE client_documents ADD COLUMN field_values TEXT');
+    console.log('Migration: added field_values column to client_documents');
+  } catch (err) {
+    console.error('Could not add field_values to client_documents:', err.message);
+  }
+}
+
 // Migration: Add draft_id columns if they don't exist (for existing databases)
 const stepColumns = db.prepare("PRAGMA table_info(bep_step_configs)").all();
 const stepHasDraftId = stepColumns.some(col => col.name === 'draft_id');
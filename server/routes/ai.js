@@ -11,6 +11,7 @@ const fs = require('fs');
 const path = require('path');
 const router = express.Router();
 const guidedAiQuestionsCache = require('../services/guidedAiQuestionsCache');
+const { attachDeadlineHeader, deadlineHeaders } = require('../services/mlRequestDeadline');
 
 // Configuration for ML service
 const ML_SERVICE_TIMEOUT = 30000; // 30 seconds
@@ -35,16 +36,28 @@ function getMLServiceURL() {
   return process.env.ML_SERVICE_URL || 'http://localhost:8000';
 }
 
+/**
+ * Degradation flags of an ML response (set when it was generated with reduced
+ * settings under load), passed through so the UI can offer to refine later.
+ */
+function degradationFields(data) {
+  return {
+    degraded: Boolean(data.degraded),
+    degradation_level: data.degradation_level || 0,
+    degradation_actions: data.degradation_actions || []
+  };
+}
+
 // Create axios instance with dynamic config
 function getMLClient() {
   const baseURL = getMLServiceURL();
-  return axios.create({
+  return attachDeadlineHeader(axios.create({
     baseURL,
     timeout: ML_SERVICE_TIMEOUT,
     headers: {
       'Content-Type': 'application/json'
     }
-  });
+  }));
 }
 
 /**
@@ -142,7 +155,8 @@ router.post('/generate', async (req, res) => {
     res.json({
       success: true,
       text: response.data.text,
-      prompt_used: response.data.prompt_used
+      prompt_used: response.data.prompt_used,
+      ...degradationFields(response.data)
     });
 
   } catch (error) {
@@ -214,7 +228,8 @@ router.post('/suggest', async (req, res) => {
     res.json({
       success: true,
       text: response.data.text,
-      prompt_used: response.data.prompt_used
+      prompt_used: response.data.prompt_used,
+      ...degradationFields(response.data)
     });
 
   } catch (error) {
@@ -284,14 +299,18 @@ router.get('/field-types', (req, res) => {
  *
  * POST /api/ai/suggest-from-eir
  * Body: {
- *   analysis_json: object,
+ *   analysis_id?: string,     // id returned with the analysis; 404 once expired
+ *   analysis_json?: object,   // required without analysis_id
  *   field_type: string,
  *   partial_text?: string
  * }
+ * The response carries analysis_id, so later requests can send it instead
+ * of the whole analysis.
  */
 router.post('/suggest-from-eir', async (req, res) => {
   try {
     const {
+      analysis_id,
       analysis_json,
       field_type,
       partial_text = '',
@@ -299,10 +318,10 @@ router.post('/suggest-from-eir', async (req, res) => {
     } = req.body;
 
     // Validate request
-    if (!analysis_json || typeof analysis_json !== 'object') {
+    if (analysis_id ? typeof analysis_id !== 'string' : (!analysis_json || typeof analysis_json !== 'object')) {
       return res.status(400).json({
         error: 'Invalid request',
-        message: 'analysis_json is required and must be an object'
+        message: 'analysis_id (string) or analysis_json (object) is required'
       });
     }
 
@@ -318,7 +337,7 @@ router.post('/suggest-from-eir', async (req, res) => {
     // Call ML service
     const mlClient = getMLClient();
     const response = await mlClient.post('/suggest-from-eir', {
-      analysis_json,
+      ...(analysis_id ? { analysis_id } : { analysis_json }),
       field_type,
       partial_text,
       ...(model && { model })
@@ -330,7 +349,9 @@ router.post('/suggest-from-eir', async (req, res) => {
       success: true,
       suggestion: response.data.suggestion,
       field_type: response.data.field_type,
-      model: response.data.model
+      analysis_id: response.data.analysis_id,
+      model: response.data.model,
+      ...degradationFields(response.data)
     });
 
   } catch (error) {
@@ -405,7 +426,8 @@ router.post('/suggest-eir-field', async (req, res) => {
       success: true,
       suggestion: response.data.suggestion,
       field_name: response.data.field_name,
-      model: response.data.model
+      model: response.data.model,
+      ...degradationFields(response.data)
     });
   } catch (error) {
     console.error('EIR field suggestion error:', error.message);
@@ -604,7 +626,8 @@ router.post('/generate-from-answers', async (req, res) => {
       text: response.data.text,
       questions_answered: response.data.questions_answered,
       questions_total: response.data.questions_total,
-      model: response.data.model
+      model: response.data.model,
+      ...degradationFields(response.data)
     });
 
   } catch (error) {
@@ -650,16 +673,17 @@ router.post('/generate-from-answers', async (req, res) => {
  * Stream token-by-token suggestions for a BEP field via SSE
  *
  * POST /api/ai/suggest-stream
- * Body: { field_type, partial_text?, max_length?, model? }
+ * Body: { field_type, partial_text?, max_length?, model?, mode? }
  *
  * Emits server-sent events:
  *   data: {"type":"stage","message":"Parsing ISO 19650 requirements…"}
  *   data: {"type":"token","text":"The "}
  *   data: {"type":"done","fullText":"The complete cleaned text…"}
+ *   data: {"type":"replace","fullText":"Refined text…"}   (mode "two_tier" only)
  *   data: {"type":"error","message":"..."}
  */
 router.post('/suggest-stream', async (req, res) => {
-  const { field_type, partial_text = '', max_length = 200, model } = req.body;
+  const { field_type, partial_text = '', max_length = 200, model, mode } = req.body;
 
   if (!field_type || typeof field_type !== 'string') {
     return res.status(400).json({ error: 'field_type is required and must be a string' });
@@ -681,9 +705,11 @@ router.post('/suggest-stream', async (req, res) => {
         field_type,
         partial_text,
         max_length: Math.min(Math.max(max_length, 50), 1000),
-        ...(model && { model })
+        ...(model && { model }),
+        ...(mode === 'two_tier' && { mode })
       },
       responseType: 'stream',
+      headers: deadlineHeaders(120000),
       timeout: 120000
     });
 
@@ -710,6 +736,99 @@ router.post('/suggest-stream', async (req, res) => {
   });
 });
 
+/**
+ * Stream contextual questions for a BEP field via SSE
+ *
+ * POST /api/ai/generate-questions-stream
+ * Body: same as /generate-questions
+ *
+ * Emits server-sent events:
+ *   data: {"type":"question","question":{"id":"q1","text":"...","hint":"..."}}
+ *   data: {"type":"done","questions":[...],"field_type":"..."}
+ *   data: {"type":"error","message":"..."}
+ * Cached questions are replayed immediately; fresh results populate the cache.
+ */
+router.post('/generate-questions-stream', async (req, res) => {
+  const { field_type, field_label, field_context, model } = req.body;
+
+  if (!field_type || typeof field_type !== 'string') {
+    return res.status(400).json({ error: 'field_type is required and must be a string' });
+  }
+  if (!field_label || typeof field_label !== 'string') {
+    return res.status(400).json({ error: 'field_label is required and must be a string' });
+  }
+
+  res.setHeader('Content-Type', 'text/event-stream');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('Connection', 'keep-alive');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  const stepName = field_context && field_context.step_name != null ? field_context.step_name : '';
+  const cached = guidedAiQuestionsCache.get(field_type, stepName);
+  if (cached) {
+    for (const question of cached.questions) {
+      res.write(`data: ${JSON.stringify({ type: 'question', question })}\n\n`);
+    }
+    res.write(`data: ${JSON.stringify({ type: 'done', questions: cached.questions, field_type: cached.field_type })}\n\n`);
+    return res.end();
+  }
+
+  let upstream = null;
+  let buffer = '';
+  try {
+    const mlServiceURL = getMLServiceURL();
+    const upstreamRes = await axios({
+      method: 'post',
+      url: `${mlServiceURL}/generate-questions-stream`,
+      data: {
+        field_type,
+        field_label,
+        field_context: field_context || null,
+        ...(model && { model })
+      },
+      responseType: 'stream',
+      headers: deadlineHeaders(90000),
+      timeout: 90000
+    });
+
+    upstream = upstreamRes.data;
+    upstream.on('data', (chunk) => {
+      res.write(chunk);
+      // Cache the final list like /generate-questions does
+      buffer += chunk.toString('utf8');
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const line = buffer.slice(0, boundary).trim();
+        buffer = buffer.slice(boundary + 2);
+        if (!line.startsWith('data: ')) continue;
+        try {
+          const event = JSON.parse(line.slice(6));
+          if (event.type === 'done' && event.questions?.length) {
+            guidedAiQuestionsCache.set(field_type, stepName, event.questions, event.field_type);
+          }
+        } catch {
+          // not a complete JSON event; ignore
+        }
+      }
+    });
+    upstream.on('end', () => res.end());
+    upstream.on('error', (err) => {
+      console.error('generate-questions-stream pipe error:', err.message);
+      res.write(`data: ${JSON.stringify({ type: 'error', message: 'Stream interrupted' })}\n\n`);
+      res.end();
+    });
+  } catch (err) {
+    console.error('generate-questions-stream proxy error:', err.message);
+    res.write(`data: ${JSON.stringify({ type: 'error', message: err.message })}\n\n`);
+    res.end();
+  }
+
+  req.on('close', () => {
+    if (upstream) upstream.destroy();
+  });
+});
+
 /**
  * Stream BEP content generation from guided answers via SSE
  *
@@ -753,6 +872,7 @@ router.post('/generate-from-answers-stream', async (req, res) => {
         ...(model && { model })
       },
       responseType: 'stream',
+      headers: deadlineHeaders(120000),
       timeout: 120000
     });
 
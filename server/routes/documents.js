@@ -10,6 +10,8 @@ const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
 const axios = require('axios');
+const { deadlineHeaders } = require('../services/mlRequestDeadline');
+const { runEirAnalysisJob, waitForPolishedSummary } = require('../services/mlAnalysisJobs');
 const { createId } = require('@paralleldrive/cuid2');
 const db = require('../database');
 const { authenticateToken } = require('../middleware/authMiddleware');
@@ -25,7 +27,8 @@ const MAX_FILE_SIZE = 20 * 1024 * 1024; // 20MB
 const ALLOWED_MIME_TYPES = [
   'application/pdf',
   'application/vnd.openxmlformats-officedocument.wordprocessingml.document', // .docx
-  'application/msword' // .doc (legacy)
+  'application/msword', // .doc (legacy)
+  'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' // .xlsx (LOIN / responsibility matrices)
 ];
 
 // Ensure upload directory exists
@@ -50,6 +53,26 @@ function getMLServiceURL() {
   return process.env.ML_SERVICE_URL || 'http://localhost:8000';
 }
 
+/**
+ * Replace a document's template summary with the LLM-polished one once the
+ * ML service has written it (metadata.summary_polish === 'pending').
+ * Runs in the background; the update is skipped if the document was
+ * re-analysed in the meantime.
+ */
+function savePolishedSummary(id, metadata, templateSummary) {
+  if (metadata?.summary_polish !== 'pending' || !metadata.analysis_id) return;
+  waitForPolishedSummary(getMLServiceURL(), metadata.analysis_id)
+    .then((polish) => {
+      if (!polish) return;
+      db.prepare(`
+        UPDATE client_documents
+        SET summary_markdown = ?, updated_at = ?
+        WHERE id = ? AND summary_markdown = ?
+      `).run(polish.summary_markdown, new Date().toISOString(), id, templateSummary);
+    })
+    .catch((err) => console.error(`[${id}] Polished summary not saved:`, err.message));
+}
+
 // Configure multer storage
 // Note: We upload to a common directory first because req.body may not be
 // available in the destination callback when using multipart/form-data
@@ -73,7 +96,7 @@ const fileFilter = (req, file, cb) => {
   if (ALLOWED_MIME_TYPES.includes(file.mimetype)) {
     cb(null, true);
   } else {
-    cb(new Error(`File type not allowed. Allowed types: PDF, DOCX`), false);
+    cb(new Error(`File type not allowed. Allowed types: PDF, DOCX, XLSX`), false);
   }
 };
 
@@ -224,7 +247,8 @@ router.get('/', async (req, res) => {
     // Parse JSON fields
     const parsedDocs = documents.map(doc => ({
       ...doc,
-      analysisJson: doc.analysis_json ? JSON.parse(doc.analysis_json) : null
+      analysisJson: doc.analysis_json ? JSON.parse(doc.analysis_json) : null,
+      fieldValues: doc.field_values ? JSON.parse(doc.field_values) : null
     }));
 
     res.json({
@@ -266,7 +290,8 @@ router.get('/:id', async (req, res) => {
       success: true,
       document: {
         ...document,
-        analysisJson: document.analysis_json ? JSON.parse(document.analysis_json) : null
+        analysisJson: document.analysis_json ? JSON.parse(document.analysis_json) : null,
+        fieldValues: document.field_values ? JSON.parse(document.field_values) : null
       }
     });
 
@@ -361,13 +386,13 @@ router.post('/:id/extract', async (req, res) => {
 
       const mlServiceUrl = getMLServiceURL();
       const response = await axios.post(`${mlServiceUrl}/extract-text`, formData, {
-        headers: formData.getHeaders(),
+        headers: { ...formData.getHeaders(), ...deadlineHeaders(120000) },
         timeout: 120000, // 2 minutes
         maxContentLength: Infinity,
         maxBodyLength: Infinity
       });
 
-      const { text, pages, word_count } = response.data;
+      const { text, pages, word_count, page_scores } = response.data;
 
       // Update document with extracted text
       db.prepare(`
@@ -382,7 +407,9 @@ router.post('/:id/extract', async (req, res) => {
         data: {
           textLength: text.length,
           pages,
-          wordCount: word_count
+          wordCount: word_count,
+          // Glossary term density per page, for page triage
+          pageScores: page_scores || []
         }
       });
 
@@ -416,6 +443,7 @@ router.post('/:id/extract', async (req, res) => {
 /**
  * POST /api/documents/:id/analyze
  * Analyze document with AI
+ * Body: { depth?: 'quick' | 'standard' | 'deep' }
  */
 router.post('/:id/analyze', async (req, res) => {
   try {
@@ -448,33 +476,37 @@ router.post('/:id/analyze', async (req, res) => {
 
     try {
       const mlServiceUrl = getMLServiceURL();
-      const response = await axios.post(`${mlServiceUrl}/analyze-eir`, {
+      const { analysis_json, summary_markdown, field_values, analysis_id, metadata } = await runEirAnalysisJob(mlServiceUrl, {
         text: document.extracted_text,
-        filename: document.original_filename
+        filename: document.original_filename,
+        depth: req.body?.depth
       }, {
-        timeout: 600000 // 10 minutes for AI analysis (match frontend)
+        timeoutMs: 600000 // 10 minutes for AI analysis (match frontend)
       });
 
-      const { analysis_json, summary_markdown } = response.data;
-
       // Update document with analysis
       db.prepare(`
         UPDATE client_documents
-        SET analysis_json = ?, summary_markdown = ?, status = 'analyzed', updated_at = ?
+        SET analysis_json = ?, summary_markdown = ?, field_values = ?, status = 'analyzed', updated_at = ?
         WHERE id = ?
       `).run(
         JSON.stringify(analysis_json),
         summary_markdown,
+        JSON.stringify(field_values || {}),
         new Date().toISOString(),
         id
       );
+      savePolishedSummary(id, metadata, summary_markdown);
 
       res.json({
         success: true,
         message: 'Document analyzed successfully',
         data: {
           analysisJson: analysis_json,
-          summaryMarkdown: summary_markdown
+          summaryMarkdown: summary_markdown,
+          fieldValues: field_values,
+          analysisId: analysis_id,
+          analysisMetadata: metadata
         }
       });
 
@@ -505,9 +537,160 @@ router.post('/:id/analyze', async (req, res) => {
   }
 });
 
+/**
+ * POST /api/documents/:id/analyze-stream
+ * Analyze document with AI, streaming partial results (SSE)
+ * Body: { depth?: 'quick' | 'standard' | 'deep' }
+ *
+ * Relays the ML service events:
+ *   data: {"type":"stage","stage":"analyzing","chunks_done":0,"chunks_total":4}
+ *   data: {"type":"partial","chunks_done":1,"chunks_total":4,"analysis_json":{...}}
+ *   data: {"type":"done","analysis_json":{...},"summary_markdown":"...","field_values":{...},"metadata":{...}}
+ *   data: {"type":"summary","analysis_id":"...","summary_markdown":"..."}  (LLM-polished)
+ *   data: {"type":"error","message":"..."}
+ * The final result is saved to the document like /analyze, and so is the
+ * polished summary, even if the client leaves after "done".
+ */
+router.post('/:id/analyze-stream', async (req, res) => {
+  const { id } = req.params;
+  const document = db.prepare(`
+    SELECT * FROM client_documents WHERE id = ? AND user_id = ?
+  `).get(id, req.authUserId);
+
+  if (!document) {
+    return res.status(404).json({ success: false, message: 'Document not found' });
+  }
+  if (!document.extracted_text) {
+    return res.status(400).json({
+      success: false,
+      message: 'Document text not extracted yet. Call /extract first.'
+    });
+  }
+
+  db.prepare(`
+    UPDATE client_documents SET status = 'analyzing', updated_at = ? WHERE id = ?
+  `).run(new Date().toISOString(), id);
+
+  const setError = (message) => {
+    db.prepare(`
+      UPDATE client_documents
+      SET status = 'error', error_message = ?, updated_at = ?
+      WHERE id = ?
+    `).run(message, new Date().toISOString(), id);
+  };
+
+  res.setHeader('Content-Type', 'text/event-stream');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.setHeader('Connection', 'keep-alive');
+  res.setHeader('X-Accel-Buffering', 'no');
+  res.flushHeaders();
+
+  let upstream = null;
+  let completed = false;
+  let buffer = '';
+
+  // Watch the relayed events for the final result so it can be persisted
+  const handleEvent = (raw) => {
+    const line = raw.split('\n').find((l) => l.startsWith('data: '));
+    if (!line) return;
+    let event;
+    try {
+      event = JSON.parse(line.slice(6));
+    } catch {
+      return;
+    }
+    if (event.type === 'done') {
+      completed = true;
+      db.prepare(`
+        UPDATE client_documents
+        SET analysis_json = ?, summary_markdown = ?, field_values = ?, status = 'analyzed', updated_at = ?
+        WHERE id = ?
+      `).run(
+        JSON.stringify(event.analysis_json),
+        event.summary_markdown,
+        JSON.stringify(event.field_values || {}),
+        new Date().toISOString(),
+        id
+      );
+      savePolishedSummary(id, event.metadata, event.summary_markdown);
+    } else if (event.type === 'error') {
+      completed = true;
+      setError(event.message);
+    }
+  };
+
+  // res 'close' fires on completion and on client disconnect alike
+  res.on('close', () => {
+    if (upstream) upstream.destroy();
+    if (!completed) setError('Analysis stream closed before completion');
+  });
+
+  try {
+    const upstreamRes = await axios({
+      method: 'post',
+      url: `${getMLServiceURL()}/analyze-eir-stream`,
+      data: {
+        text: document.extracted_text,
+        filename: document.original_filename,
+        depth: req.body?.depth
+      },
+      responseType: 'stream',
+      headers: deadlineHeaders(600000),
+      timeout: 600000,
+      maxBodyLength: Infinity
+    });
+
+    upstream = upstreamRes.data;
+    upstream.on('data', (chunk) => {
+      res.write(chunk);
+      buffer += chunk.toString('utf8');
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        handleEvent(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+      }
+    });
+    upstream.on('end', () => res.end());
+    upstream.on('error', (err) => {
+      console.error('analyze-stream pipe error:', err.message);
+      res.write(`data: ${JSON.stringify({ type: 'error', message: 'Stream interrupted' })}\n\n`);
+      res.end();
+    });
+  } catch (err) {
+    console.error('analyze-stream proxy error:', err.message);
+    completed = true;
+    setError(err.message);
+    res.write(`data: ${JSON.stringify({ type: 'error', message: err.message })}\n\n`);
+    res.end();
+  }
+});
+
+/**
+ * GET /api/documents/analysis/:analysisId/summary
+ * State of the background LLM polish of an analysis summary
+ * ({ status: 'pending' | 'completed' | 'failed', summary_markdown, model, ... })
+ */
+router.get('/analysis/:analysisId/summary', async (req, res) => {
+  try {
+    const response = await axios.get(
+      `${getMLServiceURL()}/analysis/${encodeURIComponent(req.params.analysisId)}/summary`,
+      { headers: deadlineHeaders(30000), timeout: 30000 }
+    );
+    res.json({ success: true, data: response.data });
+  } catch (error) {
+    const status = error.response?.status === 404 ? 404 : 503;
+    res.status(status).json({
+      success: false,
+      message: status === 404 ? 'No polished summary for this analysis' : 'Summary lookup failed',
+      error: error.response?.data?.detail || error.message
+    });
+  }
+});
+
 /**
  * POST /api/documents/:id/extract-and-analyze
  * Combined endpoint: extract text and analyze in one call
+ * Body: { depth?: 'quick' | 'standard' | 'deep' }
  */
 router.post('/:id/extract-and-analyze', async (req, res) => {
   const { id } = req.params;
@@ -547,7 +730,7 @@ router.post('/:id/extract-and-analyze', async (req, res) => {
         });
 
         const extractResponse = await axios.post(`${mlServiceUrl}/extract-text`, formData, {
-          headers: formData.getHeaders(),
+          headers: { ...formData.getHeaders(), ...deadlineHeaders(180000) },
           timeout: 180000, // Increased to 3 minutes
           maxContentLength: Infinity,
           maxBodyLength: Infinity
@@ -596,37 +779,44 @@ router.post('/:id/extract-and-analyze', async (req, res) => {
     `).run(new Date().toISOString(), id);
 
     try {
-      const analyzeResponse = await axios.post(`${mlServiceUrl}/analyze-eir`, {
+      const { analysis_json, summary_markdown, field_values, analysis_id, metadata } = await runEirAnalysisJob(mlServiceUrl, {
         text: extractedText,
-        filename: document.original_filename
+        filename: document.original_filename,
+        depth: req.body?.depth
       }, {
-        timeout: 600000, // Increased to 10 minutes to match frontend
-        maxContentLength: Infinity,
-        maxBodyLength: Infinity
+        timeoutMs: 600000, // 10 minutes to match frontend
+        onProgress: (progress) => {
+          if (progress?.chunks_total) {
+            console.log(`[${id}] Analysis ${progress.stage}: ${progress.chunks_done}/${progress.chunks_total} chunks`);
+          }
+        }
       });
 
-      const { analysis_json, summary_markdown } = analyzeResponse.data;
-
       console.log(`[${id}] Analysis completed successfully`);
 
       // Update document with analysis
       db.prepare(`
         UPDATE client_documents
-        SET analysis_json = ?, summary_markdown = ?, status = 'analyzed', updated_at = ?
+        SET analysis_json = ?, summary_markdown = ?, field_values = ?, status = 'analyzed', updated_at = ?
         WHERE id = ?
       `).run(
         JSON.stringify(analysis_json),
         summary_markdown,
+        JSON.stringify(field_values || {}),
         new Date().toISOString(),
         id
       );
+      savePolishedSummary(id, metadata, summary_markdown);
 
       res.json({
         success: true,
         message: 'Document extracted and analyzed successfully',
         data: {
           analysisJson: analysis_json,
-          summaryMarkdown: summary_markdown
+          summaryMarkdown: summary_markdown,
+          fieldValues: field_values,
+          analysisId: analysis_id,
+          analysisMetadata: metadata
         }
       });
 
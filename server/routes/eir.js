@@ -3,7 +3,7 @@
  */
 const express = require('express');
 const router = express.Router();
-const axios = require('axios');
+const { runEirAnalysisJob } = require('../services/mlAnalysisJobs');
 const fs = require('fs');
 const path = require('path');
 const { authenticateToken } = require('../middleware/authMiddleware');
@@ -263,13 +263,11 @@ router.post('/shared/:token/analyze', async (req, res) => {
     const text = eirFormDataToText(formData);
 
     const mlServiceUrl = getMLServiceURL();
-    const response = await axios.post(`${mlServiceUrl}/analyze-eir`, {
+    const { analysis_json, summary_markdown, field_values, analysis_id, metadata } = await runEirAnalysisJob(mlServiceUrl, {
       text,
       filename: `${draft.title}.eir`
-    }, { timeout: 600000 });
-
-    const { analysis_json, summary_markdown } = response.data;
-    res.json({ success: true, analysis_json, summary_markdown });
+    }, { timeoutMs: 600000 });
+    res.json({ success: true, analysis_json, summary_markdown, field_values, analysis_id, metadata });
   } catch (error) {
     console.error('EIR shared analyze error:', error);
     res.status(503).json({ success: false, message: 'Analysis failed', error: error.message });
@@ -0,0 +1,107 @@
+/**
+ * EIR analysis through the ML service job API.
+ * Submits the text to POST /jobs/analyze-eir and polls GET /jobs/:id instead
+ * of holding one HTTP request open for the whole analysis. The submission
+ * carries an Idempotency-Key derived from the content, so a retried upload
+ * of the same document attaches to the job already running on the ML
+ * service rather than starting a second analysis.
+ */
+
+const crypto = require('crypto');
+const axios = require('axios');
+const { deadlineHeaders } = require('./mlRequestDeadline');
+
+const REQUEST_TIMEOUT_MS = 30000;
+const TERMINAL_STATES = new Set(['completed', 'failed', 'cancelled']);
+
+function analysisIdempotencyKey(text, filename = '', depth = '') {
+  // The depth only enters the key when set, so keys of default-depth jobs are unchanged
+  const material = depth ? `${filename}\n${depth}\n${text}` : `${filename}\n${text}`;
+  const hash = crypto.createHash('sha256').update(material).digest('hex');
+  return `eir-${hash.slice(0, 32)}`;
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Run an EIR analysis job to completion.
+ * depth is 'quick', 'standard' or 'deep' (undefined: the ML service default).
+ * Resolves with { analysis_json, summary_markdown, field_values, analysis_id, model, metadata }.
+ * summary_markdown is the template summary; see waitForPolishedSummary().
+ * On timeout the job is left running (err.code = 'ECONNABORTED'); a retry
+ * with the same content picks it up again via the idempotency key.
+ */
+async function runEirAnalysisJob(mlServiceUrl, { text, filename, depth }, options = {}) {
+  const {
+    idempotencyKey = analysisIdempotencyKey(text, filename, depth),
+    timeoutMs = 600000,
+    pollIntervalMs = 2000,
+    onProgress
+  } = options;
+
+  const submitted = await axios.post(`${mlServiceUrl}/jobs/analyze-eir`, { text, filename, depth }, {
+    headers: { 'Idempotency-Key': idempotencyKey, ...deadlineHeaders(REQUEST_TIMEOUT_MS) },
+    timeout: REQUEST_TIMEOUT_MS,
+    maxContentLength: Infinity,
+    maxBodyLength: Infinity
+  });
+
+  let job = submitted.data;
+  const deadline = Date.now() + timeoutMs;
+
+  while (!TERMINAL_STATES.has(job.status)) {
+    if (Date.now() >= deadline) {
+      const err = new Error(`EIR analysis timeout after ${timeoutMs}ms (job ${job.job_id} still ${job.status})`);
+      err.code = 'ECONNABORTED';
+      err.jobId = job.job_id;
+      throw err;
+    }
+    await sleep(pollIntervalMs);
+    const polled = await axios.get(`${mlServiceUrl}/jobs/${job.job_id}`, {
+      headers: deadlineHeaders(REQUEST_TIMEOUT_MS),
+      timeout: REQUEST_TIMEOUT_MS,
+      maxContentLength: Infinity
+    });
+    job = polled.data;
+    if (onProgress) onProgress(job.progress);
+  }
+
+  if (job.status !== 'completed') {
+    const err = new Error(job.error || `EIR analysis job ${job.status}`);
+    err.code = job.status === 'cancelled' ? 'EIR_JOB_CANCELLED' : 'EIR_JOB_FAILED';
+    err.jobId = job.job_id;
+    throw err;
+  }
+  return job.result;
+}
+
+/**
+ * Wait for the background LLM polish of an analysis summary.
+ * Resolves with the polished summary state ({ summary_markdown, model, ... })
+ * once completed, or null when the polish failed, expired or is still
+ * running after timeoutMs; the template summary then stays in place.
+ */
+async function waitForPolishedSummary(mlServiceUrl, analysisId, options = {}) {
+  const { timeoutMs = 300000, pollIntervalMs = 3000 } = options;
+  const deadline = Date.now() + timeoutMs;
+
+  while (Date.now() < deadline) {
+    await sleep(pollIntervalMs);
+    let polish;
+    try {
+      const polled = await axios.get(`${mlServiceUrl}/analysis/${analysisId}/summary`, {
+        headers: deadlineHeaders(REQUEST_TIMEOUT_MS),
+        timeout: REQUEST_TIMEOUT_MS
+      });
+      polish = polled.data;
+    } catch (err) {
+      if (err.response?.status === 404) return null;
+      throw err;
+    }
+    if (polish.status === 'completed') return polish;
+    if (polish.status === 'failed') return null;
+  }
+  return null;
+}
+
+module.exports = { analysisIdempotencyKey, runEirAnalysisJob, waitForPolishedSummary };
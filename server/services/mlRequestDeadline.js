@@ -0,0 +1,24 @@
+/**
+ * Request deadline propagation to the Python ML service.
+ * Every ML call sends its axios timeout as X-Request-Timeout-Ms so the ML
+ * service can refuse, shorten or abort generation that would finish after
+ * the proxy has already given up.
+ */
+
+const DEADLINE_HEADER = 'X-Request-Timeout-Ms';
+
+function deadlineHeaders(timeoutMs) {
+  return timeoutMs > 0 ? { [DEADLINE_HEADER]: String(timeoutMs) } : {};
+}
+
+// Adds the header to every request made through an axios instance,
+// using the per-call timeout (or the instance default).
+function attachDeadlineHeader(client) {
+  client.interceptors.request.use((config) => {
+    Object.assign(config.headers, deadlineHeaders(config.timeout));
+    return config;
+  });
+  return client;
+}
+
+module.exports = { DEADLINE_HEADER, deadlineHeaders, attachDeadlineHeader };
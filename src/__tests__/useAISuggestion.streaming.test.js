@@ -55,6 +55,54 @@ describe('useAISuggestion — generateSuggestionStream', () => {
     expect(returned).toBe('The project.');
   });
 
+  it('two-tier mode: reports the draft, then replaces it with the refined text', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      body: makeSSEStream([
+        { type: 'token', text: 'Draft.' },
+        { type: 'done', fullText: 'Draft.', draft: true, refining: true },
+        { type: 'replace', fullText: 'Refined text.', model: 'qwen3:8b' }
+      ])
+    });
+    vi.stubGlobal('fetch', fetchMock);
+
+    const { result } = renderHook(() => useAISuggestion());
+    const onDone = vi.fn();
+    const onReplace = vi.fn();
+
+    let returned;
+    await act(async () => {
+      returned = await result.current.generateSuggestionStream(
+        'bimSoftware', '', 200,
+        { onDone, onReplace, mode: 'two_tier' }
+      );
+    });
+
+    expect(JSON.parse(fetchMock.mock.calls[0][1].body).mode).toBe('two_tier');
+    expect(onDone).toHaveBeenCalledWith('Draft.');
+    expect(onReplace).toHaveBeenCalledWith('Refined text.');
+    expect(returned).toBe('Refined text.');
+    expect(result.current.streamingText).toBe('Refined text.');
+  });
+
+  it('two-tier mode: keeps the draft when the stream ends without a replacement', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue({
+      ok: true,
+      body: makeSSEStream([
+        { type: 'done', fullText: 'Draft.', draft: true, refining: true }
+      ])
+    }));
+
+    const { result } = renderHook(() => useAISuggestion());
+
+    let returned;
+    await act(async () => {
+      returned = await result.current.generateSuggestionStream('bimSoftware', '', 200, { mode: 'two_tier' });
+    });
+
+    expect(returned).toBe('Draft.');
+  });
+
   it('resets isLoading and isStreaming to false after completion', async () => {
     vi.stubGlobal('fetch', vi.fn().mockResolvedValue({
       ok: true,
@@ -75,6 +123,25 @@ describe('useAISuggestion — generateSuggestionStream', () => {
     expect(result.current.streamingText).toBe('Hello.');
   });
 
+  it('exposes the degradation flag of the done event', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue({
+      ok: true,
+      body: makeSSEStream([
+        { type: 'token', text: 'Short.' },
+        { type: 'done', fullText: 'Short.', degraded: true, degradation_level: 2, degradation_actions: ['no_think', 'short_output'] }
+      ])
+    }));
+
+    const { result } = renderHook(() => useAISuggestion());
+    expect(result.current.degraded).toBe(false);
+
+    await act(async () => {
+      await result.current.generateSuggestionStream('projectDescription', '', 200, {});
+    });
+
+    expect(result.current.degraded).toBe(true);
+  });
+
   it('sets error state and throws when stream returns an error event', async () => {
     vi.stubGlobal('fetch', vi.fn().mockResolvedValue({
       ok: true,
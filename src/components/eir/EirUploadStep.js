@@ -14,7 +14,8 @@ import AnalysisProgressOverlay from './AnalysisProgressOverlay';
 
 const ACCEPTED_TYPES = {
   'application/pdf': '.pdf',
-  'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx'
+  'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+  'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx'
 };
 
 const MAX_FILE_SIZE = 20 * 1024 * 1024; // 20MB
@@ -78,7 +79,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
     if (status === 415) {
       return {
         error: 'Upload failed',
-        detailed: 'Unsupported file type. Please upload a PDF or DOCX document.'
+        detailed: 'Unsupported file type. Please upload a PDF, DOCX or XLSX document.'
       };
     }
 
@@ -141,6 +142,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
             onAnalysisComplete({
               analysisJson: result.document.analysis_json,
               summaryMarkdown: result.document.summary_markdown,
+              fieldValues: result.document.fieldValues,
             });
           }
         } else if (status === 'error') {
@@ -177,7 +179,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
     const validFiles = [];
     for (const file of files) {
       if (!Object.keys(ACCEPTED_TYPES).includes(file.type)) {
-        setError(`File "${file.name}" not supported. Use PDF or DOCX.`);
+        setError(`File "${file.name}" not supported. Use PDF, DOCX or XLSX.`);
         continue;
       }
       if (file.size > MAX_FILE_SIZE) {
@@ -400,7 +402,8 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
               if (onAnalysisComplete && result.document.analysis_json) {
                 onAnalysisComplete({
                   analysisJson: result.document.analysis_json,
-                  summaryMarkdown: result.document.summary_markdown
+                  summaryMarkdown: result.document.summary_markdown,
+                  fieldValues: result.document.fieldValues
                 });
               }
             }, 1000);
@@ -516,7 +519,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
           .filter(d => !(d.status === 'analyzed' && d.id !== doc.id))
           .map(d =>
             d.id === doc.id
-              ? { ...d, status: 'analyzed', analysisJson: result.data.analysisJson, analysis_json: result.data.analysisJson, summary_markdown: result.data.summaryMarkdown }
+              ? { ...d, status: 'analyzed', analysisJson: result.data.analysisJson, analysis_json: result.data.analysisJson, summary_markdown: result.data.summaryMarkdown, fieldValues: result.data.fieldValues }
               : d
           )
         );
@@ -617,6 +620,8 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
       return <span className="px-1.5 py-0.5 bg-red-100 text-red-700 text-xs font-medium rounded">PDF</span>;
     } else if (ext === 'docx') {
       return <span className="px-1.5 py-0.5 bg-blue-100 text-blue-700 text-xs font-medium rounded">DOCX</span>;
+    } else if (ext === 'xlsx') {
+      return <span className="px-1.5 py-0.5 bg-green-100 text-green-700 text-xs font-medium rounded">XLSX</span>;
     }
     return null;
   };
@@ -744,7 +749,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
         {/* Dropzone */}
         <div
           role="button"
-          aria-label="Upload EIR documents - click to browse or drag and drop PDF or DOCX files"
+          aria-label="Upload EIR documents - click to browse or drag and drop PDF, DOCX or XLSX files"
           aria-busy={uploading || analyzing !== null}
           tabIndex={0}
           onDragEnter={handleDragEnter}
@@ -772,7 +777,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
             ref={fileInputRef}
             type="file"
             multiple
-            accept=".pdf,.docx"
+            accept=".pdf,.docx,.xlsx"
             onChange={handleFileInput}
             className="hidden"
           />
@@ -808,6 +813,7 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
                 <div className="flex items-center gap-2 mt-3">
                   <span className="px-2 py-1 bg-white rounded text-xs font-medium text-gray-500 border border-gray-100">PDF</span>
                   <span className="px-2 py-1 bg-white rounded text-xs font-medium text-gray-500 border border-gray-100">DOCX</span>
+                  <span className="px-2 py-1 bg-white rounded text-xs font-medium text-gray-500 border border-gray-100">XLSX</span>
                   <span className="text-xs text-gray-400">up to 20MB</span>
                 </div>
               </>
@@ -958,7 +964,8 @@ const EirUploadStep = ({ draftId, onAnalysisComplete, onSkip }) => {
                 if (latestAnalyzed) {
                   onAnalysisComplete({
                     analysisJson: latestAnalyzed.analysisJson || latestAnalyzed.analysis_json,
-                    summaryMarkdown: latestAnalyzed.summary_markdown
+                    summaryMarkdown: latestAnalyzed.summary_markdown,
+                    fieldValues: latestAnalyzed.fieldValues
                   });
                 }
               }}
@@ -31,12 +31,80 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
   const [error, setError] = useState(null);
   const [streamingText, setStreamingText] = useState('');
   const [thinkingStage, setThinkingStage] = useState('');
+  const [degraded, setDegraded] = useState(false);
+
+  // ── Stream questions — shows the first one as soon as the model produces it ──
+  // Resolves true once the final list arrived; false lets the caller fall back.
+  const streamQuestions = useCallback(async () => {
+    const response = await fetch('/api/ai/generate-questions-stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        field_type: fieldType || fieldName,
+        field_label: fieldName,
+        field_context: null
+      })
+    });
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let received = 0;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const parts = buffer.split('\n\n');
+      buffer = parts.pop();
+
+      for (const part of parts) {
+        const line = part.trim();
+        if (!line.startsWith('data: ')) continue;
+
+        let event;
+        try { event = JSON.parse(line.slice(6)); } catch { continue; }
+
+        if (event.type === 'question') {
+          received += 1;
+          if (received === 1) {
+            setQuestions([event.question]);
+            setCurrentIndex(0);
+            setAnswers({});
+            setPhase('questions');
+          } else {
+            setQuestions(prev => [...prev, event.question]);
+          }
+        } else if (event.type === 'done') {
+          if (!event.questions?.length) return false;
+          setQuestions(event.questions);
+          if (received === 0) {
+            setCurrentIndex(0);
+            setAnswers({});
+          }
+          setPhase('questions');
+          return true;
+        } else if (event.type === 'error') {
+          throw new Error(event.message);
+        }
+      }
+    }
+    return false;
+  }, [fieldType, fieldName]);
 
-  // ── Fetch questions ──
+  // ── Fetch questions — streams first, falls back to non-streaming on error ──
   const fetchQuestions = useCallback(async () => {
     setPhase('loading');
     setError(null);
 
+    try {
+      if (await streamQuestions()) return;
+    } catch (streamErr) {
+      console.warn('Guided AI — question streaming failed, falling back:', streamErr.message);
+    }
+
     try {
       const response = await axios.post('/api/ai/generate-questions', {
         field_type: fieldType || fieldName,
@@ -64,7 +132,7 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
       }
       setPhase('error');
     }
-  }, [fieldType, fieldName]);
+  }, [fieldType, fieldName, streamQuestions]);
 
   useEffect(() => { fetchQuestions(); }, [fetchQuestions]);
 
@@ -74,6 +142,7 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
     setError(null);
     setStreamingText('');
     setThinkingStage('');
+    setDegraded(false);
 
     const answerList = questions.map(q => ({
       question_id: q.id,
@@ -127,6 +196,7 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
             setStreamingText(accumulated);
           } else if (event.type === 'done') {
             setGeneratedContent(event.fullText);
+            setDegraded(Boolean(event.degraded));
             setQuestionsAnswered(answeredCount);
             setQuestionsTotal(answerList.length);
             setPhase('result');
@@ -157,6 +227,7 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
 
         if (response.data.success) {
           setGeneratedContent(response.data.text);
+          setDegraded(Boolean(response.data.degraded));
           setQuestionsAnswered(response.data.questions_answered);
           setQuestionsTotal(response.data.questions_total);
           setPhase('result');
@@ -409,6 +480,15 @@ const GuidedAIWizardTab = ({ editor, fieldName, fieldType, onClose }) => {
           />
         </div>
 
+        {degraded && (
+          <div className="px-3 py-2 bg-amber-50 border border-amber-200 rounded-lg flex items-center gap-2">
+            <AlertCircle className="w-4 h-4 text-amber-600 flex-shrink-0" />
+            <p className="text-xs text-amber-800">
+              Generated with reduced settings while the AI service was busy. Use Retry later for a fuller result.
+            </p>
+          </div>
+        )}
+
         <div className="flex items-center gap-3">
           <button
             type="button"
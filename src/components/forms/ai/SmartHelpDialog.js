@@ -1,4 +1,4 @@
-import React, { useState, useRef, useContext } from 'react';
+import React, { useState, useRef, useContext, useEffect } from 'react';
 import {
   X,
   Sparkles,
@@ -57,6 +57,7 @@ const SmartHelpDialog = ({
   const {
     isLoading: aiLoading,
     error: aiError,
+    degraded: aiDegraded,
     isStreaming,
     streamingText,
     thinkingStage,
@@ -68,6 +69,13 @@ const SmartHelpDialog = ({
   } = useAISuggestion();
   const [aiSuccess, setAiSuccess] = useState(false);
 
+  // The AI service was under load: the text is usable but may be shorter or less thorough
+  useEffect(() => {
+    if (aiDegraded) {
+      toast('Generated with reduced settings while the AI service is busy. Regenerate later for a fuller result.', { icon: '⏳' });
+    }
+  }, [aiDegraded]);
+
   // AI Improvement options
   const [improveOptions, setImproveOptions] = useState({
     grammar: true,
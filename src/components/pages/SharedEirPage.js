@@ -66,6 +66,8 @@ const SharedEirPage = () => {
         sessionStorage.setItem('pendingEirAnalysis', JSON.stringify({
           analysis_json: res.analysis_json,
           summary_markdown: res.summary_markdown || '',
+          field_values: res.field_values || null,
+          analysis_id: res.analysis_id || null,
         }));
         toast.success('EIR analysis complete — open or create a BEP to use it.');
         navigate('/bep-generator');
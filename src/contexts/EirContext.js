@@ -99,6 +99,10 @@ export const EirProvider = ({ children }) => {
   const [analysis, setAnalysis] = useState(null);
   const [summary, setSummary] = useState(null);
   const [documentId, setDocumentId] = useState(null);
+  // Id of the analysis stored by the ML service, sent instead of the JSON
+  const [analysisId, setAnalysisId] = useState(null);
+  // BEP field values the ML service derived from the analysis without the LLM
+  const [fieldValues, setFieldValues] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState(null);
 
@@ -110,10 +114,14 @@ export const EirProvider = ({ children }) => {
       setAnalysis(data.analysisJson || data.analysis_json || data);
       setSummary(data.summaryMarkdown || data.summary_markdown || null);
       setDocumentId(data.documentId || null);
+      setAnalysisId(data.analysisId || data.analysis_id || null);
+      setFieldValues(data.fieldValues || data.field_values || null);
     } else {
       setAnalysis(null);
       setSummary(null);
       setDocumentId(null);
+      setAnalysisId(null);
+      setFieldValues(null);
     }
   }, []);
 
@@ -124,6 +132,8 @@ export const EirProvider = ({ children }) => {
     setAnalysis(null);
     setSummary(null);
     setDocumentId(null);
+    setAnalysisId(null);
+    setFieldValues(null);
     setError(null);
   }, []);
 
@@ -148,6 +158,8 @@ export const EirProvider = ({ children }) => {
    * Get the relevant EIR value for a BEP field
    */
   const getValueForField = useCallback((fieldName) => {
+    if (fieldValues?.[fieldName]) return fieldValues[fieldName];
+
     const path = FIELD_MAPPING[fieldName];
     if (!path) return null;
 
@@ -161,12 +173,14 @@ export const EirProvider = ({ children }) => {
       return JSON.stringify(value, null, 2);
     }
     return value;
-  }, [getValueByPath]);
+  }, [fieldValues, getValueByPath]);
 
   /**
    * Check if a field has EIR data available
    */
   const hasDataForField = useCallback((fieldName) => {
+    if (fieldValues?.[fieldName]) return true;
+
     const path = FIELD_MAPPING[fieldName];
     if (!path) return false;
 
@@ -175,23 +189,35 @@ export const EirProvider = ({ children }) => {
     if (Array.isArray(value)) return value.length > 0;
     if (typeof value === 'string') return value.trim().length > 0;
     return true;
-  }, [getValueByPath]);
+  }, [fieldValues, getValueByPath]);
 
   /**
-   * Get an AI suggestion for a field based on EIR analysis
+   * Get an AI suggestion for a field based on EIR analysis.
+   * Sends the stored analysis id when known; the full analysis goes only
+   * with the first request, or again once the stored copy has expired (404).
    */
   const getSuggestionForField = useCallback(async (fieldType, partialText = '') => {
     if (!analysis) return null;
+    // Fields the analysis answers directly need no round trip
+    if (!partialText && fieldValues?.[fieldType]) return fieldValues[fieldType];
 
     setIsLoading(true);
     setError(null);
 
     try {
-      const response = await axios.post('/api/ai/suggest-from-eir', {
-        analysis_json: analysis,
-        field_type: fieldType,
-        partial_text: partialText
-      });
+      const request = { field_type: fieldType, partial_text: partialText };
+      let response = null;
+      if (analysisId) {
+        try {
+          response = await axios.post('/api/ai/suggest-from-eir', { ...request, analysis_id: analysisId });
+        } catch (err) {
+          if (err.response?.status !== 404) throw err;
+        }
+      }
+      if (!response) {
+        response = await axios.post('/api/ai/suggest-from-eir', { ...request, analysis_json: analysis });
+        if (response.data.analysis_id) setAnalysisId(response.data.analysis_id);
+      }
 
       return response.data.suggestion || response.data.text;
     } catch (err) {
@@ -203,7 +229,7 @@ export const EirProvider = ({ children }) => {
     } finally {
       setIsLoading(false);
     }
-  }, [analysis, getValueForField]);
+  }, [analysis, analysisId, fieldValues, getValueForField]);
 
   /**
    * Get all fields that have EIR data available
@@ -219,6 +245,7 @@ export const EirProvider = ({ children }) => {
     analysis,
     summary,
     documentId,
+    fieldValues,
     isLoading,
     error,
     hasAnalysis: !!analysis,
@@ -238,6 +265,7 @@ export const EirProvider = ({ children }) => {
     analysis,
     summary,
     documentId,
+    fieldValues,
     isLoading,
     error,
     setEirAnalysis,
@@ -263,6 +291,7 @@ const defaultContextValue = {
   analysis: null,
   summary: null,
   documentId: null,
+  fieldValues: null,
   isLoading: false,
   error: null,
   hasAnalysis: false,
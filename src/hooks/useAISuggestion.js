@@ -23,6 +23,8 @@ export const useAISuggestion = () => {
   const [streamingText, setStreamingText] = useState('');
   const [thinkingStage, setThinkingStage] = useState('');
   const [error, setError] = useState(null);
+  // Set when the last result was generated with reduced settings under load
+  const [degraded, setDegraded] = useState(false);
   const abortControllerRef = useRef(null);
 
   /**
@@ -31,6 +33,7 @@ export const useAISuggestion = () => {
   const generateSuggestion = useCallback(async (fieldType, partialText = '', maxLength = 200) => {
     setIsLoading(true);
     setError(null);
+    setDegraded(false);
 
     try {
       const response = await axios.post(
@@ -47,6 +50,7 @@ export const useAISuggestion = () => {
       );
 
       if (response.data.success) {
+        setDegraded(Boolean(response.data.degraded));
         return response.data.text;
       } else {
         throw new Error(response.data.message || 'Failed to generate suggestion');
@@ -79,6 +83,7 @@ export const useAISuggestion = () => {
   const generateFromPrompt = useCallback(async (prompt, fieldType = null, maxLength = 200, { thinkingMode } = {}) => {
     setIsLoading(true);
     setError(null);
+    setDegraded(false);
 
     try {
       const response = await axios.post(
@@ -97,6 +102,7 @@ export const useAISuggestion = () => {
       );
 
       if (response.data.success) {
+        setDegraded(Boolean(response.data.degraded));
         return response.data.text;
       } else {
         throw new Error(response.data.message || 'Failed to generate text');
@@ -150,14 +156,16 @@ export const useAISuggestion = () => {
    * @param {string} fieldType - BEP field type
    * @param {string} partialText - Existing text in the field
    * @param {number} maxLength - Max tokens to generate
-   * @param {object} callbacks - { onStage, onToken, onDone, onError }
-   * @returns {Promise<string>} - Accumulated text on success
+   * @param {object} options - { onStage, onToken, onDone, onError, onReplace, mode }
+   *   mode 'two_tier' streams a fast draft first; onDone receives the draft and
+   *   onReplace the refined text when it arrives.
+   * @returns {Promise<string>} - Final (refined if available) text on success
    */
   const generateSuggestionStream = useCallback(async (
     fieldType,
     partialText = '',
     maxLength = 200,
-    { onStage, onToken, onDone, onError } = {}
+    { onStage, onToken, onDone, onError, onReplace, mode } = {}
   ) => {
     // Cancel any in-flight stream
     if (abortControllerRef.current) {
@@ -171,6 +179,7 @@ export const useAISuggestion = () => {
     setStreamingText('');
     setThinkingStage('');
     setError(null);
+    setDegraded(false);
 
     try {
       const response = await fetch('/api/ai/suggest-stream', {
@@ -180,7 +189,8 @@ export const useAISuggestion = () => {
           field_type: fieldType,
           partial_text: partialText,
           max_length: maxLength,
-          model: getPreferredModel()
+          model: getPreferredModel(),
+          ...(mode && { mode })
         }),
         signal: abortController.signal
       });
@@ -193,6 +203,7 @@ export const useAISuggestion = () => {
       const decoder = new TextDecoder();
       let buffer = '';
       let accumulated = '';
+      let draftText = null;
 
       while (true) {
         const { done, value } = await reader.read();
@@ -220,8 +231,15 @@ export const useAISuggestion = () => {
             setStreamingText(accumulated);
             onToken?.(event.text, accumulated);
           } else if (event.type === 'done') {
+            setDegraded(Boolean(event.degraded));
             setStreamingText(event.fullText);
             onDone?.(event.fullText);
+            if (!event.refining) return event.fullText;
+            // Two-tier: keep reading for the refined replacement
+            draftText = event.fullText;
+          } else if (event.type === 'replace') {
+            setStreamingText(event.fullText);
+            onReplace?.(event.fullText);
             return event.fullText;
           } else if (event.type === 'error') {
             throw new Error(event.message);
@@ -229,7 +247,7 @@ export const useAISuggestion = () => {
         }
       }
 
-      return accumulated;
+      return draftText ?? accumulated;
     } catch (err) {
       if (err.name === 'AbortError') return '';
       console.error('AI stream error:', err);
@@ -258,6 +276,7 @@ export const useAISuggestion = () => {
     streamingText,
     thinkingStage,
     error,
+    degraded,
     setError,
     generateSuggestion,
     generateSuggestionStream,
@@ -181,6 +181,84 @@ export const analyzeDocument = async (documentId, userId, signal = null) => {
   );
 };
 
+/**
+ * Analyze a document with AI, receiving partial results as chunks finish
+ * @param {string} documentId - Document ID
+ * @param {object} [handlers]
+ * @param {function} [handlers.onStage] - Called with {stage, chunks_done, chunks_total}
+ * @param {function} [handlers.onPartial] - Called with (analysisJson, {chunks_done, chunks_total})
+ * @param {AbortSignal} [handlers.signal] - Optional AbortSignal for cancellation
+ * @returns {Promise<{success: boolean, data?: {analysisJson: object, summaryMarkdown: string, fieldValues: object, analysisId: string}, message?: string}>}
+ * summaryMarkdown is the template summary; the polished one is saved to the
+ * document when ready and can be fetched with getPolishedSummary(analysisId).
+ */
+export const analyzeDocumentStream = async (documentId, { onStage, onPartial, signal = null } = {}) => {
+  const token = localStorage.getItem('authToken');
+  try {
+    const response = await fetch(`/api/documents/${documentId}/analyze-stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token && { Authorization: `Bearer ${token}` })
+      },
+      body: JSON.stringify({}),
+      signal
+    });
+
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}));
+      return { success: false, message: body.message || `HTTP ${response.status}`, status: response.status };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      // SSE events are separated by double newline
+      const parts = buffer.split('\n\n');
+      buffer = parts.pop(); // keep incomplete chunk
+
+      for (const part of parts) {
+        const line = part.trim();
+        if (!line.startsWith('data: ')) continue;
+
+        let event;
+        try { event = JSON.parse(line.slice(6)); } catch { continue; }
+
+        if (event.type === 'stage') {
+          onStage?.(event);
+        } else if (event.type === 'partial') {
+          onPartial?.(event.analysis_json, { chunks_done: event.chunks_done, chunks_total: event.chunks_total });
+        } else if (event.type === 'done') {
+          // The server saves the polished summary; don't hold the stream open for it
+          reader.cancel().catch(() => {});
+          return {
+            success: true,
+            data: {
+              analysisJson: event.analysis_json,
+              summaryMarkdown: event.summary_markdown,
+              fieldValues: event.field_values,
+              analysisId: event.metadata?.analysis_id
+            }
+          };
+        } else if (event.type === 'error') {
+          return { success: false, message: event.message };
+        }
+      }
+    }
+    return { success: false, message: 'Analysis stream ended unexpectedly' };
+  } catch (error) {
+    if (error.name === 'AbortError') return { success: false, message: 'Analysis cancelled' };
+    console.error('API Error:', error);
+    return { success: false, message: error.message || 'An unexpected error occurred' };
+  }
+};
+
 /**
  * Extract text and analyze in one operation
  * @param {string} documentId - Document ID
@@ -252,6 +330,16 @@ export const getLatestAnalyzedDocument = async (userId, draftId) => {
   return null;
 };
 
+/**
+ * Get the LLM-polished summary of an analysis
+ * @param {string} analysisId - analysisId returned with the analysis
+ * @returns {Promise<{success: boolean, data?: {status: string, summary_markdown: string|null, model: string|null}}>}
+ * status is 'pending', 'completed' or 'failed'; 404 once expired.
+ */
+export const getPolishedSummary = async (analysisId) => {
+  return handleApiCall(apiClient.get(`/analysis/${encodeURIComponent(analysisId)}/summary`));
+};
+
 /**
  * Check if ML service is available
  * @returns {Promise<boolean>}